@@ -0,0 +1,120 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+"""
+Compare the cost of turning listing pages into resources with the SDK's
+models and with the raw records of `chaosoci.util.rawjson`, for the pages
+read by `get_instances` and `get_objects`.
+
+No OCI account is needed: the pages are generated and deserialized by the
+SDK exactly as they would be after a `list_instances` or `list_objects`
+call. Run it with:
+
+    python benchmarks/listing.py [--resources 1000] [--rounds 20]
+"""
+
+import argparse
+import json
+import timeit
+
+from oci.base_client import BaseClient
+from oci.core.models import Instance, core_type_mapping
+from oci.object_storage.models import (ObjectSummary,
+                                       object_storage_type_mapping)
+
+from chaosoci.core.compute.common import filter_instances
+from chaosoci.util.rawjson import raw_page
+
+FILTERS = {'lifecycle_state': 'RUNNING', 'freeform_tags.env': 'staging'}
+
+
+def instances_page(count: int) -> bytes:
+    return json.dumps([{
+        'id': 'ocid1.instance.oc1..{:06d}'.format(i),
+        'compartmentId': 'ocid1.compartment.oc1..bench',
+        'availabilityDomain': 'AD-{}'.format(i % 3 + 1),
+        'faultDomain': 'FAULT-DOMAIN-{}'.format(i % 3 + 1),
+        'displayName': 'instance-{}'.format(i),
+        'lifecycleState': 'RUNNING' if i % 4 else 'STOPPED',
+        'region': 'uk-london-1',
+        'shape': 'VM.Standard2.1',
+        'imageId': 'ocid1.image.oc1..bench',
+        'freeformTags': {'env': 'staging' if i % 2 else 'prod'},
+        'definedTags': {'ops': {'team': 'chaos'}},
+        'metadata': {'ssh_authorized_keys': 'ssh-rsa AAAA'},
+        'sourceDetails': {'sourceType': 'image',
+                          'imageId': 'ocid1.image.oc1..bench'},
+        'launchOptions': {'bootVolumeType': 'PARAVIRTUALIZED',
+                          'firmware': 'UEFI_64',
+                          'networkType': 'VFIO'},
+        'agentConfig': {'isMonitoringDisabled': False},
+        'timeCreated': '2020-01-01T10:00:00.000Z',
+    } for i in range(count)]).encode()
+
+
+def objects_page(count: int) -> bytes:
+    return json.dumps({'objects': [{
+        'name': 'logs/{:06d}.gz'.format(i),
+        'size': 1024 * i,
+        'md5': 'bWQ1',
+        'etag': 'etag-{}'.format(i),
+        'storageTier': 'Standard',
+        'timeCreated': '2020-01-01T10:00:00.000Z',
+        'timeModified': '2020-01-01T10:00:00.000Z',
+    } for i in range(count)], 'prefixes': []}).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--resources', type=int, default=1000,
+                        help='resources per page')
+    parser.add_argument('--rounds', type=int, default=20,
+                        help='pages decoded per measurement')
+    args = parser.parse_args()
+
+    # the clients are only used to deserialize, so never sign a request
+    config = {'region': 'uk-london-1', 'key_file': 'unused',
+              'tenancy': 'ocid1.tenancy.oc1..bench',
+              'user': 'ocid1.user.oc1..bench',
+              'fingerprint': ':'.join(['00'] * 16)}
+    compute = BaseClient('compute', config, None, core_type_mapping)
+    storage = BaseClient('object_storage', config, None,
+                         object_storage_type_mapping)
+
+    instances = instances_page(args.resources)
+    objects = objects_page(args.resources)
+
+    cases = [
+        ('get_instances page', [
+            ('models', lambda: compute.deserialize_response_data(
+                instances, 'list[Instance]')),
+            ('raw', lambda: raw_page(instances, Instance)),
+        ]),
+        ('get_instances page + filter', [
+            ('models', lambda: filter_instances(
+                compute.deserialize_response_data(
+                    instances, 'list[Instance]'), FILTERS)),
+            ('raw', lambda: filter_instances(
+                raw_page(instances, Instance), FILTERS)),
+        ]),
+        ('get_objects page', [
+            ('models', lambda: storage.deserialize_response_data(
+                objects, 'ListObjects').objects),
+            ('raw', lambda: raw_page(objects, ObjectSummary,
+                                     key='objects')),
+        ]),
+    ]
+
+    print('{} resources per page, best of 3 x {} pages'.format(
+        args.resources, args.rounds))
+    for title, variants in cases:
+        timings = {}
+        for name, func in variants:
+            timings[name] = min(timeit.repeat(
+                func, number=args.rounds, repeat=3)) / args.rounds
+        print('{:<30} models {:8.2f} ms   raw {:8.2f} ms   x{:.1f}'.format(
+            title, timings['models'] * 1000, timings['raw'] * 1000,
+            timings['models'] / timings['raw']))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
 # Copyright 2020, Oracle Corporation and/or its affiliates.
 
-from typing import List
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
-from oci.config import from_file, validate_config
+from oci.config import (DEFAULT_LOCATION, DEFAULT_PROFILE, from_file,
+                        validate_config)
+from oci.signer import Signer
 
 from chaoslib.discovery.discover import (discover_actions, discover_probes,
                                          initialize_discovery_result)
@@ -12,23 +18,120 @@ from chaoslib.types import (Discovery, DiscoveredActivities,
 from logzero import logger
 
 __version__ = '0.2.0'
-__all__ = ["__version__", "discover", "oci_client"]
+__all__ = ["__version__", "discover", "oci_client", "clear_client_pool",
+           "oci_config", "get_compartment_id"]
+
+# Parsed configuration files, keyed by (path, profile) and invalidated when
+# the file's modification time changes.
+_config_cache = {}  # type: Dict[Tuple[str, str], Tuple[float, Dict]]
+_config_cache_lock = threading.Lock()
+
+# Request signers, keyed by configuration fingerprint, so a private key file
+# is read once however many client classes are built from it.
+_signer_cache = {}  # type: Dict[str, Signer]
+
+# Clients are expensive to build (signer, requests session, TLS handshake),
+# so they are pooled per (client class, config fingerprint,
+# skip_deserialization) and handed back warm on subsequent calls.
+_client_pool = {}  # type: Dict[Tuple[Any, str, bool], Any]
+_client_pool_lock = threading.Lock()
 
 
 def oci_client(resource_name: str, configuration: Configuration = None,
                secrets: Secrets = None, skip_deserialization: bool = False):
-    """Create an oci configuration object"""
+    """
+    Return an OCI client of type `resource_name`, reusing a pooled client
+    (and its keep-alive connections) built from the same configuration when
+    one is available.
+    """
 
     # As secrets is attached to configuration in OCI, it is not used.
     configuration = configuration or {}
 
     if not configuration.get('tenancy'):
-        configuration = from_file()
+        configuration = oci_config()
     else:
         validate_config(configuration)
 
-    return resource_name(configuration,
-                         skip_deserialization=skip_deserialization)
+    fingerprint = config_fingerprint(configuration)
+    key = (resource_name, fingerprint, skip_deserialization)
+    with _client_pool_lock:
+        client = _client_pool.get(key)
+        if client is None:
+            kwargs = {'skip_deserialization': skip_deserialization}
+            signer = _get_signer(configuration, fingerprint)
+            if signer is not None:
+                kwargs['signer'] = signer
+            client = resource_name(configuration, **kwargs)
+            _client_pool[key] = client
+            logger.debug("Created pooled %s client",
+                         getattr(resource_name, '__name__', resource_name))
+
+    return client
+
+
+def clear_client_pool():
+    """
+    Drop every pooled client, closing their connections. Call it between
+    experiments, or whenever the credentials the clients were built from
+    are no longer valid.
+    """
+    with _client_pool_lock:
+        clients = list(_client_pool.values())
+        _client_pool.clear()
+        _signer_cache.clear()
+
+    for client in clients:
+        session = getattr(getattr(client, 'base_client', None),
+                          'session', None)
+        if session is not None:
+            session.close()
+
+
+def config_fingerprint(configuration: Configuration) -> str:
+    """Return a stable digest identifying an OCI configuration."""
+    serialized = json.dumps(configuration, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def oci_config(file_location: str = DEFAULT_LOCATION,
+               profile_name: str = DEFAULT_PROFILE) -> Dict[str, Any]:
+    """
+    Return the OCI configuration read from `file_location`. The file is
+    parsed once per process and only read again when it is modified.
+    """
+    path = os.path.expanduser(file_location)
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        # Let the SDK raise its own, more helpful, error.
+        return from_file(file_location, profile_name)
+
+    key = (path, profile_name)
+    with _config_cache_lock:
+        cached = _config_cache.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, from_file(file_location, profile_name))
+            _config_cache[key] = cached
+
+    return dict(cached[1])
+
+
+def get_compartment_id(compartment_id: str = None,
+                       configuration: Configuration = None) -> Optional[str]:
+    """
+    Resolve the compartment an activity should work in: the one given
+    explicitly, else the `compartment` key of the configuration, else the
+    one set in the OCI configuration file. Returns `None` when none is set.
+    """
+    if compartment_id:
+        return compartment_id
+
+    configuration = configuration or {}
+    if configuration.get('compartment'):
+        return configuration['compartment']
+
+    return oci_config().get('compartment')
 
 
 def discover(discover_system: bool = True) -> Discovery:
@@ -50,6 +153,31 @@ def discover(discover_system: bool = True) -> Discovery:
 ###############################################################################
 # Private functions
 ###############################################################################
+def _get_signer(configuration: Configuration,
+                fingerprint: str) -> Optional[Signer]:
+    """
+    Return a shared API key signer for the configuration, or `None` when it
+    does not use API key authentication and the SDK should build its own.
+    """
+    if not configuration.get('user') or not configuration.get('fingerprint'):
+        return None
+    if configuration.get('security_token_file'):
+        return None
+
+    signer = _signer_cache.get(fingerprint)
+    if signer is None:
+        signer = Signer(
+            tenancy=configuration['tenancy'],
+            user=configuration['user'],
+            fingerprint=configuration['fingerprint'],
+            private_key_file_location=configuration.get('key_file'),
+            pass_phrase=configuration.get('pass_phrase'),
+            private_key_content=configuration.get('key_content'))
+        _signer_cache[fingerprint] = signer
+
+    return signer
+
+
 def load_exported_activities() -> List[DiscoveredActivities]:
     """
     Extract metadata from actions and probes exposed by this extension.
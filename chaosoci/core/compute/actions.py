@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from collections import defaultdict
-from random import choice
+from datetime import datetime, timedelta, timezone
+from random import Random, choice
 from typing import Any, Dict, List
 
 import oci
@@ -8,18 +9,31 @@ from chaoslib.exceptions import ActivityFailed, FailedActivity
 from chaoslib.types import Configuration, Secrets
 from oci.retry import DEFAULT_RETRY_STRATEGY
 
-from chaosoci import oci_client
+from chaosoci import get_compartment_id, oci_client
 from chaosoci.types import OCIResponse
+from chaosoci.util.cache import invalidate_inventory
+from chaosoci.util.executor import (DEFAULT_MAX_WORKERS, run_concurrently,
+                                    summarize)
+from chaosoci.util.filters import iter_filtered
+from chaosoci.util.pagination import prefetch_pages
+from chaosoci.util.plans import load_plan
+from chaosoci.util.sampling import sample_stream
+from chaosoci.util.workrequests import (find_work_request,
+                                        wait_for_work_requests,
+                                        work_request_id)
 
 from logzero import logger
 
-from oci.config import from_file
 from oci.core import ComputeClient, ComputeManagementClient
+from oci.work_requests import WorkRequestClient
 
-from .common import (filter_instances,
-                     get_instances, get_instance_pools, filter_instance_pools)
+from .common import (filter_instances, iter_instances,
+                     get_instances, get_instance_pools, filter_instance_pools,
+                     instance_list_filters, instance_pool_list_filters)
+from .selection import select_targets
 
 __all__ = ["stop_instance", "stop_random_instance", "stop_instances_in_compartment",
+           "stop_instances_by_domain",
            "start_instance_pool", "start_all_instance_pools_in_compartment",
            "stop_instance_pool", "stop_all_instance_pools_in_compartment",
            "terminate_instance_pool", "terminate_all_instance_pools_in_compartment",
@@ -38,6 +52,7 @@ def stop_instance(instance_id: str, force: bool = False,
 
     action = "STOP" if force else "SOFTSTOP"
     ret = client.instance_action(instance_id=instance_id, action=action).data
+    invalidate_inventory('instances')
 
     return ret
 
@@ -46,7 +61,12 @@ def stop_random_instance(filters: List[Dict[str, Any]],
                          compartment_id: str = None,
                          force: bool = False,
                          configuration: Configuration = None,
-                         secrets: Secrets = None) -> OCIResponse:
+                         secrets: Secrets = None,
+                         count: int = None,
+                         percentage: float = None,
+                         seed: Any = None,
+                         max_workers: int = DEFAULT_MAX_WORKERS,
+                         timeout: float = None) -> OCIResponse:
     """
     Stop a a random compute instance within a given compartment.
     If filters are provided, the scope will be reduced to those instances
@@ -54,28 +74,44 @@ def stop_random_instance(filters: List[Dict[str, Any]],
 
     Please refer to: https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.Instance.html#oci.core.models.Instance
     for details on the available filters under the 'parameters' section.
-    """  # noqa: E501
-    client = oci_client(ComputeClient, configuration, secrets,
-                        skip_deserialization=False)
 
+    Given a `count`, or a `percentage` of the matching instances, that many
+    random instances are stopped instead, concurrently, and a report of
+    each stop is returned (see `stop_instances_in_compartment`). They are
+    picked by reservoir sampling as the listing is streamed, so the
+    compartment is never held in memory, and the same `seed` picks the same
+    instances from the same listing.
+    """  # noqa: E501
     action = "STOP" if force else "SOFTSTOP"
 
-    compartment_id = compartment_id or from_file().get('compartment')
+    compartment_id = get_compartment_id(compartment_id, configuration)
     if compartment_id is None:
         raise ActivityFailed('We have not been able to find a compartment,'
                              ' without one, we cannot continue.')
 
-    instances = get_instances(client, compartment_id)
+    if count is not None or percentage is not None:
+        return _stop_sampled_instances(
+            filters, compartment_id, force, configuration, secrets, count,
+            percentage, seed, max_workers, timeout)
+
+    client = oci_client(ComputeClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    instances = get_instances(client, compartment_id,
+                              prefetch=prefetch_pages(configuration),
+                              **instance_list_filters(filters))
 
     filters = filters or None
     if filters is not None:
-        instances = filter_instances(instances, filters=filters)
+        instances = filter_instances(instances=instances, filters=filters)
 
-    instance_id = choice(instances).id
+    instance_id = (Random(seed).choice(instances) if seed is not None
+                   else choice(instances)).id
 
     s_client = oci_client(ComputeClient, configuration, secrets,
                           skip_deserialization=True)
     ret = s_client.instance_action(instance_id=instance_id, action=action)
+    invalidate_inventory('instances')
 
     return ret.data
 
@@ -84,42 +120,132 @@ def stop_instances_in_compartment(filters: List[Dict[str, Any]],
                                   instances_ids: List[str] = None,
                                   configuration: Configuration = None,
                                   compartment_id: str = None,
-                                  secrets: Secrets = None) -> OCIResponse:
+                                  secrets: Secrets = None,
+                                  force: bool = False,
+                                  max_workers: int = None,
+                                  timeout: float = None,
+                                  plan_id: str = None) -> OCIResponse:
     """Stop the given OCI Compute instances,  If  only an Compartment is specified, all instances in
     that Compartment will be stopped. If you need more control, you can
     also provide a list of filters following the documentation.
     Please refer to: https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.Instance.html#oci.core.models.Instance
-    for details on the available filters under the 'parameters' section."""
+    for details on the available filters under the 'parameters' section.
+
+    With `max_workers` set, the instances are stopped concurrently by that
+    many workers, each call being given up on after `timeout` seconds, and
+    a report of each instance's outcome is returned instead of the raw
+    responses (see `chaosoci.util.executor.run_concurrently`). A failure to
+    stop one instance does not prevent stopping the others.
+
+    Given the `plan_id` of a plan made by
+    `plan_stop_instances_in_compartment`, the planned instances are stopped
+    and the compartment is not listed again."""
 
     client = oci_client(ComputeClient, configuration, secrets,
                         skip_deserialization=True)
-    if not instances_ids:
+    if not instances_ids and plan_id:
+        plan = load_plan(plan_id, 'instances', configuration)
+        compartment_id = plan['scope'].get('compartment_id', compartment_id)
+        instances_ids = plan['targets']
+        if not instances_ids:
+            raise FailedActivity('No instances were planned in plan %s'
+                                 % plan_id)
+    elif not instances_ids:
         logger.warning('Based on configuration provided I am going to '
                        'stop all instances in the Compartment %s! matching the filter criteria'
                        % compartment_id)
 
-        compartment_id = compartment_id or from_file().get('compartment')
-        instances = get_instances(client, compartment_id)
+        compartment_id = get_compartment_id(compartment_id, configuration)
+        instances = get_instances(client, compartment_id, raw=True,
+                                  prefetch=prefetch_pages(configuration),
+                                  **instance_list_filters(filters))
 
         filters = filters or None
         if filters is not None:
-            instances_ids = filter_instances(instances, filters=filters)
+            instances = filter_instances(instances=instances, filters=filters)
+
+        instances_ids = [instance.id for instance in instances]
 
         if not instances_ids:
             raise FailedActivity(
                 'No instances found matching filters: %s' % str(filters))
 
-        logger.debug('Instances in Compartment %s selected: %s}.' % (
+        logger.debug('Instances in Compartment %s selected: %s.' % (
             compartment_id, str(instances_ids)))
 
-    stop_instances_ret = []
-
-    for instance_id in instances_ids:
-        logger.debug("Picked Compute Instance '{}' from Compartment '{}' to be stopped", instance_id, compartment_id)
+    def stop(instance_id: str) -> OCIResponse:
+        logger.debug("Picked Compute Instance '%s' from Compartment '%s' to "
+                     "be stopped", instance_id, compartment_id)
+        return stop_instance(instance_id, force, configuration, secrets)
+
+    if max_workers:
+        reports = run_concurrently(stop, instances_ids,
+                                   max_workers=max_workers, timeout=timeout)
+        summarize(reports, 'instance stops')
+        return reports
+
+    return [stop(instance_id) for instance_id in instances_ids]
+
+
+def stop_instances_by_domain(strategy: str,
+                             filters: Dict[str, Any] = None,
+                             compartment_id: str = None,
+                             count: int = None,
+                             fault_domain: str = None,
+                             availability_domain: str = None,
+                             weights: Dict[str, float] = None,
+                             seed: Any = None,
+                             force: bool = False,
+                             max_workers: int = DEFAULT_MAX_WORKERS,
+                             timeout: float = None,
+                             configuration: Configuration = None,
+                             secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Stop instances of the compartment matching the filters, picked across
+    fault domains by `strategy`: `one_per_fault_domain`,
+    `whole_fault_domain` or `weighted_spread` (see
+    `chaosoci.core.compute.selection.select_targets` for the other
+    arguments). The instances are stopped concurrently.
+
+    Returns the selected instances with their availability and fault
+    domains, and a report of each stop.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+    if compartment_id is None:
+        raise ActivityFailed('We have not been able to find a compartment,'
+                             ' without one, we cannot continue.')
 
-        stop_instances_ret.append(stop_instance(instance_id, False))
+    client = oci_client(ComputeClient, configuration, secrets,
+                        skip_deserialization=True)
 
-    return stop_instances_ret
+    instances = iter_filtered(
+        iter_instances(client, compartment_id, raw=True,
+                       prefetch=prefetch_pages(configuration),
+                       **instance_list_filters(filters)),
+        filters or None, 'instances')
+    targets = select_targets(
+        instances, strategy, count=count, fault_domain=fault_domain,
+        availability_domain=availability_domain, weights=weights, seed=seed)
+
+    logger.debug("Picked Compute Instances %s from Compartment '%s' to be "
+                 "stopped (%s)", [target.id for target in targets],
+                 compartment_id, strategy)
+
+    reports = run_concurrently(
+        lambda instance_id: stop_instance(instance_id, force, configuration,
+                                          secrets),
+        [target.id for target in targets], max_workers=max_workers,
+        timeout=timeout)
+    summarize(reports, 'instance stops')
+
+    return {
+        'strategy': strategy,
+        'targets': [{'id': target.id,
+                     'availability_domain': target.availability_domain,
+                     'fault_domain': target.fault_domain}
+                    for target in targets],
+        'reports': reports,
+    }
 
 
 # Compute Client Management Actions
@@ -134,52 +260,39 @@ def stop_instance_pool(instance_pool_id: str,
 
     stop_instance_pool_response = client.stop_instance_pool(
         instance_pool_id).data
+    invalidate_inventory('instance_pools', 'instances')
 
     return stop_instance_pool_response
 
 
-def stop_all_instance_pools_in_compartment(instance_pool_ids: List[str],
-                                           filters: List[Dict[str, Any]],
-                                           configuration: Configuration = None,
-                                           compartment_id: str = None,
-                                           secrets: Secrets = None) -> OCIResponse:
+def stop_all_instance_pools_in_compartment(
+        instance_pool_ids: List[str], filters: List[Dict[str, Any]],
+        configuration: Configuration = None, compartment_id: str = None,
+        secrets: Secrets = None, max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = None, plan_id: str = None,
+        track_work_requests: bool = False,
+        work_request_timeout: float = 1800) -> List[Dict[str, Any]]:
     """Stop the given OCI Compute instance pool. If you need more control, you can
     also provide a list of filters following the documentation.
     Please refer to: https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.InstancePool.html#oci.core.models.Instance
-    for details on the available filters under the 'parameters' section."""
-
-    client = oci_client(ComputeManagementClient, configuration, secrets,
-                        skip_deserialization=True)
-
-    if not instance_pool_ids:
-        logger.warning('Based on configuration provided I am going to '
-                       'stop all Instance Pools in the Compartment %s! matching the filter criteria'
-                       % compartment_id)
-
-        compartment_id = compartment_id or from_file().get('compartment')
-        instance_pools = get_instance_pools(client, compartment_id)
-
-        filters = filters or None
-        if filters is not None:
-            instance_pool_ids = filter_instance_pools(instance_pools, filters=filters)
-
-        if not instance_pool_ids:
-            raise FailedActivity(
-                'No Instance Pools found matching filters: %s' % str(filters))
-
-        logger.debug('Instance Pools in Compartment %s selected: %s}.' % (
-            compartment_id, str(instance_pool_ids)))
-
-    stop_instance_pool_response = []
+    for details on the available filters under the 'parameters' section.
 
-    for instance_pool_id in instance_pool_ids:
-        logger.debug("Picked Compute Instance Pool '{}' from Compartment '{}' to be stopped", instance_pool_id,
-                     compartment_id)
+    The Instance Pools are stopped concurrently, by up to `max_workers`
+    workers, and each pool's outcome is reported (see
+    `chaosoci.util.executor.run_concurrently`). Given the `plan_id` of a
+    plan made by `plan_instance_pools_in_compartment`, the planned pools are
+    acted on without listing the compartment again.
 
-        stop_instance_pool_response = stop_instance_pool(
-            instance_pool_id)
+    Each report names the work request the call started. With
+    `track_work_requests`, the action also waits, up to
+    `work_request_timeout` seconds, for these work requests to finish and
+    reports how each one ended and how long it took (see
+    `chaosoci.util.workrequests.wait_for_work_requests`)."""
 
-    return stop_instance_pool_response
+    return _instance_pools_action(
+        'stop_instance_pool', 'stopped', instance_pool_ids, filters,
+        configuration, compartment_id, secrets, max_workers, timeout,
+        plan_id, track_work_requests, work_request_timeout)
 
 
 def start_instance_pool(instance_pool_id: str,
@@ -192,53 +305,40 @@ def start_instance_pool(instance_pool_id: str,
 
     start_instance_pool_response = client.start_instance_pool(
         instance_pool_id).data
+    invalidate_inventory('instance_pools', 'instances')
 
     return start_instance_pool_response
 
 
-def start_all_instance_pools_in_compartment(instance_pool_ids: List[str],
-                                            filters: List[Dict[str, Any]],
-                                            configuration: Configuration = None,
-                                            compartment_id: str = None,
-                                            secrets: Secrets = None) -> OCIResponse:
+def start_all_instance_pools_in_compartment(
+        instance_pool_ids: List[str], filters: List[Dict[str, Any]],
+        configuration: Configuration = None, compartment_id: str = None,
+        secrets: Secrets = None, max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = None, plan_id: str = None,
+        track_work_requests: bool = False,
+        work_request_timeout: float = 1800) -> List[Dict[str, Any]]:
     """Start the given OCI Compute instances,  If  only an Compartment is specified, all instances in
     that Compartment will be stopped. If you need more control, you can
     also provide a list of filters following the documentation.
     Please refer to: https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.InstancePool.html#oci.core.models.Instance
-    for details on the available filters under the 'parameters' section."""
-
-    client = oci_client(ComputeManagementClient, configuration, secrets,
-                        skip_deserialization=True)
-
-    if not instance_pool_ids:
-        logger.warning('Based on configuration provided I am going to '
-                       'Start all Instance Pools in the Compartment %s! matching the filter criteria'
-                       % compartment_id)
-
-        compartment_id = compartment_id or from_file().get('compartment')
-        instance_pools = get_instance_pools(client, compartment_id)
-
-        filters = filters or None
-        if filters is not None:
-            instance_pool_ids = filter_instance_pools(instance_pools, filters=filters)
-
-        if not instance_pool_ids:
-            raise FailedActivity(
-                'No Instance Pools found matching filters: %s' % str(filters))
-
-        logger.debug('Instance Pools in Compartment %s selected: %s}.' % (
-            compartment_id, str(instance_pool_ids)))
-
-    start_instance_pool_response = []
+    for details on the available filters under the 'parameters' section.
 
-    for instance_pool_id in instance_pool_ids:
-        logger.debug("Picked Compute Instance Pool '{}' from Compartment '{}' to be started", instance_pool_id,
-                     compartment_id)
+    The Instance Pools are started concurrently, by up to `max_workers`
+    workers, and each pool's outcome is reported (see
+    `chaosoci.util.executor.run_concurrently`). Given the `plan_id` of a
+    plan made by `plan_instance_pools_in_compartment`, the planned pools are
+    acted on without listing the compartment again.
 
-        start_instance_pool_response = start_instance_pool(
-            instance_pool_id)
+    Each report names the work request the call started. With
+    `track_work_requests`, the action also waits, up to
+    `work_request_timeout` seconds, for these work requests to finish and
+    reports how each one ended and how long it took (see
+    `chaosoci.util.workrequests.wait_for_work_requests`)."""
 
-    return start_instance_pool_response
+    return _instance_pools_action(
+        'start_instance_pool', 'started', instance_pool_ids, filters,
+        configuration, compartment_id, secrets, max_workers, timeout,
+        plan_id, track_work_requests, work_request_timeout)
 
 
 def terminate_instance_pool(instance_pool_id: str,
@@ -251,53 +351,40 @@ def terminate_instance_pool(instance_pool_id: str,
 
     terminate_instance_pool_response = client.terminate_instance_pool(
         instance_pool_id).data
+    invalidate_inventory('instance_pools', 'instances')
 
     return terminate_instance_pool_response
 
 
-def terminate_all_instance_pools_in_compartment(instance_pool_ids: List[str],
-                                                filters: List[Dict[str, Any]],
-                                                configuration: Configuration = None,
-                                                compartment_id: str = None,
-                                                secrets: Secrets = None) -> OCIResponse:
+def terminate_all_instance_pools_in_compartment(
+        instance_pool_ids: List[str], filters: List[Dict[str, Any]],
+        configuration: Configuration = None, compartment_id: str = None,
+        secrets: Secrets = None, max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = None, plan_id: str = None,
+        track_work_requests: bool = False,
+        work_request_timeout: float = 1800) -> List[Dict[str, Any]]:
     """Terminate the given OCI Compute instances,  If  only an Compartment is specified, all instances in
     that Compartment will be terminated. If you need more control, you can
     also provide a list of filters following the documentation.
     Please refer to: https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.InstancePool.html#oci.core.models.Instance
-    for details on the available filters under the 'parameters' section."""
-
-    client = oci_client(ComputeManagementClient, configuration, secrets,
-                        skip_deserialization=True)
-
-    if not instance_pool_ids:
-        logger.warning('Based on configuration provided I am going to '
-                       'Terminate all Instance Pools in the Compartment %s! matching the filter criteria'
-                       % compartment_id)
-
-        compartment_id = compartment_id or from_file().get('compartment')
-        instance_pools = get_instance_pools(client, compartment_id)
-
-        filters = filters or None
-        if filters is not None:
-            instance_pool_ids = filter_instance_pools(instance_pools, filters=filters)
-
-        if not instance_pool_ids:
-            raise FailedActivity(
-                'No Instance Pools found matching filters: %s' % str(filters))
-
-        logger.debug('Instance Pools in Compartment %s selected: %s}.' % (
-            compartment_id, str(instance_pool_ids)))
+    for details on the available filters under the 'parameters' section.
 
-    terminate_instance_pool_response = []
+    The Instance Pools are terminated concurrently, by up to `max_workers`
+    workers, and each pool's outcome is reported (see
+    `chaosoci.util.executor.run_concurrently`). Given the `plan_id` of a
+    plan made by `plan_instance_pools_in_compartment`, the planned pools are
+    acted on without listing the compartment again.
 
-    for instance_pool_id in instance_pool_ids:
-        logger.debug("Picked Compute Instance Pool '{}' from Compartment '{}' to be terminated", instance_pool_id,
-                     compartment_id)
+    Each report names the work request the call started. With
+    `track_work_requests`, the action also waits, up to
+    `work_request_timeout` seconds, for these work requests to finish and
+    reports how each one ended and how long it took (see
+    `chaosoci.util.workrequests.wait_for_work_requests`)."""
 
-        terminate_instance_pool_response = terminate_instance_pool(
-            instance_pool_id)
-
-    return terminate_instance_pool_response
+    return _instance_pools_action(
+        'terminate_instance_pool', 'terminated', instance_pool_ids, filters,
+        configuration, compartment_id, secrets, max_workers, timeout,
+        plan_id, track_work_requests, work_request_timeout)
 
 
 def reset_instance_pool(instance_pool_id: str,
@@ -310,53 +397,40 @@ def reset_instance_pool(instance_pool_id: str,
 
     reset_instance_pool_response = client.reset_instance_pool(
         instance_pool_id).data
+    invalidate_inventory('instance_pools', 'instances')
 
     return reset_instance_pool_response
 
 
-def reset_all_instance_pools_in_compartment(instance_pool_ids: List[str],
-                                            filters: List[Dict[str, Any]],
-                                            configuration: Configuration = None,
-                                            compartment_id: str = None,
-                                            secrets: Secrets = None) -> OCIResponse:
+def reset_all_instance_pools_in_compartment(
+        instance_pool_ids: List[str], filters: List[Dict[str, Any]],
+        configuration: Configuration = None, compartment_id: str = None,
+        secrets: Secrets = None, max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = None, plan_id: str = None,
+        track_work_requests: bool = False,
+        work_request_timeout: float = 1800) -> List[Dict[str, Any]]:
     """Reset the given OCI Compute Instance Pools,  If  only an Compartment is specified, all Instance Pools in
     that Compartment will be Reset. If you need more control, you can
     also provide a list of filters following the documentation.
     Please refer to: https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.InstancePool.html#oci.core.models.Instance
-    for details on the available filters under the 'parameters' section."""
-
-    client = oci_client(ComputeManagementClient, configuration, secrets,
-                        skip_deserialization=True)
-
-    if not instance_pool_ids:
-        logger.warning('Based on configuration provided I am going to '
-                       'Reset all Instance Pools in the Compartment %s! matching the filter criteria'
-                       % compartment_id)
-
-        compartment_id = compartment_id or from_file().get('compartment')
-        instance_pools = get_instance_pools(client, compartment_id)
-
-        filters = filters or None
-        if filters is not None:
-            instance_pool_ids = filter_instance_pools(instance_pools, filters=filters)
-
-        if not instance_pool_ids:
-            raise FailedActivity(
-                'No instances found matching filters: %s' % str(filters))
-
-        logger.debug('Instance Pools in Compartment %s selected: %s}.' % (
-            compartment_id, str(instance_pool_ids)))
-
-    reset_instance_pool_response = []
+    for details on the available filters under the 'parameters' section.
 
-    for instance_pool_id in instance_pool_ids:
-        logger.debug("Picked Compute Instance Pool '{}' from Compartment '{}' to be reset", instance_pool_id,
-                     compartment_id)
+    The Instance Pools are reset concurrently, by up to `max_workers`
+    workers, and each pool's outcome is reported (see
+    `chaosoci.util.executor.run_concurrently`). Given the `plan_id` of a
+    plan made by `plan_instance_pools_in_compartment`, the planned pools are
+    acted on without listing the compartment again.
 
-        reset_instance_pool_response = reset_instance_pool(
-            instance_pool_id)
+    Each report names the work request the call started. With
+    `track_work_requests`, the action also waits, up to
+    `work_request_timeout` seconds, for these work requests to finish and
+    reports how each one ended and how long it took (see
+    `chaosoci.util.workrequests.wait_for_work_requests`)."""
 
-    return reset_instance_pool_response
+    return _instance_pools_action(
+        'reset_instance_pool', 'reset', instance_pool_ids, filters,
+        configuration, compartment_id, secrets, max_workers, timeout,
+        plan_id, track_work_requests, work_request_timeout)
 
 
 def softreset_instance_pool(instance_pool_id: str,
@@ -369,50 +443,201 @@ def softreset_instance_pool(instance_pool_id: str,
 
     softreset_instance_pool_response = client.softreset_instance_pool(
         instance_pool_id).data
+    invalidate_inventory('instance_pools', 'instances')
 
     return softreset_instance_pool_response
 
 
-def softreset_all_instance_pools_in_compartment(instance_pool_ids: List[str],
-                                                filters: List[Dict[str, Any]],
-                                                configuration: Configuration = None,
-                                                compartment_id: str = None,
-                                                secrets: Secrets = None) -> OCIResponse:
+def softreset_all_instance_pools_in_compartment(
+        instance_pool_ids: List[str], filters: List[Dict[str, Any]],
+        configuration: Configuration = None, compartment_id: str = None,
+        secrets: Secrets = None, max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = None, plan_id: str = None,
+        track_work_requests: bool = False,
+        work_request_timeout: float = 1800) -> List[Dict[str, Any]]:
     """SoftReset the given OCI Compute Instance Pools,  If  only an Compartment is specified, all Instance Pools in
     that Compartment will be SoftReset. If you need more control, you can
     also provide a list of filters following the documentation.
     Please refer to: https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.InstancePool.html#oci.core.models.Instance
-    for details on the available filters under the 'parameters' section."""
+    for details on the available filters under the 'parameters' section.
+
+    The Instance Pools are soft reset concurrently, by up to `max_workers`
+    workers, and each pool's outcome is reported (see
+    `chaosoci.util.executor.run_concurrently`). Given the `plan_id` of a
+    plan made by `plan_instance_pools_in_compartment`, the planned pools are
+    acted on without listing the compartment again.
+
+    Each report names the work request the call started. With
+    `track_work_requests`, the action also waits, up to
+    `work_request_timeout` seconds, for these work requests to finish and
+    reports how each one ended and how long it took (see
+    `chaosoci.util.workrequests.wait_for_work_requests`)."""
+
+    return _instance_pools_action(
+        'softreset_instance_pool', 'soft reset', instance_pool_ids, filters,
+        configuration, compartment_id, secrets, max_workers, timeout,
+        plan_id, track_work_requests, work_request_timeout)
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _stop_sampled_instances(filters: List[Dict[str, Any]],
+                            compartment_id: str, force: bool = False,
+                            configuration: Configuration = None,
+                            secrets: Secrets = None, count: int = None,
+                            percentage: float = None, seed: Any = None,
+                            max_workers: int = DEFAULT_MAX_WORKERS,
+                            timeout: float = None) -> List[Dict[str, Any]]:
+    """
+    Stream the compartment's instances, sample the ones matching the
+    filters and stop them concurrently.
+    """
+    client = oci_client(ComputeClient, configuration, secrets,
+                        skip_deserialization=True)
 
+    instances = iter_filtered(
+        iter_instances(client, compartment_id, raw=True,
+                       prefetch=prefetch_pages(configuration),
+                       **instance_list_filters(filters)),
+        filters or None, 'instances')
+    instance_ids = sample_stream(instances, count=count,
+                                 percentage=percentage, seed=seed,
+                                 key=lambda instance: instance.id)
+    if not instance_ids:
+        raise FailedActivity(
+            'No instances found matching filters: %s' % str(filters))
+
+    logger.debug("Picked Compute Instances %s from Compartment '%s' to be "
+                 "stopped", instance_ids, compartment_id)
+
+    reports = run_concurrently(
+        lambda instance_id: stop_instance(instance_id, force, configuration,
+                                          secrets),
+        instance_ids, max_workers=max_workers, timeout=timeout)
+    summarize(reports, 'instance stops')
+    return reports
+
+
+def _instance_pools_action(operation: str, verb: str,
+                           instance_pool_ids: List[str],
+                           filters: List[Dict[str, Any]],
+                           configuration: Configuration = None,
+                           compartment_id: str = None,
+                           secrets: Secrets = None,
+                           max_workers: int = DEFAULT_MAX_WORKERS,
+                           timeout: float = None,
+                           plan_id: str = None,
+                           track_work_requests: bool = False,
+                           work_request_timeout: float = 1800
+                           ) -> List[Dict[str, Any]]:
+    """
+    Run the ComputeManagementClient `operation` on the given Instance Pools,
+    on those of the plan `plan_id`, or on those of the compartment matching
+    the filters, concurrently, and return the outcome for every pool, along
+    with that of its work request when `track_work_requests` is set.
+    """
     client = oci_client(ComputeManagementClient, configuration, secrets,
                         skip_deserialization=True)
 
-    if not instance_pool_ids:
+    if not instance_pool_ids and plan_id:
+        plan = load_plan(plan_id, 'instance_pools', configuration)
+        compartment_id = plan['scope'].get('compartment_id', compartment_id)
+        instance_pool_ids = plan['targets']
+        if not instance_pool_ids:
+            raise FailedActivity('No Instance Pools were planned in plan %s'
+                                 % plan_id)
+    elif not instance_pool_ids:
         logger.warning('Based on configuration provided I am going to '
-                       'terminate all Instance Pools in the Compartment %s! matching the filter criteria'
-                       % compartment_id)
+                       'have all Instance Pools in the Compartment %s '
+                       'matching the filter criteria %s!',
+                       compartment_id, verb)
 
-        compartment_id = compartment_id or from_file().get('compartment')
-        instance_pools = get_instance_pools(client, compartment_id)
+        compartment_id = get_compartment_id(compartment_id, configuration)
+        instance_pools = get_instance_pools(
+            client, compartment_id, raw=True,
+            prefetch=prefetch_pages(configuration),
+            **instance_pool_list_filters(filters))
 
         filters = filters or None
         if filters is not None:
-            instance_pool_ids = filter_instance_pools(instance_pools, filters=filters)
+            instance_pools = filter_instance_pools(instance_pools,
+                                                   filters=filters)
+
+        instance_pool_ids = [pool.id for pool in instance_pools]
 
         if not instance_pool_ids:
             raise FailedActivity(
                 'No Instance Pools found matching filters: %s' % str(filters))
 
-        logger.debug('Instance Pools in Compartment %s selected: %s}.' % (
-            compartment_id, str(instance_pool_ids)))
-
-    softreset_instance_pool_response = []
-
-    for instance_pool_id in instance_pool_ids:
-        logger.debug("Picked Compute Instance Pool '{}' from Compartment '{}' to be stopped", instance_pool_id,
-                     compartment_id)
-
-        softreset_instance_pool_response = softreset_instance_pool(
-            instance_pool_id)
-
-    return softreset_instance_pool_response
+        logger.debug('Instance Pools in Compartment %s selected: %s.',
+                     compartment_id, instance_pool_ids)
+
+    call = getattr(client, operation)
+    work_request_client = None
+    if track_work_requests:
+        work_request_client = oci_client(WorkRequestClient, configuration,
+                                         secrets, skip_deserialization=False)
+    work_request_ids = {}  # type: Dict[str, str]
+    # work requests accepted a little before the calls are still theirs, to
+    # make up for any clock skew with the service
+    since = datetime.now(timezone.utc) - timedelta(minutes=1)
+
+    def act(instance_pool_id: str) -> OCIResponse:
+        logger.debug("Picked Compute Instance Pool '%s' from Compartment "
+                     "'%s' to be %s", instance_pool_id, compartment_id, verb)
+        response = call(instance_pool_id)
+        work_request = work_request_id(response)
+        if work_request is None and work_request_client is not None:
+            work_request = find_work_request(
+                work_request_client,
+                get_compartment_id(compartment_id, configuration),
+                instance_pool_id, since)
+        work_request_ids[instance_pool_id] = work_request
+        return response.data
+
+    try:
+        reports = run_concurrently(act, instance_pool_ids,
+                                   max_workers=max_workers, timeout=timeout)
+    finally:
+        invalidate_inventory('instance_pools', 'instances')
+
+    summarize(reports, 'Instance Pool {} calls'.format(operation))
+    for report in reports:
+        report['work_request_id'] = work_request_ids.get(report['id'])
+
+    if work_request_client is not None:
+        _track_work_requests(work_request_client, reports, max_workers,
+                             work_request_timeout)
+    return reports
+
+
+def _track_work_requests(client: WorkRequestClient,
+                         reports: List[Dict[str, Any]], max_workers: int,
+                         timeout: float):
+    """
+    Wait for the work requests named in the reports and add their outcome
+    to the reports, as `work_request`.
+    """
+    work_request_ids = [report['work_request_id'] for report in reports
+                        if report['work_request_id']]
+    if not work_request_ids:
+        logger.warning("No work requests were found to track")
+        return
+
+    tracked = wait_for_work_requests(client, work_request_ids,
+                                     timeout=timeout,
+                                     max_workers=max_workers)
+    for report in reports:
+        if report['work_request_id']:
+            report['work_request'] = \
+                tracked['work_requests'][report['work_request_id']]
+
+    if not tracked['success']:
+        logger.warning("Not every work request succeeded within %ss: %s",
+                       timeout, ', '.join(
+                           '{} ({})'.format(request_id,
+                                            work_request['status'])
+                           for request_id, work_request in
+                           tracked['work_requests'].items()
+                           if work_request['status'] != 'SUCCEEDED'))
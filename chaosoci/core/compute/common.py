@@ -1,103 +1,124 @@
 # -*- coding: utf-8 -*-
-__all__ = ["get_instances", "filter_instances", "get_instance_pools", "filter_instance_pools"]
+__all__ = ["get_instances", "iter_instances", "filter_instances",
+           "get_instance_pools", "iter_instance_pools",
+           "filter_instance_pools",
+           "instance_list_filters", "instance_pool_list_filters"]
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Union
 
 from chaoslib.exceptions import ActivityFailed
 
 from logzero import logger
 
 from oci.core import ComputeClient, ComputeManagementClient
-from oci.core.models import Instance, InstancePool
+from oci.core.models import Instance, InstancePool, InstancePoolSummary
 
+from chaosoci.util.filters import filter_resources, pushdown_filters
+from chaosoci.util.pagination import paginate
+from chaosoci.util.rawjson import paginate_raw
+from chaosoci.util.records import compact_records
 
-def get_instances(client: ComputeClient = None,
-                  compartment_id: str = None) -> List[Instance]:
-    """Return a complete, unfiltered list of instances in the compartment."""
-    instances = []
-
-    instances_raw = client.list_instances(compartment_id=compartment_id)
-    instances.extend(instances_raw.data)
-    while instances_raw.has_next_page:
-        instances_raw = client.list_instances(compartment_id=compartment_id,
-                                              page=instances_raw.next_page)
-        instances.extend(instances_raw.data)
-
-    return instances
+# Filters that ComputeClient.list_instances and
+# ComputeManagementClient.list_instance_pools accept as query parameters.
+INSTANCE_LIST_FILTERS = ('availability_domain', 'display_name',
+                         'lifecycle_state')
+INSTANCE_POOL_LIST_FILTERS = ('display_name', 'lifecycle_state')
 
 
-def filter_instances(instances: List[Instance] = None,
+def get_instances(client: ComputeClient = None,
+                  compartment_id: str = None,
+                  prefetch: int = 0,
+                  compact: Union[bool, Sequence[str]] = False,
+                  raw: bool = False,
+                  **list_filters) -> List[Instance]:
+    """
+    Return a complete list of instances in the compartment, unfiltered
+    unless server-side `list_filters` are given (see
+    `instance_list_filters`).
+    """
+    resources = iter_instances(client, compartment_id, prefetch=prefetch,
+                               raw=raw, **list_filters)
+    if compact:
+        resources = compact_records(resources, 'instances', compact)
+    return list(resources)
+
+
+def iter_instances(client: ComputeClient = None,
+                   compartment_id: str = None,
+                   prefetch: int = 0, raw: bool = False,
+                   **list_filters) -> Iterator[Instance]:
+    """
+    Lazily yield the instances in the compartment, page by page. With `raw`
+    set, and a client built with `skip_deserialization=True`, raw records
+    are yielded instead of `Instance` models.
+    """
+    if raw:
+        return paginate_raw(client.list_instances, Instance,
+                            compartment_id=compartment_id,
+                            prefetch=prefetch, **list_filters)
+    return paginate(client.list_instances, compartment_id=compartment_id,
+                    prefetch=prefetch, **list_filters)
+
+
+def instance_list_filters(filters: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Return the filters that `list_instances` can apply server-side, to be
+    passed to `get_instances` or `iter_instances`.
+    """
+    return pushdown_filters(filters, INSTANCE_LIST_FILTERS)
+
+
+def filter_instances(instances: Iterable[Instance] = None,
                      filters: Dict[str, Any] = None) -> List[Instance]:
     """Return only those instances that match the filters provided."""
-    instances = instances or None
-
-    if instances is None:
-        raise ActivityFailed('No instances were found.')
-
-    filters_set = {x for x in filters}
-    available_filters_set = {x for x in instances[0].attribute_map}
-
-    # Partial filtering may return instances we do not want. We avoid it.
-    if not filters_set.issubset(available_filters_set):
-        raise ActivityFailed('Some of the chosen filters were not found,'
-                             ' we cannot continue.')
-
-    # Walk the instances and find those that match the given filters.
-    filtered = []
-    for instance in instances:
-        sentinel = True
-        for attr, val in filters.items():
-            if val != getattr(instance, attr, None):
-                sentinel = False
-                break
-
-        if sentinel:
-            filtered.append(instance)
-
-    return filtered
+    return filter_resources(instances or [], filters, 'instances')
 
 
 def get_instance_pools(client: ComputeManagementClient = None,
-                       compartment_id: str = None) -> List[InstancePool]:
-    """Return a complete, unfiltered list of Instance Pools in the compartment."""
-    instance_pools = []
-
-    instances_pool_raw = client.list_instance_pools(compartment_id=compartment_id)
-    instance_pools.extend(instances_pool_raw.data)
-    while instances_pool_raw.has_next_page:
-        instances_pool_raw = client.list_instances(compartment_id=compartment_id,
-                                                   page=instances_pool_raw.next_page)
-        instance_pools.extend(instances_pool_raw.data)
-
-    return instance_pools
-
-
-def filter_instance_pools(instance_pools: List[InstancePool] = None,
+                       compartment_id: str = None,
+                       prefetch: int = 0,
+                       compact: Union[bool, Sequence[str]] = False,
+                       raw: bool = False,
+                       **list_filters) -> List[InstancePool]:
+    """
+    Return a complete list of Instance Pools in the compartment, unfiltered
+    unless server-side `list_filters` are given (see
+    `instance_pool_list_filters`).
+    """
+    resources = iter_instance_pools(client, compartment_id, prefetch=prefetch,
+                                    raw=raw, **list_filters)
+    if compact:
+        resources = compact_records(resources, 'instance_pools', compact)
+    return list(resources)
+
+
+def iter_instance_pools(client: ComputeManagementClient = None,
+                        compartment_id: str = None,
+                        prefetch: int = 0,
+                        raw: bool = False,
+                        **list_filters) -> Iterator[InstancePool]:
+    """
+    Lazily yield the Instance Pools in the compartment, page by page. See
+    `iter_instances` for the meaning of `raw`.
+    """
+    if raw:
+        return paginate_raw(client.list_instance_pools, InstancePoolSummary,
+                            compartment_id=compartment_id,
+                            prefetch=prefetch, **list_filters)
+    return paginate(client.list_instance_pools, compartment_id=compartment_id,
+                    prefetch=prefetch, **list_filters)
+
+
+def instance_pool_list_filters(
+        filters: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Return the filters that `list_instance_pools` can apply server-side, to
+    be passed to `get_instance_pools` or `iter_instance_pools`.
+    """
+    return pushdown_filters(filters, INSTANCE_POOL_LIST_FILTERS)
+
+
+def filter_instance_pools(instance_pools: Iterable[InstancePool] = None,
                           filters: Dict[str, Any] = None) -> List[InstancePool]:
     """Return only those Instance Pools that match the filters provided."""
-    instance_pools = instance_pools or None
-
-    if instance_pools is None:
-        raise ActivityFailed('No Instance Pools were found.')
-
-    filters_set = {x for x in filters}
-    available_filters_set = {x for x in instance_pools[0].attribute_map}
-
-    # Partial filtering may return instances we do not want. We avoid it.
-    if not filters_set.issubset(available_filters_set):
-        raise ActivityFailed('Some of the chosen filters were not found,'
-                             ' we cannot continue.')
-
-    # Walk the instances and find those that match the given filters.
-    filtered = []
-    for instance_pool in instance_pools:
-        sentinel = True
-        for attr, val in filters.items():
-            if val != getattr(instance_pool, attr, None):
-                sentinel = False
-                break
-
-        if sentinel:
-            filtered.append(instance_pool)
-
-    return filtered
+    return filter_resources(instance_pools or [], filters, 'Instance Pools')
@@ -1,17 +1,31 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Sequence, Union
 
 from chaoslib.exceptions import ActivityFailed
 from chaoslib.types import Configuration, Secrets
 
-from oci.config import from_file
 from oci.core import ComputeClient, ComputeManagementClient
 
-from chaosoci import oci_client
+from chaosoci import get_compartment_id, oci_client
+from chaosoci.util.cache import cached_inventory, client_scope
+from chaosoci.util.filters import count_by
+from chaosoci.util.pagination import prefetch_pages
+from chaosoci.util.records import compact_listings
+from chaosoci.util.plans import create_plan
+from chaosoci.util.stats import DEFAULT_BUCKETS
+from chaosoci.util.waiter import measure_recovery, wait_for_states
 
-from .common import filter_instances, get_instances, get_instance_pools
+from .common import (filter_instances, filter_instance_pools,
+                     get_instances, get_instance_pools,
+                     instance_list_filters, instance_pool_list_filters,
+                     iter_instances, iter_instance_pools)
 
-__all__ = ['count_instances', 'count_instance_pools']
+__all__ = ['count_instances', 'count_instance_pools',
+           'count_instances_by', 'count_instance_pools_by',
+           'wait_for_instances_state', 'wait_for_instance_pools_state',
+           'measure_instances_recovery', 'measure_instance_pools_recovery',
+           'plan_stop_instances_in_compartment',
+           'plan_instance_pools_in_compartment']
 
 
 def count_instances(filters: List[Dict[str, Any]], compartment_id: str = None,
@@ -24,7 +38,7 @@ def count_instances(filters: List[Dict[str, Any]], compartment_id: str = None,
 
     for details on the available filters under the 'parameters' section.
     """  # noqa: E501
-    compartment_id = compartment_id or from_file().get('compartment')
+    compartment_id = get_compartment_id(compartment_id, configuration)
 
     if compartment_id is None:
         raise ActivityFailed('We have not been able to find a compartment,'
@@ -34,7 +48,14 @@ def count_instances(filters: List[Dict[str, Any]], compartment_id: str = None,
                         skip_deserialization=False)
 
     filters = filters or None
-    instances = get_instances(client, compartment_id)
+    list_filters = instance_list_filters(filters)
+    instances = cached_inventory(
+        'instances', (client_scope(client), compartment_id, list_filters),
+        lambda: get_instances(client, compartment_id,
+                              prefetch=prefetch_pages(configuration),
+                              compact=compact_listings(configuration),
+                              **list_filters),
+        configuration)
 
     if filters is not None:
         return len(filter_instances(instances, filters=filters))
@@ -52,7 +73,7 @@ def count_instance_pools(filters: List[Dict[str, Any]], compartment_id: str = No
 
     for details on the available filters under the 'parameters' section.
     """  # noqa: E501
-    compartment_id = compartment_id or from_file().get('compartment')
+    compartment_id = get_compartment_id(compartment_id, configuration)
 
     if compartment_id is None:
         raise ActivityFailed('We have not been able to find a compartment,'
@@ -62,9 +83,295 @@ def count_instance_pools(filters: List[Dict[str, Any]], compartment_id: str = No
                         skip_deserialization=False)
 
     filters = filters or None
-    instance_pools = get_instance_pools(client, compartment_id)
+    list_filters = instance_pool_list_filters(filters)
+    instance_pools = cached_inventory(
+        'instance_pools', (client_scope(client), compartment_id, list_filters),
+        lambda: get_instance_pools(client, compartment_id,
+                                   prefetch=prefetch_pages(configuration),
+                                   compact=compact_listings(configuration),
+                                   **list_filters),
+        configuration)
 
     if filters is not None:
         return len(filter_instances(instance_pools, filters=filters))
 
     return len(instance_pools)
+
+
+def count_instances_by(group_by: Union[str, List[str]] = "lifecycle_state",
+                       filters: Dict[str, Any] = None,
+                       compartment_id: str = None,
+                       configuration: Configuration = None,
+                       secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Return the number of instances matching the filters for each value of
+    the `group_by` attribute, e.g. `{"RUNNING": 12, "STOPPED": 3}`, from a
+    single listing of the compartment. With a list of attributes, such as
+    `["fault_domain", "lifecycle_state"]`, the counts are nested.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None:
+        raise ActivityFailed('We have not been able to find a compartment,'
+                             ' without one, we cannot continue.')
+
+    client = oci_client(ComputeClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    list_filters = instance_list_filters(filters)
+    instances = cached_inventory(
+        'instances', (client_scope(client), compartment_id, list_filters),
+        lambda: get_instances(client, compartment_id,
+                              prefetch=prefetch_pages(configuration),
+                              compact=compact_listings(configuration),
+                              **list_filters),
+        configuration)
+
+    return count_by(instances, group_by, filters)
+
+
+def count_instance_pools_by(
+        group_by: Union[str, List[str]] = "lifecycle_state",
+        filters: Dict[str, Any] = None, compartment_id: str = None,
+        configuration: Configuration = None,
+        secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Return the number of instance pools matching the filters for each
+    value of the `group_by` attribute, from a single listing of the
+    compartment. See `count_instances_by`.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None:
+        raise ActivityFailed('We have not been able to find a compartment,'
+                             ' without one, we cannot continue.')
+
+    client = oci_client(ComputeManagementClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    list_filters = instance_pool_list_filters(filters)
+    instance_pools = cached_inventory(
+        'instance_pools', (client_scope(client), compartment_id, list_filters),
+        lambda: get_instance_pools(client, compartment_id,
+                                   prefetch=prefetch_pages(configuration),
+                                   compact=compact_listings(configuration),
+                                   **list_filters),
+        configuration)
+
+    return count_by(instance_pools, group_by, filters)
+
+
+def plan_stop_instances_in_compartment(filters: List[Dict[str, Any]] = None,
+                                       compartment_id: str = None,
+                                       configuration: Configuration = None,
+                                       secrets: Secrets = None
+                                       ) -> Dict[str, Any]:
+    """
+    Resolve, without stopping anything, the instances
+    `stop_instances_in_compartment` would stop with these filters, and
+    record them as a plan (see `chaosoci.util.plans.create_plan`).
+
+    Passing the returned `plan_id` to `stop_instances_in_compartment` stops
+    exactly the planned instances, without listing the compartment again.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None:
+        raise ActivityFailed('We have not been able to find a compartment,'
+                             ' without one, we cannot continue.')
+
+    client = oci_client(ComputeClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    # A plan is approved as what the action will act on, so it is resolved
+    # from a fresh listing rather than from the inventory cache.
+    instances = get_instances(client, compartment_id,
+                              prefetch=prefetch_pages(configuration),
+                              compact=compact_listings(configuration),
+                              **instance_list_filters(filters))
+    if filters:
+        instances = filter_instances(instances=instances, filters=filters)
+
+    return create_plan('instances', [instance.id for instance in instances],
+                       {'compartment_id': compartment_id,
+                        'filters': filters or []},
+                       configuration)
+
+
+def plan_instance_pools_in_compartment(filters: List[Dict[str, Any]] = None,
+                                       compartment_id: str = None,
+                                       configuration: Configuration = None,
+                                       secrets: Secrets = None
+                                       ) -> Dict[str, Any]:
+    """
+    Resolve, without acting on them, the instance pools the
+    `*_all_instance_pools_in_compartment` actions would act on with these
+    filters, and record them as a plan to pass to one of these actions as
+    `plan_id`. See `plan_stop_instances_in_compartment`.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None:
+        raise ActivityFailed('We have not been able to find a compartment,'
+                             ' without one, we cannot continue.')
+
+    client = oci_client(ComputeManagementClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    instance_pools = get_instance_pools(
+        client, compartment_id, prefetch=prefetch_pages(configuration),
+        compact=compact_listings(configuration),
+        **instance_pool_list_filters(filters))
+    if filters:
+        instance_pools = filter_instance_pools(instance_pools, filters=filters)
+
+    return create_plan('instance_pools',
+                       [instance_pool.id for instance_pool in instance_pools],
+                       {'compartment_id': compartment_id,
+                        'filters': filters or []},
+                       configuration)
+
+
+def wait_for_instances_state(instance_ids: List[str],
+                             state: Union[str, List[str]] = "RUNNING",
+                             compartment_id: str = None,
+                             timeout: float = 600, interval: float = 2,
+                             max_interval: float = 30,
+                             configuration: Configuration = None,
+                             secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Wait for the given instances to reach the lifecycle `state` (or one of
+    a list of states), for at most `timeout` seconds, and return how long
+    each one took.
+
+    The instances are polled with one listing of the compartment per round,
+    the rounds being `interval` seconds apart at first and backing off
+    exponentially up to `max_interval` seconds. See
+    `chaosoci.util.waiter.wait_for_states` for the returned report.
+    """
+    return wait_for_states(
+        _instance_states(compartment_id, configuration, secrets),
+        instance_ids, state, timeout=timeout, interval=interval,
+        max_interval=max_interval)
+
+
+def wait_for_instance_pools_state(instance_pool_ids: List[str],
+                                  state: Union[str, List[str]] = "RUNNING",
+                                  compartment_id: str = None,
+                                  timeout: float = 600, interval: float = 2,
+                                  max_interval: float = 30,
+                                  configuration: Configuration = None,
+                                  secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Wait for the given instance pools to reach the lifecycle `state` (or
+    one of a list of states), for at most `timeout` seconds, and return how
+    long each one took. See `wait_for_instances_state`.
+    """
+    return wait_for_states(
+        _instance_pool_states(compartment_id, configuration, secrets),
+        instance_pool_ids, state, timeout=timeout, interval=interval,
+        max_interval=max_interval)
+
+
+def measure_instances_recovery(instance_ids: List[str],
+                               state: Union[str, List[str]] = "RUNNING",
+                               started_at: Union[str, float] = None,
+                               compartment_id: str = None,
+                               timeout: float = 1800, interval: float = 2,
+                               max_interval: float = 30,
+                               buckets: Sequence[float] = DEFAULT_BUCKETS,
+                               disrupted_first: bool = True,
+                               configuration: Configuration = None,
+                               secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Measure how long the given instances take to return to `state` after a
+    disruption, and summarise the recovery times as percentiles and a
+    histogram for the journal.
+
+    Times are counted from `started_at`, when the action ran, in seconds
+    since the epoch or as an ISO 8601 timestamp, or else from when the
+    probe starts. An instance is only timed once it has been seen out of
+    `state`, unless `disrupted_first` is unset. See
+    `chaosoci.util.waiter.measure_recovery`.
+    """
+    return measure_recovery(
+        _instance_states(compartment_id, configuration, secrets),
+        instance_ids, state, started_at=started_at, buckets=buckets,
+        disrupted_first=disrupted_first, timeout=timeout,
+        interval=interval, max_interval=max_interval)
+
+
+def measure_instance_pools_recovery(instance_pool_ids: List[str],
+                                    state: Union[str, List[str]] = "RUNNING",
+                                    started_at: Union[str, float] = None,
+                                    compartment_id: str = None,
+                                    timeout: float = 1800, interval: float = 2,
+                                    max_interval: float = 30,
+                                    buckets: Sequence[float] = DEFAULT_BUCKETS,
+                                    disrupted_first: bool = True,
+                                    configuration: Configuration = None,
+                                    secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Measure how long the given instance pools take to return to `state`
+    after a disruption. See `measure_instances_recovery`.
+    """
+    return measure_recovery(
+        _instance_pool_states(compartment_id, configuration, secrets),
+        instance_pool_ids, state, started_at=started_at, buckets=buckets,
+        disrupted_first=disrupted_first, timeout=timeout,
+        interval=interval, max_interval=max_interval)
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _instance_states(compartment_id: str = None,
+                     configuration: Configuration = None,
+                     secrets: Secrets = None
+                     ) -> Callable[[], Dict[str, str]]:
+    """
+    Return a poll listing the lifecycle state of every instance in the
+    compartment in a single paginated call.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None:
+        raise ActivityFailed('We have not been able to find a compartment,'
+                             ' without one, we cannot continue.')
+
+    client = oci_client(ComputeClient, configuration, secrets,
+                        skip_deserialization=True)
+
+    def poll() -> Dict[str, str]:
+        return {instance.id: instance.lifecycle_state
+                for instance in iter_instances(
+                    client, compartment_id, raw=True,
+                    prefetch=prefetch_pages(configuration))}
+
+    return poll
+
+
+def _instance_pool_states(compartment_id: str = None,
+                          configuration: Configuration = None,
+                          secrets: Secrets = None
+                          ) -> Callable[[], Dict[str, str]]:
+    """
+    Return a poll listing the lifecycle state of every instance pool in the
+    compartment in a single paginated call.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None:
+        raise ActivityFailed('We have not been able to find a compartment,'
+                             ' without one, we cannot continue.')
+
+    client = oci_client(ComputeManagementClient, configuration, secrets,
+                        skip_deserialization=True)
+
+    def poll() -> Dict[str, str]:
+        return {pool.id: pool.lifecycle_state
+                for pool in iter_instance_pools(
+                    client, compartment_id, raw=True,
+                    prefetch=prefetch_pages(configuration))}
+
+    return poll
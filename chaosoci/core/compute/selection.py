@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+__all__ = ["STRATEGIES", "group_by_domain", "select_targets"]
+
+from collections import OrderedDict
+from random import Random
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from chaoslib.exceptions import ActivityFailed
+
+from oci.core.models import Instance
+
+# Where to stop instances in order to control the blast radius:
+#   - one_per_fault_domain: one instance in every fault domain;
+#   - whole_fault_domain: every instance of a single fault domain, the one
+#     given or one picked at random, as when the fault domain fails;
+#   - weighted_spread: `count` instances spread across the fault domains in
+#     proportion to their size, or to the weights given.
+STRATEGIES = ("one_per_fault_domain", "whole_fault_domain", "weighted_spread")
+
+Domain = Tuple[str, str]
+
+
+def group_by_domain(instances: Iterable[Instance]
+                    ) -> Dict[Domain, List[Instance]]:
+    """
+    Group the instances by (availability domain, fault domain) in a single
+    pass over them, keeping the domains in the order they were first seen.
+    """
+    groups = OrderedDict()  # type: Dict[Domain, List[Instance]]
+    for instance in instances:
+        domain = (instance.availability_domain, instance.fault_domain)
+        groups.setdefault(domain, []).append(instance)
+    return groups
+
+
+def select_targets(instances: Iterable[Instance], strategy: str,
+                   count: int = None, fault_domain: str = None,
+                   availability_domain: str = None,
+                   weights: Dict[str, float] = None,
+                   seed: Any = None) -> List[Instance]:
+    """
+    Pick the instances to disrupt according to the `strategy`, see
+    `STRATEGIES`.
+
+    `availability_domain` restricts the selection to that availability
+    domain and `fault_domain` names the fault domain to take down with the
+    `whole_fault_domain` strategy, in every availability domain unless one
+    is given. The `weighted_spread` weights are keyed
+    by fault domain name, e.g. `FAULT-DOMAIN-1`, or by
+    `<availability domain>/<fault domain>`; fault domains without a weight
+    are left alone when weights are given. `seed` makes the selection
+    reproducible for the same listing.
+    """
+    if strategy not in STRATEGIES:
+        raise ActivityFailed('Unknown selection strategy: {}, expected one '
+                             'of {}'.format(strategy, ', '.join(STRATEGIES)))
+
+    groups = group_by_domain(instances)
+    if availability_domain is not None:
+        groups = OrderedDict((domain, members)
+                             for domain, members in groups.items()
+                             if domain[0] == availability_domain)
+    if not groups:
+        raise ActivityFailed('No instances found to select from.')
+
+    rng = Random(seed)
+
+    if strategy == "one_per_fault_domain":
+        return [rng.choice(members) for members in groups.values()]
+
+    if strategy == "whole_fault_domain":
+        if fault_domain is None:
+            return list(groups[rng.choice(list(groups))])
+        targets = [instance for domain, members in groups.items()
+                   if domain[1] == fault_domain for instance in members]
+        if not targets:
+            raise ActivityFailed('No instances found in fault domain '
+                                 '{}'.format(fault_domain))
+        return targets
+
+    if not count or count < 0:
+        raise ActivityFailed('The weighted_spread strategy needs a positive '
+                             'count of instances to select.')
+
+    shares = _apportion(count, {
+        domain: _weight(domain, members, weights)
+        for domain, members in groups.items()},
+        {domain: len(members) for domain, members in groups.items()})
+    return [instance for domain, members in groups.items()
+            for instance in rng.sample(members, shares[domain])]
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _weight(domain: Domain, members: List[Instance],
+            weights: Optional[Dict[str, float]]) -> float:
+    if not weights:
+        return float(len(members))
+    return float(weights.get('/'.join(domain), weights.get(domain[1], 0)))
+
+
+def _apportion(count: int, weights: Dict[Domain, float],
+               capacity: Dict[Domain, int]) -> Dict[Domain, int]:
+    """
+    Share `count` slots out between the domains in proportion to their
+    weight, using the Sainte-Lague highest averages method so the split
+    stays as close to proportional as possible, and without giving a domain
+    more slots than it has instances.
+    """
+    shares = dict.fromkeys(weights, 0)
+    for _ in range(count):
+        candidates = [domain for domain, weight in weights.items()
+                      if weight > 0 and shares[domain] < capacity[domain]]
+        if not candidates:
+            break
+        domain = max(candidates,
+                     key=lambda d: weights[d] / (2 * shares[d] + 1))
+        shares[domain] += 1
+    return shares
@@ -5,6 +5,7 @@ from oci.load_balancer import LoadBalancerClient
 
 from chaosoci import oci_client
 from chaosoci.types import OCIResponse
+from chaosoci.util.cache import invalidate_inventory
 
 __all__ = ["delete_backend_server", "delete_backend_set",
            "delete_hostname", "delete_listener",
@@ -24,6 +25,7 @@ def delete_backend_server(load_balancer_id: str,
     client = oci_client(LoadBalancerClient, configuration, secrets,
                         skip_deserialization=True)
     delete_backend_response = client.delete_backend(load_balancer_id, backend_name, backend_set_name).data
+    invalidate_inventory('backend_sets')
 
     return delete_backend_response
 
@@ -37,6 +39,7 @@ def delete_backend_set(load_balancer_id: str,
                         skip_deserialization=False)
 
     delete_backend_set_response = client.delete_backend_set(load_balancer_id, backend_set_name).data
+    invalidate_inventory('backend_sets', 'load_balancers')
 
     return delete_backend_set_response
 
@@ -53,6 +56,7 @@ def delete_hostname(load_balancer_id: str,
                         skip_deserialization=True)
 
     delete_hostname_response = client.delete_hostname(load_balancer_id, load_balancer_name).data
+    invalidate_inventory('load_balancers')
 
     return delete_hostname_response
 
@@ -67,6 +71,7 @@ def delete_listener(listener_id: str,
                         skip_deserialization=True)
 
     delete_listener_response = client.delete_listener(listener_id, listener_name).data
+    invalidate_inventory('load_balancers')
 
     return delete_listener_response
 
@@ -80,6 +85,7 @@ def delete_load_balancer(load_balancer_id: str,
                         skip_deserialization=True)
 
     delete_load_balancer_response = client.delete_load_balancer(load_balancer_id).data
+    invalidate_inventory('load_balancers', 'backend_sets')
 
     return delete_load_balancer_response
 
@@ -94,6 +100,7 @@ def delete_path_route_set(load_balancer_id: str,
                         skip_deserialization=True)
 
     delete_path_route_set_response = client.delete_path_route_set(load_balancer_id, path_route_set_name).data
+    invalidate_inventory('load_balancers')
 
     return delete_path_route_set_response
 
@@ -108,5 +115,6 @@ def delete_routing_policy(load_balancer_id: str,
                         skip_deserialization=True)
 
     delete_routing_policy_response = client.delete_routing_policy(load_balancer_id, routing_policy_name).data
+    invalidate_inventory('load_balancers')
 
     return delete_routing_policy_response
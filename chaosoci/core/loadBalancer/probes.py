@@ -1,17 +1,24 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Sequence, Union
 
 from chaoslib.exceptions import ActivityFailed
 from chaoslib.types import Configuration, Secrets
 
-from oci.config import from_file
 from oci.core import ComputeClient, ComputeManagementClient
+from oci.load_balancer import LoadBalancerClient
 
-from chaosoci import oci_client
+from chaosoci import get_compartment_id, oci_client, oci_config
+from chaosoci.util.cache import cached_inventory, client_scope
+from chaosoci.util.filters import count_by
+from chaosoci.util.pagination import prefetch_pages
+from chaosoci.util.records import compact_listings
+from chaosoci.util.stats import DEFAULT_BUCKETS
+from chaosoci.util.waiter import measure_recovery
 
 from .common import get_load_balancers, get_backend_sets, filter_load_balancers
 
-__all__ = ['count_load_bal', 'count_backend_sets']
+__all__ = ['count_load_bal', 'count_backend_sets', 'count_load_bal_by',
+           'measure_backends_recovery']
 
 
 def count_load_bal(filters: List[Dict[str, Any]], compartment_id: str = None,
@@ -24,7 +31,7 @@ def count_load_bal(filters: List[Dict[str, Any]], compartment_id: str = None,
 
     for details on the available filters under the 'parameters' section.
     """  # noqa: E501
-    compartment_id = compartment_id or from_file().get('compartment')
+    compartment_id = get_compartment_id(compartment_id, configuration)
 
     if compartment_id is None:
         raise ActivityFailed('We have not been able to find a compartment,'
@@ -34,7 +41,12 @@ def count_load_bal(filters: List[Dict[str, Any]], compartment_id: str = None,
                         skip_deserialization=False)
 
     filters = filters or None
-    instances = get_load_balancers(client, compartment_id)
+    instances = cached_inventory(
+        'load_balancers', (client_scope(client), compartment_id),
+        lambda: get_load_balancers(client, compartment_id,
+                                   prefetch=prefetch_pages(configuration),
+                                   compact=compact_listings(configuration)),
+        configuration)
 
     if filters is not None:
         return len(filter_load_balancers(instances, filters=filters))
@@ -46,7 +58,7 @@ def count_backend_sets(filters: List[Dict[str, Any]], loadbalancer_id: str = Non
                        configuration: Configuration = None,
                        secrets: Secrets = None) -> int:
 
-    loadbalancer_id = loadbalancer_id or from_file().get('load_balancer')
+    loadbalancer_id = loadbalancer_id or oci_config().get('load_balancer')
 
     if loadbalancer_id is None:
         raise ActivityFailed('We have not been able to find a compartment,'
@@ -56,9 +68,114 @@ def count_backend_sets(filters: List[Dict[str, Any]], loadbalancer_id: str = Non
                         skip_deserialization=False)
 
     filters = filters or None
-    backend_sets = get_backend_sets(client, loadbalancer_id)
+    backend_sets = cached_inventory(
+        'backend_sets', (client_scope(client), loadbalancer_id),
+        lambda: get_backend_sets(client, loadbalancer_id,
+                                 prefetch=prefetch_pages(configuration),
+                                 compact=compact_listings(configuration)),
+        configuration)
 
     if filters is not None:
         return len(filter_load_balancers(backend_sets, filters=filters))
 
     return len(backend_sets)
+
+
+def count_load_bal_by(group_by: Union[str, List[str]] = "lifecycle_state",
+                      filters: Dict[str, Any] = None,
+                      compartment_id: str = None,
+                      configuration: Configuration = None,
+                      secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Return the number of load balancers matching the filters for each value
+    of the `group_by` attribute, e.g. `{"ACTIVE": 3}`, from a single listing
+    of the compartment. With a list of attributes, the counts are nested.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None:
+        raise ActivityFailed('We have not been able to find a compartment,'
+                             ' without one, we cannot continue.')
+
+    client = oci_client(LoadBalancerClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    load_balancers = cached_inventory(
+        'load_balancers', (client_scope(client), compartment_id),
+        lambda: get_load_balancers(client, compartment_id,
+                                   prefetch=prefetch_pages(configuration),
+                                   compact=compact_listings(configuration)),
+        configuration)
+
+    return count_by(load_balancers, group_by, filters)
+
+
+def measure_backends_recovery(backend_set_name: str,
+                              loadbalancer_id: str = None,
+                              backend_names: List[str] = None,
+                              started_at: Union[str, float] = None,
+                              timeout: float = 1800, interval: float = 2,
+                              max_interval: float = 30,
+                              buckets: Sequence[float] = DEFAULT_BUCKETS,
+                              disrupted_first: bool = True,
+                              configuration: Configuration = None,
+                              secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Measure how long the backends of a backend set (all of them, or those
+    named in `backend_names`, as `ip:port`) take to report an `OK` health
+    status after a disruption, and summarise the recovery times as
+    percentiles and a histogram for the journal.
+
+    The whole backend set's health is read with one call per round. A
+    backend is only timed once it has been seen out of `OK`, as health
+    checks lag behind the disruption, unless `disrupted_first` is unset.
+    See `chaosoci.core.compute.probes.measure_instances_recovery` for
+    `started_at`, and `chaosoci.util.waiter.measure_recovery` for the
+    returned report.
+    """
+    loadbalancer_id = loadbalancer_id or oci_config().get('load_balancer')
+
+    if loadbalancer_id is None:
+        raise ActivityFailed('We have not been able to find a load balancer,'
+                             ' without one, we cannot continue.')
+
+    client = oci_client(LoadBalancerClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    if not backend_names:
+        backend_set = client.get_backend_set(loadbalancer_id,
+                                             backend_set_name).data
+        backend_names = [backend.name for backend in backend_set.backends]
+
+    return measure_recovery(
+        _backend_health(client, loadbalancer_id, backend_set_name,
+                        backend_names),
+        backend_names, 'OK', started_at=started_at, buckets=buckets,
+        disrupted_first=disrupted_first, timeout=timeout, interval=interval,
+        max_interval=max_interval)
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _backend_health(client: LoadBalancerClient, loadbalancer_id: str,
+                    backend_set_name: str, backend_names: List[str]
+                    ) -> Callable[[], Dict[str, str]]:
+    """
+    Return a poll reading the health status of every backend of the set
+    from a single `get_backend_set_health` call: backends the set does not
+    list as critical, warning or unknown are healthy.
+    """
+    def poll() -> Dict[str, str]:
+        health = client.get_backend_set_health(loadbalancer_id,
+                                               backend_set_name).data
+        statuses = dict.fromkeys(backend_names, 'OK')
+        for status, names in (
+                ('UNKNOWN', health.unknown_state_backend_names),
+                ('WARNING', health.warning_state_backend_names),
+                ('CRITICAL', health.critical_state_backend_names)):
+            for name in names or ():
+                statuses[name] = status
+        return statuses
+
+    return poll
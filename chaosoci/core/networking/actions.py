@@ -3,11 +3,18 @@
 
 __all__ = ["delete_route_table_by_id", "delete_route_table_by_filters",
            "delete_nat_gateway_by_id", "delete_nat_gateway_by_filters",
-           "delete_internet_gateway_by_id", "delete_internet_gateway_by_filters",
-           "delete_service_gateway_by_id", "delete_service_gateway_by_filters"]
-
+           "delete_internet_gateway_by_id",
+           "delete_internet_gateway_by_filters",
+           "delete_service_gateway_by_id", "delete_service_gateway_by_filters",
+           "delete_route_tables_by_filters", "delete_nat_gateways_by_filters",
+           "delete_internet_gateways_by_filters",
+           "delete_service_gateways_by_filters",
+           "delete_vcn_resources_by_filters", "remove_route_rules",
+           "remove_security_rules"]
+
+from collections import OrderedDict
 from random import choice
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from chaoslib.exceptions import ActivityFailed
 from chaoslib.types import Configuration, Secrets
@@ -15,17 +22,62 @@ from oci.retry import DEFAULT_RETRY_STRATEGY
 
 from chaosoci import oci_client
 from chaosoci.types import OCIResponse
+from chaosoci.util.backups import (discard_backup, resource_definition,
+                                   save_backup)
+from chaosoci.util.cache import invalidate_inventory
 from chaosoci.util.constants import FILTER_ERR
+from chaosoci.util.executor import (DEFAULT_MAX_WORKERS, run_concurrently,
+                                    summarize)
+from chaosoci.util.pagination import paginate, prefetch_pages
+from chaosoci.util.waiter import wait_for_states
 
 from logzero import logger
 
-from oci.config import from_file
 from oci.core import VirtualNetworkClient
+from oci.core.models import (RemoveNetworkSecurityGroupSecurityRulesDetails,
+                             UpdateRouteTableDetails,
+                             UpdateSecurityListDetails, UpdateSubnetDetails)
 
-from .common import (get_route_tables, get_service_gateway, get_internet_gateway, get_nat_gateway)
+from .common import (get_route_tables, get_service_gateway,
+                     get_internet_gateway, get_nat_gateway, route_rule,
+                     route_rule_definition)
 
 from .filters import (filter_route_tables, filter_nat_gateway, filter_internet_gateway, filter_service_gateway)
 
+from .security import check_direction, rule_matches
+from .topology import VcnTopology, vcn_topology
+
+# The resource types the bulk actions delete, in the order they must be
+# deleted: route tables first, as their rules may target the gateways.
+DELETION_ORDER = ('route_tables', 'nat_gateways', 'internet_gateways',
+                  'service_gateways')
+
+# How the bulk actions filter and delete each resource type.
+_FILTERS = {
+    'route_tables': filter_route_tables,
+    'nat_gateways': filter_nat_gateway,
+    'internet_gateways': filter_internet_gateway,
+    'service_gateways': filter_service_gateway,
+}
+_LISTINGS = {
+    'route_tables': get_route_tables,
+    'nat_gateways': get_nat_gateway,
+    'internet_gateways': get_internet_gateway,
+    'service_gateways': get_service_gateway,
+}
+_DELETES = {
+    'route_tables': 'delete_route_table',
+    'nat_gateways': 'delete_nat_gateway',
+    'internet_gateways': 'delete_internet_gateway',
+    'service_gateways': 'delete_service_gateway',
+}
+_GETS = {
+    'route_tables': 'get_route_table',
+    'nat_gateways': 'get_nat_gateway',
+    'internet_gateways': 'get_internet_gateway',
+    'service_gateways': 'get_service_gateway',
+}
+
 
 def delete_route_table_by_id(rt_id: str, force: bool = False,
                              configuration: Configuration = None,
@@ -44,6 +96,7 @@ def delete_route_table_by_id(rt_id: str, force: bool = False,
         raise ActivityFailed('A route table id is required.')
 
     ret = client.delete_route_table(rt_id=rt_id).data
+    invalidate_inventory('route_tables')
     logger.debug("Route table %s deleted", rt_id)
     return ret
 
@@ -52,7 +105,8 @@ def delete_route_table_by_filters(compartment_id: str, vcn_id: str,
                                   filters: Dict[str, Any], force: bool = False,
                                   retry_strategy=None,
                                   configuration: Configuration = None,
-                                  secrets: Secrets = None) -> OCIResponse:
+                                  secrets: Secrets = None,
+                                  topology: bool = False) -> OCIResponse:
     """
     Search for a route table in VCN using the specified filters and
     then deletes it.
@@ -65,6 +119,15 @@ def delete_route_table_by_filters(compartment_id: str, vcn_id: str,
     Please refer to
     https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.RouteTable.html#
     for the route table filters.
+
+    With `topology`, the route table is looked up in a snapshot of the whole
+    VCN (see `chaosoci.core.networking.topology.VcnTopology`), and the
+    action fails without deleting anything when other resources still use
+    it.
+
+    The definition of the deleted resource is kept so that
+    `chaosoci.core.networking.rollbacks.restore_vcn_resources` can recreate
+    it.
     """
 
     client = oci_client(VirtualNetworkClient, configuration, secrets,
@@ -73,7 +136,9 @@ def delete_route_table_by_filters(compartment_id: str, vcn_id: str,
     if compartment_id is None or vcn_id is None:
         raise ActivityFailed('A compartment id or vcn id is required.')
     else:
-        unfiltered = get_route_tables(client, compartment_id, vcn_id)
+        unfiltered, snapshot = _listing(
+            'route_tables', get_route_tables, client, compartment_id, vcn_id,
+            topology, configuration, secrets)
 
         if filters is None:
             raise ActivityFailed(FILTER_ERR)
@@ -86,7 +151,12 @@ def delete_route_table_by_filters(compartment_id: str, vcn_id: str,
                 if not retry_strategy:
                     retry_strategy = DEFAULT_RETRY_STRATEGY
 
-                ret = client.delete_route_table(filtered[0].id, retry_strategy).data
+                _ensure_unreferenced(snapshot, filtered[0])
+
+                ret = _delete(client, 'route_tables', filtered[0], vcn_id,
+                              retry_strategy, configuration)
+
+                invalidate_inventory('route_tables')
                 logger.debug("Route table %s deleted",
                              filtered[0].display_name)
                 return ret
@@ -109,6 +179,7 @@ def delete_nat_gateway_by_id(nw_id: str, force: bool = False,
         raise ActivityFailed('A Nat Gateway id is required.')
 
     ret = client.delete_nat_gateway(nw_id=nw_id).data
+    invalidate_inventory('nat_gateways')
     logger.debug("Nat Gateway %s deleted", nw_id)
     return ret
 
@@ -117,7 +188,8 @@ def delete_nat_gateway_by_filters(compartment_id: str, vcn_id: str,
                                   filters: Dict[str, Any], force: bool = False,
                                   retry_strategy=None,
                                   configuration: Configuration = None,
-                                  secrets: Secrets = None) -> OCIResponse:
+                                  secrets: Secrets = None,
+                                  topology: bool = False) -> OCIResponse:
     """
     Search for a Nat Gateway in VCN using the specified filters and
     then deletes it.
@@ -130,6 +202,15 @@ def delete_nat_gateway_by_filters(compartment_id: str, vcn_id: str,
     Please refer to
     https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.NatGateway.html#
     for the Nat Gateway filters.
+
+    With `topology`, the Nat Gateway is looked up in a snapshot of the whole
+    VCN (see `chaosoci.core.networking.topology.VcnTopology`), and the
+    action fails without deleting anything when other resources still use
+    it.
+
+    The definition of the deleted resource is kept so that
+    `chaosoci.core.networking.rollbacks.restore_vcn_resources` can recreate
+    it.
     """
 
     client = oci_client(VirtualNetworkClient, configuration, secrets,
@@ -138,7 +219,9 @@ def delete_nat_gateway_by_filters(compartment_id: str, vcn_id: str,
     if compartment_id is None or vcn_id is None:
         raise ActivityFailed('A compartment id or vcn id is required.')
     else:
-        unfiltered = get_nat_gateway(client, compartment_id, vcn_id)
+        unfiltered, snapshot = _listing(
+            'nat_gateways', get_nat_gateway, client, compartment_id, vcn_id,
+            topology, configuration, secrets)
 
         if filters is None:
             raise ActivityFailed(FILTER_ERR)
@@ -151,7 +234,12 @@ def delete_nat_gateway_by_filters(compartment_id: str, vcn_id: str,
                 if not retry_strategy:
                     retry_strategy = DEFAULT_RETRY_STRATEGY
 
-                ret = client.delete_nat_gateway(filtered[0].id, retry_strategy).data
+                _ensure_unreferenced(snapshot, filtered[0])
+
+                ret = _delete(client, 'nat_gateways', filtered[0], vcn_id,
+                              retry_strategy, configuration)
+
+                invalidate_inventory('nat_gateways')
                 logger.debug("Nat Gateway %s deleted",
                              filtered[0].display_name)
                 return ret
@@ -174,6 +262,7 @@ def delete_internet_gateway_by_id(nw_id: str, force: bool = False,
         raise ActivityFailed('A Internet Gateway id is required.')
 
     ret = client.delete_internet_gateway(ig_id=nw_id).data
+    invalidate_inventory('internet_gateways')
     logger.debug("Internet Gateway %s deleted", nw_id)
     return ret
 
@@ -182,7 +271,8 @@ def delete_internet_gateway_by_filters(compartment_id: str, vcn_id: str,
                                        filters: Dict[str, Any], force: bool = False,
                                        retry_strategy=None,
                                        configuration: Configuration = None,
-                                       secrets: Secrets = None) -> OCIResponse:
+                                       secrets: Secrets = None,
+                                       topology: bool = False) -> OCIResponse:
     """
     Search for a Internet Gateway in VCN using the specified filters and
     then deletes it.
@@ -195,6 +285,15 @@ def delete_internet_gateway_by_filters(compartment_id: str, vcn_id: str,
     Please refer to
     https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.InternetGateway.html#
     for the Internet Gateway filters.
+
+    With `topology`, the Internet Gateway is looked up in a snapshot of the
+    whole VCN (see `chaosoci.core.networking.topology.VcnTopology`), and the
+    action fails without deleting anything when other resources still use
+    it.
+
+    The definition of the deleted resource is kept so that
+    `chaosoci.core.networking.rollbacks.restore_vcn_resources` can recreate
+    it.
     """
 
     client = oci_client(VirtualNetworkClient, configuration, secrets,
@@ -203,7 +302,9 @@ def delete_internet_gateway_by_filters(compartment_id: str, vcn_id: str,
     if compartment_id is None or vcn_id is None:
         raise ActivityFailed('A compartment id or vcn id is required.')
     else:
-        unfiltered = get_internet_gateway(client, compartment_id, vcn_id)
+        unfiltered, snapshot = _listing(
+            'internet_gateways', get_internet_gateway, client, compartment_id,
+            vcn_id, topology, configuration, secrets)
 
         if filters is None:
             raise ActivityFailed(FILTER_ERR)
@@ -216,7 +317,12 @@ def delete_internet_gateway_by_filters(compartment_id: str, vcn_id: str,
                 if not retry_strategy:
                     retry_strategy = DEFAULT_RETRY_STRATEGY
 
-            ret = client.delete_internet_gateway(filtered[0].id, retry_strategy).data
+            _ensure_unreferenced(snapshot, filtered[0])
+
+            ret = _delete(client, 'internet_gateways', filtered[0], vcn_id,
+                          retry_strategy, configuration)
+
+            invalidate_inventory('internet_gateways')
             logger.debug("Internet Gateway %s deleted",
                          filtered[0].display_name)
             return ret
@@ -239,6 +345,7 @@ def delete_service_gateway_by_id(nw_id: str, force: bool = False,
         raise ActivityFailed('A Service Gateway id is required.')
 
     ret = client.delete_service_gateway(sg_id=nw_id).data
+    invalidate_inventory('service_gateways')
     logger.debug("Service Gateway %s deleted", nw_id)
     return ret
 
@@ -247,7 +354,8 @@ def delete_service_gateway_by_filters(compartment_id: str, vcn_id: str,
                                       filters: Dict[str, Any], force: bool = False,
                                       retry_strategy=None,
                                       configuration: Configuration = None,
-                                      secrets: Secrets = None) -> OCIResponse:
+                                      secrets: Secrets = None,
+                                      topology: bool = False) -> OCIResponse:
     """
     Search for a Service Gateway in VCN using the specified filters and
     then deletes it.
@@ -260,6 +368,15 @@ def delete_service_gateway_by_filters(compartment_id: str, vcn_id: str,
     Please refer to
     https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.ServiceGateway.html#
     for the Service Gateway filters.
+
+    With `topology`, the Service Gateway is looked up in a snapshot of the
+    whole VCN (see `chaosoci.core.networking.topology.VcnTopology`), and the
+    action fails without deleting anything when other resources still use
+    it.
+
+    The definition of the deleted resource is kept so that
+    `chaosoci.core.networking.rollbacks.restore_vcn_resources` can recreate
+    it.
     """
 
     client = oci_client(VirtualNetworkClient, configuration, secrets,
@@ -268,7 +385,9 @@ def delete_service_gateway_by_filters(compartment_id: str, vcn_id: str,
     if compartment_id is None or vcn_id is None:
         raise ActivityFailed('A compartment id or vcn id is required.')
     else:
-        unfiltered = get_service_gateway(client, compartment_id, vcn_id)
+        unfiltered, snapshot = _listing(
+            'service_gateways', get_service_gateway, client, compartment_id,
+            vcn_id, topology, configuration, secrets)
 
         if filters is None:
             raise ActivityFailed(FILTER_ERR)
@@ -281,7 +400,506 @@ def delete_service_gateway_by_filters(compartment_id: str, vcn_id: str,
                 if not retry_strategy:
                     retry_strategy = DEFAULT_RETRY_STRATEGY
 
-            ret = client.delete_service_gateway(filtered[0].id, retry_strategy).data
+            _ensure_unreferenced(snapshot, filtered[0])
+
+            ret = _delete(client, 'service_gateways', filtered[0], vcn_id,
+                          retry_strategy, configuration)
+
+            invalidate_inventory('service_gateways')
             logger.debug("Service Gateway %s deleted",
                          filtered[0].display_name)
             return ret
+
+
+def delete_route_tables_by_filters(compartment_id: str, vcn_id: str,
+                                   filters: Dict[str, Any],
+                                   max_workers: int = DEFAULT_MAX_WORKERS,
+                                   timeout: float = None,
+                                   retry_strategy=None,
+                                   configuration: Configuration = None,
+                                   secrets: Secrets = None,
+                                   detach_subnets: bool = False
+                                   ) -> Dict[str, Any]:
+    """
+    Delete every route table of the VCN matching the filters, concurrently,
+    see `delete_vcn_resources_by_filters`.
+    """
+    return delete_vcn_resources_by_filters(
+        compartment_id, vcn_id, {'route_tables': filters}, max_workers,
+        timeout, retry_strategy, configuration, secrets, detach_subnets)
+
+
+def delete_nat_gateways_by_filters(compartment_id: str, vcn_id: str,
+                                   filters: Dict[str, Any],
+                                   max_workers: int = DEFAULT_MAX_WORKERS,
+                                   timeout: float = None,
+                                   retry_strategy=None,
+                                   configuration: Configuration = None,
+                                   secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Delete every Nat Gateway of the VCN matching the filters, concurrently,
+    see `delete_vcn_resources_by_filters`.
+    """
+    return delete_vcn_resources_by_filters(
+        compartment_id, vcn_id, {'nat_gateways': filters}, max_workers,
+        timeout, retry_strategy, configuration, secrets)
+
+
+def delete_internet_gateways_by_filters(compartment_id: str, vcn_id: str,
+                                        filters: Dict[str, Any],
+                                        max_workers: int = DEFAULT_MAX_WORKERS,
+                                        timeout: float = None,
+                                        retry_strategy=None,
+                                        configuration: Configuration = None,
+                                        secrets: Secrets = None
+                                        ) -> Dict[str, Any]:
+    """
+    Delete every Internet Gateway of the VCN matching the filters,
+    concurrently, see `delete_vcn_resources_by_filters`.
+    """
+    return delete_vcn_resources_by_filters(
+        compartment_id, vcn_id, {'internet_gateways': filters}, max_workers,
+        timeout, retry_strategy, configuration, secrets)
+
+
+def delete_service_gateways_by_filters(compartment_id: str, vcn_id: str,
+                                       filters: Dict[str, Any],
+                                       max_workers: int = DEFAULT_MAX_WORKERS,
+                                       timeout: float = None,
+                                       retry_strategy=None,
+                                       configuration: Configuration = None,
+                                       secrets: Secrets = None
+                                       ) -> Dict[str, Any]:
+    """
+    Delete every Service Gateway of the VCN matching the filters,
+    concurrently, see `delete_vcn_resources_by_filters`.
+    """
+    return delete_vcn_resources_by_filters(
+        compartment_id, vcn_id, {'service_gateways': filters}, max_workers,
+        timeout, retry_strategy, configuration, secrets)
+
+
+def delete_vcn_resources_by_filters(compartment_id: str, vcn_id: str,
+                                    filters: Dict[str, Dict[str, Any]],
+                                    max_workers: int = DEFAULT_MAX_WORKERS,
+                                    timeout: float = None,
+                                    retry_strategy=None,
+                                    configuration: Configuration = None,
+                                    secrets: Secrets = None,
+                                    detach_subnets: bool = False
+                                    ) -> Dict[str, Any]:
+    """
+    Delete every route table and gateway of the VCN matching the filters
+    given for its type, e.g.
+    `{"route_tables": {...}, "nat_gateways": {...}}`, see `DELETION_ORDER`.
+
+    The VCN's topology is listed once (see
+    `chaosoci.core.networking.topology.VcnTopology`), then the matching
+    resources are deleted in waves, concurrently by up to `max_workers`
+    workers: a resource used by others that are deleted too, such as a
+    gateway targeted by the rules of a matching route table, or a transit
+    route table attached to a matching gateway, is only deleted once they
+    are terminated. Otherwise route tables go before gateways. A resource
+    still used by another one that is not deleted along with it, such as a
+    gateway targeted by the rules of a route table that is kept, is skipped
+    and reported as failed.
+    With `detach_subnets`, the subnets using a route table no longer stop
+    its deletion: they are moved to the VCN's default route table first.
+    The definitions of the deleted resources, and the subnets that used
+    them, are kept for
+    `chaosoci.core.networking.rollbacks.restore_vcn_resources`. Every
+    resource's outcome is reported:
+
+        {"deleted": 3, "failed": 1,
+         "resources": [{"id": "ocid1.routetable...",
+                        "resource_type": "route_tables",
+                        "display_name": "private", "success": true,
+                        "duration": 0.61}, ...]}
+    """
+    unknown = set(filters or {}) - set(DELETION_ORDER)
+    if not filters or unknown:
+        raise ActivityFailed('Filters are required for some of {}, got: '
+                             '{}'.format(', '.join(DELETION_ORDER),
+                                         ', '.join(sorted(unknown)) or
+                                         'none'))
+
+    snapshot = vcn_topology(compartment_id, vcn_id, configuration, secrets)
+    targets = OrderedDict()  # type: Dict[str, List[Any]]
+    for resource_type in DELETION_ORDER:
+        if resource_type not in filters:
+            continue
+        if filters[resource_type] is None:
+            raise ActivityFailed(FILTER_ERR)
+        targets[resource_type] = _FILTERS[resource_type](
+            snapshot.resources(resource_type), filters[resource_type])
+    if not any(targets.values()):
+        raise ActivityFailed(FILTER_ERR)
+
+    client = oci_client(VirtualNetworkClient, configuration, secrets,
+                        skip_deserialization=False)
+    retry_strategy = retry_strategy or DEFAULT_RETRY_STRATEGY
+    default_route_table_id = None  # type: Optional[str]
+    target_ids = {resource.id for resources in targets.values()
+                  for resource in resources}
+    remaining = OrderedDict(
+        (resource_type, resources)
+        for resource_type, resources in targets.items()
+        if resources)  # type: Dict[str, List[Any]]
+    deleted = set()  # type: Set[str]
+    reports = []  # type: List[Dict[str, Any]]
+
+    def users_of(resource: Any) -> List[Any]:
+        return [referrer for referrer in snapshot.referrers(resource.id)
+                if referrer.id not in deleted]
+
+    progressed = True
+    while remaining and progressed:
+        progressed = False
+        for resource_type in list(remaining):
+            ready = []
+            waiting = []
+            detached = {}  # type: Dict[str, List[str]]
+            for resource in remaining.pop(resource_type):
+                users = users_of(resource)
+                subnets = [user.id for user in users
+                           if snapshot.resource_type(user.id) == 'subnets']
+                if detach_subnets and subnets and resource_type == \
+                        'route_tables':
+                    if default_route_table_id is None:
+                        default_route_table_id = client.get_vcn(
+                            vcn_id).data.default_route_table_id
+                    if resource.id != default_route_table_id:
+                        users = [user for user in users
+                                 if user.id not in subnets]
+                        detached[resource.id] = subnets
+                kept = [user for user in users if user.id not in target_ids]
+                if kept:
+                    reports.append(_still_used(resource_type, resource,
+                                               kept))
+                elif users:
+                    # used by resources deleted in a later wave
+                    waiting.append(resource)
+                else:
+                    ready.append(resource)
+            if waiting:
+                remaining[resource_type] = waiting
+            if not ready:
+                continue
+
+            by_id = {resource.id: resource for resource in ready}
+            try:
+                wave = run_concurrently(
+                    lambda resource_id: _delete(
+                        client, resource_type, by_id[resource_id], vcn_id,
+                        retry_strategy, configuration,
+                        detached.get(resource_id), default_route_table_id),
+                    list(by_id), max_workers=max_workers, timeout=timeout)
+            finally:
+                invalidate_inventory(resource_type)
+
+            succeeded = []
+            for report in wave:
+                if report['success']:
+                    succeeded.append(report['id'])
+                reports.append(_report(resource_type, by_id[report['id']],
+                                       report))
+            if not succeeded:
+                continue
+
+            progressed = True
+            if remaining:
+                # the resources waiting on these can only be deleted once
+                # these are gone, not while they are still terminating
+                succeeded = _wait_until_terminated(
+                    client, resource_type, compartment_id, vcn_id,
+                    succeeded, configuration)
+            deleted.update(succeeded)
+
+    for resource_type, resources in remaining.items():
+        for resource in resources:
+            reports.append(_still_used(resource_type, resource,
+                                       users_of(resource)))
+
+    summary = summarize(reports, 'deletions')
+    return {'deleted': summary['succeeded'], 'failed': summary['failed'],
+            'resources': reports}
+
+
+def remove_route_rules(route_table_id: str,
+                       destinations: List[str] = None,
+                       network_entity_ids: List[str] = None,
+                       blackhole_entity_id: str = None,
+                       configuration: Configuration = None,
+                       secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Remove the rules of the route table whose destination is one of
+    `destinations`, such as `0.0.0.0/0`, or whose target is one of
+    `network_entity_ids`, cutting the egress they route. With
+    `blackhole_entity_id`, such as the OCID of a private IP dropping the
+    traffic, the matching rules are pointed at it instead.
+
+    The route table is changed by a single update, made only if it did not
+    change since it was read, and the rules removed and added are kept for
+    the `restore_route_rules` rollback:
+
+        {"route_table_id": "ocid1.routetable...",
+         "removed": [{"destination": "0.0.0.0/0", ...}],
+         "added": [], "route_rules": 3}
+    """
+    if not route_table_id:
+        raise ActivityFailed('A route table id is required.')
+    if not destinations and not network_entity_ids:
+        raise ActivityFailed('Destinations or network entity ids are '
+                             'required to select the route rules.')
+
+    client = oci_client(VirtualNetworkClient, configuration, secrets,
+                        skip_deserialization=False)
+    response = client.get_route_table(route_table_id)
+    rules = [route_rule_definition(rule)
+             for rule in response.data.route_rules or []]
+
+    removed = [rule for rule in rules
+               if rule.get('destination') in (destinations or ()) or
+               rule.get('network_entity_id') in (network_entity_ids or ())]
+    if not removed:
+        raise ActivityFailed('No route rules of {} match the destinations '
+                             'or network entities given.'.format(
+                                 route_table_id))
+
+    added = []  # type: List[Dict[str, Any]]
+    if blackhole_entity_id:
+        added = [dict(rule, network_entity_id=blackhole_entity_id)
+                 for rule in removed]
+    rules = [rule for rule in rules if rule not in removed] + added
+
+    client.update_route_table(
+        route_table_id,
+        UpdateRouteTableDetails(route_rules=[route_rule(rule)
+                                             for rule in rules]),
+        if_match=response.headers.get('etag'))
+    invalidate_inventory('route_tables')
+    save_backup(route_table_id, 'route_rules',
+                {'removed': removed, 'added': added},
+                configuration=configuration)
+
+    logger.debug("Removed %d route rules of %s", len(removed), route_table_id)
+    return {'route_table_id': route_table_id, 'removed': removed,
+            'added': added, 'route_rules': len(rules)}
+
+
+def remove_security_rules(security_list_ids: List[str] = None,
+                          network_security_group_ids: List[str] = None,
+                          direction: str = None,
+                          protocol: str = None,
+                          port: int = None,
+                          cidr: str = None,
+                          max_workers: int = DEFAULT_MAX_WORKERS,
+                          timeout: float = None,
+                          configuration: Configuration = None,
+                          secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Remove the rules of the security lists and network security groups that
+    allow the traffic matching the `protocol` (`tcp`, `udp`, `icmp` or an
+    IANA number), destination `port` and `cidr`, in the given `direction`
+    (`INGRESS` or `EGRESS`) or both, see
+    `chaosoci.core.networking.security.rule_matches`.
+
+    Each security list is changed by a single conditional
+    `update_security_list` and each network security group by a single
+    `remove_network_security_group_security_rules`, concurrently by up to
+    `max_workers` workers. The removed rules are kept for the
+    `restore_security_rules` rollback. Every resource's outcome is
+    reported, with how many rules were removed from it:
+
+        {"removed": 4, "failed": 0,
+         "resources": [{"id": "ocid1.securitylist...",
+                        "resource_type": "security_lists", "removed": 2,
+                        "success": true, "duration": 0.52}, ...]}
+    """
+    if not security_list_ids and not network_security_group_ids:
+        raise ActivityFailed('Security list or network security group ids '
+                             'are required.')
+    direction = check_direction(direction)
+
+    client = oci_client(VirtualNetworkClient, configuration, secrets,
+                        skip_deserialization=False)
+    criteria = {'protocol': protocol, 'port': port, 'cidr': cidr}
+
+    def strip_security_list(security_list_id: str) -> int:
+        response = client.get_security_list(security_list_id)
+        removed = {}  # type: Dict[str, List[Dict[str, Any]]]
+        kept = {}  # type: Dict[str, List[Any]]
+        for rule_direction, attr in (('INGRESS', 'ingress_security_rules'),
+                                     ('EGRESS', 'egress_security_rules')):
+            removed[attr], kept[attr] = [], []
+            for rule in getattr(response.data, attr) or []:
+                definition = resource_definition(rule)
+                if direction in (None, rule_direction) and rule_matches(
+                        definition, rule_direction, **criteria):
+                    removed[attr].append(definition)
+                else:
+                    kept[attr].append(rule)
+
+        count = sum(len(rules) for rules in removed.values())
+        if count:
+            client.update_security_list(
+                security_list_id,
+                UpdateSecurityListDetails(**kept),
+                if_match=response.headers.get('etag'))
+            save_backup(security_list_id, 'security_list_rules', removed,
+                        configuration=configuration)
+        return count
+
+    def strip_network_security_group(nsg_id: str) -> int:
+        removed = [resource_definition(rule) for rule in paginate(
+            client.list_network_security_group_security_rules, nsg_id,
+            **({'direction': direction} if direction else {}))]
+        removed = [rule for rule in removed
+                   if rule_matches(rule, rule['direction'], **criteria)]
+        if removed:
+            client.remove_network_security_group_security_rules(
+                nsg_id, RemoveNetworkSecurityGroupSecurityRulesDetails(
+                    security_rule_ids=[rule['id'] for rule in removed]))
+            save_backup(nsg_id, 'network_security_group_rules', removed,
+                        configuration=configuration)
+        return len(removed)
+
+    reports = []  # type: List[Dict[str, Any]]
+    try:
+        for resource_type, resource_ids, strip in (
+                ('security_lists', security_list_ids, strip_security_list),
+                ('network_security_groups', network_security_group_ids,
+                 strip_network_security_group)):
+            if not resource_ids:
+                continue
+            for report in run_concurrently(strip, resource_ids,
+                                           max_workers=max_workers,
+                                           timeout=timeout):
+                removed = report.pop('result', 0)
+                reports.append(dict(report, resource_type=resource_type,
+                                    removed=removed))
+    finally:
+        invalidate_inventory('security_lists')
+
+    summary = summarize(reports, 'security rule removals')
+    return {'removed': sum(report['removed'] for report in reports),
+            'failed': summary['failed'], 'resources': reports}
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _listing(resource_type: str, get_resources: Callable,
+             client: VirtualNetworkClient, compartment_id: str, vcn_id: str,
+             topology: bool = False, configuration: Configuration = None,
+             secrets: Secrets = None
+             ) -> Tuple[List[Any], Optional[VcnTopology]]:
+    """
+    List the resources of the VCN, from a snapshot of its whole topology
+    when `topology` is set, in which case the snapshot is returned too.
+    """
+    if not topology:
+        return get_resources(client, compartment_id, vcn_id,
+                             prefetch=prefetch_pages(configuration)), None
+
+    snapshot = vcn_topology(compartment_id, vcn_id, configuration, secrets)
+    return snapshot.resources(resource_type), snapshot
+
+
+def _ensure_unreferenced(snapshot: Optional[VcnTopology], resource: Any):
+    """
+    Fail when the topology shows other resources still use the resource,
+    which the service would refuse to delete.
+    """
+    if snapshot is None:
+        return
+
+    referrers = snapshot.referrers(resource.id)
+    if referrers:
+        raise ActivityFailed('{} is still used by {}'.format(
+            resource.display_name, ', '.join(
+                '{} {}'.format(snapshot.resource_type(referrer.id),
+                               referrer.display_name)
+                for referrer in referrers)))
+
+
+def _delete(client: VirtualNetworkClient, resource_type: str,
+            resource: Any, vcn_id: str, retry_strategy=None,
+            configuration: Configuration = None,
+            subnet_ids: List[str] = None,
+            fallback_route_table_id: str = None) -> Any:
+    """
+    Back up the definition of a resource, and the subnets using it, for
+    `restore_vcn_resources`, then delete it. Those subnets are moved to
+    `fallback_route_table_id` first. When the deletion fails, they are
+    moved back and the backup is forgotten.
+
+    The definition is fetched anew rather than taken from `resource`,
+    which may come from a cached or compact listing missing fields needed
+    to recreate it.
+    """
+    subnet_ids = subnet_ids or []
+    model = getattr(client, _GETS[resource_type])(resource.id).data
+    backup = save_backup(vcn_id, resource_type, model,
+                         {'subnet_ids': subnet_ids}, configuration)
+    moved = []  # type: List[str]
+    try:
+        for subnet_id in subnet_ids:
+            client.update_subnet(subnet_id, UpdateSubnetDetails(
+                route_table_id=fallback_route_table_id))
+            moved.append(subnet_id)
+        return getattr(client, _DELETES[resource_type])(
+            resource.id, retry_strategy=retry_strategy).data
+    except Exception:
+        for subnet_id in moved:
+            try:
+                client.update_subnet(subnet_id, UpdateSubnetDetails(
+                    route_table_id=resource.id))
+            except Exception as e:
+                logger.warning("Could not move subnet %s back to %s: %s",
+                               subnet_id, resource.id, e)
+        discard_backup(backup, configuration)
+        raise
+
+
+def _wait_until_terminated(client: VirtualNetworkClient,
+                           resource_type: str, compartment_id: str,
+                           vcn_id: str, resource_ids: List[str],
+                           configuration: Configuration = None
+                           ) -> List[str]:
+    """
+    Wait for the deleted resources to terminate, and return those that did.
+    """
+    get_resources = _LISTINGS[resource_type]
+
+    def poll() -> Dict[str, str]:
+        states = {resource.id: resource.lifecycle_state
+                  for resource in get_resources(
+                      client, compartment_id, vcn_id,
+                      prefetch=prefetch_pages(configuration))}
+        # terminated resources eventually drop out of the listing
+        return {resource_id: states.get(resource_id, 'TERMINATED')
+                for resource_id in resource_ids}
+
+    report = wait_for_states(poll, resource_ids, 'TERMINATED')
+    if report['pending']:
+        logger.warning("%s %s are still not terminated", resource_type,
+                       ', '.join(report['pending']))
+    return list(report['converged'])
+
+
+def _still_used(resource_type: str, resource: Any,
+                users: List[Any]) -> Dict[str, Any]:
+    return _report(resource_type, resource, {
+        'id': resource.id, 'success': False, 'duration': 0.0,
+        'error': 'Still used by {}'.format(', '.join(
+            user.display_name for user in users))})
+
+
+def _report(resource_type: str, resource: Any,
+            report: Dict[str, Any]) -> Dict[str, Any]:
+    report = dict(report)
+    report.pop('result', None)
+    report['resource_type'] = resource_type
+    report['display_name'] = resource.display_name
+    return report
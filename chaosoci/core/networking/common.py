@@ -1,98 +1,218 @@
 # coding: utf-8
 # Copyright 2020, Oracle Corporation and/or its affiliates.
 
-__all__ = ["get_nat_gateway", "get_route_tables", "get_internet_gateway", "get_service_gateway"]
+__all__ = ["get_nat_gateway", "get_route_tables", "get_internet_gateway",
+           "get_service_gateway", "get_subnets", "get_security_lists",
+           "iter_nat_gateways", "iter_route_tables", "iter_internet_gateways",
+           "iter_service_gateways", "iter_subnets", "iter_security_lists",
+           "route_rule_definition", "route_rule"]
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Sequence, Union
 
 from chaoslib.exceptions import ActivityFailed
 
 from logzero import logger
 
 from oci.core import VirtualNetworkClient
-from oci.core.models import (RouteRule,
-                             RouteTable)
+from oci.core.models import (InternetGateway, NatGateway, RouteRule,
+                             RouteTable, SecurityList, ServiceGateway, Subnet)
+from oci.util import to_dict
+
+from chaosoci.util.pagination import paginate
+from chaosoci.util.records import compact_records
+
+# The fields a route rule is rebuilt from.
+_ROUTE_RULE_FIELDS = tuple(RouteRule().swagger_types)
 
 
 def get_route_tables(client: VirtualNetworkClient = None,
                      compartment_id: str = None,
-                     vcn_id: str = None) -> List[RouteTable]:
+                     vcn_id: str = None,
+                     prefetch: int = 0,
+                     compact: Union[bool, Sequence[str]] = False
+                     ) -> List[RouteTable]:
     """
     Returns a complete, unfiltered list of route tables of a vcn in the
     compartment.
     """
-    route_tables = []
-    route_tables_raw = client.list_route_tables(compartment_id=compartment_id,
-                                                vcn_id=vcn_id)
-    route_tables.extend(route_tables_raw.data)
-    while route_tables_raw.has_next_page:
-        route_tables_raw = client.list_route_tables(
-            compartment_id=compartment_id,
-            vcn_id=vcn_id,
-            page=route_tables_raw.next_page)
-        route_tables.extend(route_tables_raw.data)
+    resources = iter_route_tables(client, compartment_id, vcn_id,
+                                  prefetch=prefetch)
+    if compact:
+        resources = compact_records(resources, 'route_tables', compact)
+    return list(resources)
+
 
-    return route_tables
+def iter_route_tables(client: VirtualNetworkClient = None,
+                      compartment_id: str = None,
+                      vcn_id: str = None,
+                      prefetch: int = 0) -> Iterator[RouteTable]:
+    """
+    Lazily yields the route tables of a vcn in the compartment, page by page.
+    """
+    return paginate(client.list_route_tables, compartment_id=compartment_id,
+                    vcn_id=vcn_id,
+                    prefetch=prefetch)
 
 
 def get_nat_gateway(client: VirtualNetworkClient = None,
                     compartment_id: str = None,
-                    vcn_id: str = None) -> List[RouteTable]:
+                    vcn_id: str = None,
+                    prefetch: int = 0,
+                    compact: Union[bool, Sequence[str]] = False
+                    ) -> List[RouteTable]:
     """
     Returns a complete, unfiltered list of Nat Gateways of a vcn in the
     compartment.
     """
-    nat_gateway = []
-    nat_gateway_raw = client.list_nat_gateways(compartment_id=compartment_id,
-                                               vcn_id=vcn_id)
-    nat_gateway.extend(nat_gateway_raw.data)
-    while nat_gateway_raw.has_next_page:
-        nat_gateway_raw = client.list_nat_gateways(
-            compartment_id=compartment_id,
-            vcn_id=vcn_id,
-            page=nat_gateway_raw.next_page)
-        nat_gateway.extend(nat_gateway_raw.data)
+    resources = iter_nat_gateways(client, compartment_id, vcn_id,
+                                  prefetch=prefetch)
+    if compact:
+        resources = compact_records(resources, 'nat_gateways', compact)
+    return list(resources)
 
-    return nat_gateway
+
+def iter_nat_gateways(client: VirtualNetworkClient = None,
+                      compartment_id: str = None,
+                      vcn_id: str = None,
+                      prefetch: int = 0) -> Iterator[NatGateway]:
+    """
+    Lazily yields the Nat Gateways of a vcn in the compartment, page by page.
+    """
+    return paginate(client.list_nat_gateways, compartment_id=compartment_id,
+                    vcn_id=vcn_id,
+                    prefetch=prefetch)
 
 
 def get_internet_gateway(client: VirtualNetworkClient = None,
                          compartment_id: str = None,
-                         vcn_id: str = None) -> List[RouteTable]:
+                         vcn_id: str = None,
+                         prefetch: int = 0,
+                         compact: Union[bool, Sequence[str]] = False
+                         ) -> List[RouteTable]:
     """
     Returns a complete, unfiltered list of Internet Gateways of a vcn in the
     compartment.
     """
-    internet_gateway = []
-    internet_gateway_raw = client.list_internet_gateways(compartment_id=compartment_id,
-                                                         vcn_id=vcn_id)
-    internet_gateway.extend(internet_gateway_raw.data)
-    while internet_gateway_raw.has_next_page:
-        internet_gateway_raw = client.list_internet_gateways(
-            compartment_id=compartment_id,
-            vcn_id=vcn_id,
-            page=internet_gateway_raw.next_page)
-        internet_gateway.extend(internet_gateway_raw.data)
+    resources = iter_internet_gateways(client, compartment_id, vcn_id,
+                                       prefetch=prefetch)
+    if compact:
+        resources = compact_records(resources, 'internet_gateways', compact)
+    return list(resources)
+
 
-    return internet_gateway
+def iter_internet_gateways(client: VirtualNetworkClient = None,
+                           compartment_id: str = None,
+                           vcn_id: str = None,
+                           prefetch: int = 0) -> Iterator[InternetGateway]:
+    """
+    Lazily yields the Internet Gateways of a vcn in the compartment, page by
+    page.
+    """
+    return paginate(client.list_internet_gateways,
+                    compartment_id=compartment_id, vcn_id=vcn_id,
+                    prefetch=prefetch)
 
 
 def get_service_gateway(client: VirtualNetworkClient = None,
                         compartment_id: str = None,
-                        vcn_id: str = None) -> List[RouteTable]:
+                        vcn_id: str = None,
+                        prefetch: int = 0,
+                        compact: Union[bool, Sequence[str]] = False
+                        ) -> List[RouteTable]:
     """
     Returns a complete, unfiltered list of Service Gateways of a vcn in the
     compartment.
     """
-    service_gateway = []
-    service_gateway_raw = client.list_service_gateways(compartment_id=compartment_id,
-                                                       vcn_id=vcn_id)
-    service_gateway.extend(service_gateway_raw.data)
-    while service_gateway_raw.has_next_page:
-        service_gateway_raw = client.list_service_gateways(
-            compartment_id=compartment_id,
-            vcn_id=vcn_id,
-            page=service_gateway_raw.next_page)
-        service_gateway.extend(service_gateway_raw.data)
-
-    return service_gateway
+    resources = iter_service_gateways(client, compartment_id, vcn_id,
+                                      prefetch=prefetch)
+    if compact:
+        resources = compact_records(resources, 'service_gateways', compact)
+    return list(resources)
+
+
+def iter_service_gateways(client: VirtualNetworkClient = None,
+                          compartment_id: str = None,
+                          vcn_id: str = None,
+                          prefetch: int = 0) -> Iterator[ServiceGateway]:
+    """
+    Lazily yields the Service Gateways of a vcn in the compartment, page by
+    page.
+    """
+    return paginate(client.list_service_gateways,
+                    compartment_id=compartment_id, vcn_id=vcn_id,
+                    prefetch=prefetch)
+
+
+def get_subnets(client: VirtualNetworkClient = None,
+                compartment_id: str = None,
+                vcn_id: str = None,
+                prefetch: int = 0,
+                compact: Union[bool, Sequence[str]] = False
+                ) -> List[Subnet]:
+    """
+    Returns a complete, unfiltered list of Subnets of a vcn in the
+    compartment.
+    """
+    resources = iter_subnets(client, compartment_id, vcn_id,
+                             prefetch=prefetch)
+    if compact:
+        resources = compact_records(resources, 'subnets', compact)
+    return list(resources)
+
+
+def iter_subnets(client: VirtualNetworkClient = None,
+                 compartment_id: str = None,
+                 vcn_id: str = None,
+                 prefetch: int = 0) -> Iterator[Subnet]:
+    """
+    Lazily yields the Subnets of a vcn in the compartment, page by page.
+    """
+    return paginate(client.list_subnets, compartment_id=compartment_id,
+                    vcn_id=vcn_id,
+                    prefetch=prefetch)
+
+
+def get_security_lists(client: VirtualNetworkClient = None,
+                       compartment_id: str = None,
+                       vcn_id: str = None,
+                       prefetch: int = 0,
+                       compact: Union[bool, Sequence[str]] = False
+                       ) -> List[SecurityList]:
+    """
+    Returns a complete, unfiltered list of Security Lists of a vcn in the
+    compartment.
+    """
+    resources = iter_security_lists(client, compartment_id, vcn_id,
+                                    prefetch=prefetch)
+    if compact:
+        resources = compact_records(resources, 'security_lists', compact)
+    return list(resources)
+
+
+def iter_security_lists(client: VirtualNetworkClient = None,
+                        compartment_id: str = None,
+                        vcn_id: str = None,
+                        prefetch: int = 0) -> Iterator[SecurityList]:
+    """
+    Lazily yields the Security Lists of a vcn in the compartment, page by page.
+    """
+    return paginate(client.list_security_lists, compartment_id=compartment_id,
+                    vcn_id=vcn_id,
+                    prefetch=prefetch)
+
+
+def route_rule_definition(rule: Union[RouteRule, Dict[str, Any]]
+                          ) -> Dict[str, Any]:
+    """
+    Returns a route rule as plain data, which compares equal for the same
+    rule and can be saved as JSON.
+    """
+    return dict(rule) if isinstance(rule, dict) else to_dict(rule)
+
+
+def route_rule(definition: Dict[str, Any]) -> RouteRule:
+    """
+    Returns the route rule described by `route_rule_definition`.
+    """
+    return RouteRule(**{attr: definition.get(attr)
+                        for attr in _ROUTE_RULE_FIELDS})
@@ -7,6 +7,7 @@ from typing import Any, Dict, List
 
 from chaoslib.exceptions import ActivityFailed
 from chaosoci.util.constants import FILTER_ERR
+from chaosoci.util.filters import filter_resources
 
 from logzero import logger
 
@@ -48,29 +49,4 @@ def filter_service_gateway(service_gateways: List[ServiceGateway] = None,
 
 
 def filter_networks(gateway_type, gateways, filters):
-    gateways = gateways or None
-
-    if gateways is None:
-        raise ActivityFailed('No {} were found.', gateway_type)
-
-    filters_set = {x for x in filters}
-
-    available_filters_set = {x for x in gateways[0].attribute_map}
-
-    # Partial filtering may return service gateways we do not want. We avoid it.
-    if not filters_set.issubset(available_filters_set):
-        raise ActivityFailed(FILTER_ERR)
-
-    # Walk the service gateways and find those that match the given filters.
-    filtered = []
-    for service_gateway in gateways:
-        sentinel = True
-        for attr, val in filters.items():
-            if val != getattr(service_gateway, attr, None):
-                sentinel = False
-                break
-
-        if sentinel:
-            filtered.append(service_gateway)
-
-    return filtered
+    return filter_resources(gateways or [], filters, gateway_type)
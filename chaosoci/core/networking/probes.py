@@ -1,18 +1,24 @@
 # coding: utf-8
 # Copyright 2020, Oracle Corporation and/or its affiliates.
 
-__all__ = ['count_route_tables', 'count_nat_gateway', 'count_service_gateway', 'count_internet_gateway']
+__all__ = ['count_route_tables', 'count_nat_gateway', 'count_service_gateway',
+           'count_internet_gateway', 'count_route_tables_by',
+           'count_nat_gateway_by', 'count_service_gateway_by',
+           'count_internet_gateway_by']
 
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Union
 
 from chaoslib.exceptions import ActivityFailed
 from chaoslib.types import Configuration, Secrets
 
-from chaosoci import oci_client
+from chaosoci import get_compartment_id, oci_client
+from chaosoci.util.cache import cached_inventory, client_scope
+from chaosoci.util.filters import count_by
+from chaosoci.util.pagination import prefetch_pages
+from chaosoci.util.records import compact_listings
 
 from logzero import logger
 
-from oci.config import from_file
 from oci.core import VirtualNetworkClient
 
 from .common import (get_route_tables, get_nat_gateway, get_internet_gateway, get_service_gateway)
@@ -33,7 +39,7 @@ def count_route_tables(filters: List[Dict[str, Any]],
 
     for details on the available filters under the 'parameters' section.
     """  # noqa: E501
-    compartment_id = compartment_id or from_file().get('compartment')
+    compartment_id = get_compartment_id(compartment_id, configuration)
 
     if compartment_id is None:
         raise ActivityFailed('A valid compartment id is required.')
@@ -42,7 +48,12 @@ def count_route_tables(filters: List[Dict[str, Any]],
                         skip_deserialization=False)
 
     filters = filters or None
-    route_tables = get_route_tables(client, compartment_id, vcn_id)
+    route_tables = cached_inventory(
+        'route_tables', (client_scope(client), compartment_id, vcn_id),
+        lambda: get_route_tables(client, compartment_id, vcn_id,
+                                 prefetch=prefetch_pages(configuration),
+                                 compact=compact_listings(configuration)),
+        configuration)
     if filters is not None:
         return len(filter_route_tables(route_tables, filters=filters))
     else:
@@ -62,7 +73,7 @@ def count_nat_gateway(filters: List[Dict[str, Any]],
 
     for details on the available filters under the 'parameters' section.
     """  # noqa: E501
-    compartment_id = compartment_id or from_file().get('compartment')
+    compartment_id = get_compartment_id(compartment_id, configuration)
 
     if compartment_id is None:
         raise ActivityFailed('A valid compartment id is required.')
@@ -71,7 +82,12 @@ def count_nat_gateway(filters: List[Dict[str, Any]],
                         skip_deserialization=False)
 
     filters = filters or None
-    nat_gateway = get_nat_gateway(client, compartment_id, vcn_id)
+    nat_gateway = cached_inventory(
+        'nat_gateways', (client_scope(client), compartment_id, vcn_id),
+        lambda: get_nat_gateway(client, compartment_id, vcn_id,
+                                prefetch=prefetch_pages(configuration),
+                                compact=compact_listings(configuration)),
+        configuration)
     if filters is not None:
         return len(filter_nat_gateway(nat_gateway, filters=filters))
     else:
@@ -91,7 +107,7 @@ def count_internet_gateway(filters: List[Dict[str, Any]],
 
     for details on the available filters under the 'parameters' section.
     """  # noqa: E501
-    compartment_id = compartment_id or from_file().get('compartment')
+    compartment_id = get_compartment_id(compartment_id, configuration)
 
     if compartment_id is None:
         raise ActivityFailed('A valid compartment id is required.')
@@ -100,7 +116,12 @@ def count_internet_gateway(filters: List[Dict[str, Any]],
                         skip_deserialization=False)
 
     filters = filters or None
-    internet_gateway = get_internet_gateway(client, compartment_id, vcn_id)
+    internet_gateway = cached_inventory(
+        'internet_gateways', (client_scope(client), compartment_id, vcn_id),
+        lambda: get_internet_gateway(client, compartment_id, vcn_id,
+                                     prefetch=prefetch_pages(configuration),
+                                     compact=compact_listings(configuration)),
+        configuration)
     if filters is not None:
         return len(filter_internet_gateway(internet_gateway, filters=filters))
     else:
@@ -120,7 +141,7 @@ def count_service_gateway(filters: List[Dict[str, Any]],
 
     for details on the available filters under the 'parameters' section.
     """  # noqa: E501
-    compartment_id = compartment_id or from_file().get('compartment')
+    compartment_id = get_compartment_id(compartment_id, configuration)
 
     if compartment_id is None:
         raise ActivityFailed('A valid compartment id is required.')
@@ -129,8 +150,102 @@ def count_service_gateway(filters: List[Dict[str, Any]],
                         skip_deserialization=False)
 
     filters = filters or None
-    service_gateway = get_service_gateway(client, compartment_id, vcn_id)
+    service_gateway = cached_inventory(
+        'service_gateways', (client_scope(client), compartment_id, vcn_id),
+        lambda: get_service_gateway(client, compartment_id, vcn_id,
+                                    prefetch=prefetch_pages(configuration),
+                                    compact=compact_listings(configuration)),
+        configuration)
     if filters is not None:
         return len(filter_service_gateway(service_gateway, filters=filters))
     else:
         return len(service_gateway)
+
+
+def count_route_tables_by(group_by: Union[str, List[str]] = "lifecycle_state",
+                          filters: Dict[str, Any] = None,
+                          compartment_id: str = None,
+                          vcn_id: str = None,
+                          configuration: Configuration = None,
+                          secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Returns the number of Route Tables of the vcn 'vcn_id' in the compartment
+    'compartment_id' matching the filters for each value of the 'group_by'
+    attribute, e.g. {"AVAILABLE": 2}, from a single listing. With a list
+    of attributes, the counts are nested.
+    """
+    return _count_by('route_tables', get_route_tables, group_by, filters,
+                     compartment_id, vcn_id, configuration, secrets)
+
+
+def count_nat_gateway_by(group_by: Union[str, List[str]] = "lifecycle_state",
+                         filters: Dict[str, Any] = None,
+                         compartment_id: str = None,
+                         vcn_id: str = None,
+                         configuration: Configuration = None,
+                         secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Returns the number of Nat Gateways of the vcn 'vcn_id' in the compartment
+    'compartment_id' matching the filters for each value of the 'group_by'
+    attribute, e.g. {"AVAILABLE": 2}, from a single listing. With a list
+    of attributes, the counts are nested.
+    """
+    return _count_by('nat_gateways', get_nat_gateway, group_by, filters,
+                     compartment_id, vcn_id, configuration, secrets)
+
+
+def count_internet_gateway_by(
+        group_by: Union[str, List[str]] = "lifecycle_state",
+        filters: Dict[str, Any] = None, compartment_id: str = None,
+        vcn_id: str = None, configuration: Configuration = None,
+        secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Returns the number of Internet Gateways of the vcn 'vcn_id' in the
+    compartment 'compartment_id' matching the filters for each value of the
+    'group_by' attribute, e.g. {"AVAILABLE": 2}, from a single listing. With
+    a list of attributes, the counts are nested.
+    """
+    return _count_by('internet_gateways', get_internet_gateway, group_by,
+                     filters, compartment_id, vcn_id, configuration, secrets)
+
+
+def count_service_gateway_by(
+        group_by: Union[str, List[str]] = "lifecycle_state",
+        filters: Dict[str, Any] = None, compartment_id: str = None,
+        vcn_id: str = None, configuration: Configuration = None,
+        secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Returns the number of Service Gateways of the vcn 'vcn_id' in the
+    compartment 'compartment_id' matching the filters for each value of the
+    'group_by' attribute, e.g. {"AVAILABLE": 2}, from a single listing. With
+    a list of attributes, the counts are nested.
+    """
+    return _count_by('service_gateways', get_service_gateway, group_by,
+                     filters, compartment_id, vcn_id, configuration, secrets)
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _count_by(resource_type: str, get_resources: Callable,
+              group_by: Union[str, List[str]],
+              filters: Dict[str, Any] = None,
+              compartment_id: str = None,
+              vcn_id: str = None,
+              configuration: Configuration = None,
+              secrets: Secrets = None) -> Dict[str, Any]:
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None:
+        raise ActivityFailed('A valid compartment id is required.')
+
+    client = oci_client(VirtualNetworkClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    resources = cached_inventory(
+        resource_type, (client_scope(client), compartment_id, vcn_id),
+        lambda: get_resources(client, compartment_id, vcn_id,
+                              prefetch=prefetch_pages(configuration),
+                              compact=compact_listings(configuration)),
+        configuration)
+    return count_by(resources, group_by, filters)
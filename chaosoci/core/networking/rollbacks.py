@@ -1,22 +1,379 @@
 # coding: utf-8
 # Copyright 2020, Oracle Corporation and/or its affiliates.
 
-__all__ = ["delete_nat_rollback"]
+__all__ = ["delete_nat_rollback", "restore_vcn_resources",
+           "restore_route_rules", "restore_security_rules"]
 
-from random import choice
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Set
 
 from chaoslib.exceptions import ActivityFailed
 from chaoslib.types import Configuration, Secrets
 
 from chaosoci import oci_client
-from chaosoci.types import OCIResponse
+from chaosoci.util.backups import (mark_restored, model_from_definition,
+                                   pending_backups, resource_definition)
+from chaosoci.util.cache import invalidate_inventory
+from chaosoci.util.executor import (DEFAULT_MAX_WORKERS, run_concurrently,
+                                    summarize)
+from chaosoci.util.waiter import wait_for_states
 
 from logzero import logger
 
-from oci.config import from_file
 from oci.core import VirtualNetworkClient
+from oci.core.models import (AddNetworkSecurityGroupSecurityRulesDetails,
+                             AddSecurityRuleDetails,
+                             CreateInternetGatewayDetails,
+                             CreateNatGatewayDetails,
+                             CreateRouteTableDetails,
+                             CreateServiceGatewayDetails,
+                             EgressSecurityRule, IngressSecurityRule,
+                             ServiceIdRequestDetails,
+                             UpdateInternetGatewayDetails,
+                             UpdateNatGatewayDetails, UpdateRouteTableDetails,
+                             UpdateSecurityListDetails,
+                             UpdateServiceGatewayDetails, UpdateSubnetDetails)
 
-from .common import (get_route_tables)
+from .common import route_rule, route_rule_definition
 
-from .filters import (filter_route_tables)
+# The resource types restored before the route tables whose rules target
+# them.
+GATEWAY_TYPES = ('nat_gateways', 'internet_gateways', 'service_gateways')
+
+# The most rules a network security group accepts in a single call.
+NSG_RULES_PER_CALL = 25
+
+# The security list rules, by attribute, and the model of each.
+_SECURITY_LIST_RULES = (('ingress_security_rules', IngressSecurityRule),
+                        ('egress_security_rules', EgressSecurityRule))
+
+
+def delete_nat_rollback(vcn_id: str,
+                        max_workers: int = DEFAULT_MAX_WORKERS,
+                        timeout: float = 300,
+                        configuration: Configuration = None,
+                        secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Recreate the Nat Gateways of the VCN deleted by the networking actions,
+    see `restore_vcn_resources`.
+    """
+    return restore_vcn_resources(vcn_id, ['nat_gateways'], max_workers,
+                                 timeout, configuration, secrets)
+
+
+def restore_vcn_resources(vcn_id: str, resource_types: List[str] = None,
+                          max_workers: int = DEFAULT_MAX_WORKERS,
+                          timeout: float = 300,
+                          configuration: Configuration = None,
+                          secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Recreate the route tables and gateways of the VCN deleted by the
+    networking actions, from the definitions those actions kept, or only
+    those of the given `resource_types`.
+
+    The gateways are recreated first, concurrently by up to `max_workers`
+    workers, each one being waited for, up to `timeout` seconds, until it
+    is available. The route tables follow, their rules targeting the
+    recreated gateways in place of the deleted ones. Last, the subnets and
+    recreated gateways that used a deleted route table are pointed at its
+    replacement. Every resource's outcome is reported:
+
+        {"restored": 2, "failed": 0,
+         "resources": [{"id": "ocid1.natgateway...",
+                        "resource_type": "nat_gateways",
+                        "restored_id": "ocid1.natgateway...",
+                        "success": true, "duration": 12.3}, ...]}
+    """
+    if not vcn_id:
+        raise ActivityFailed('A vcn id is required.')
+
+    backups = pending_backups(vcn_id, resource_types, configuration)
+    if not backups:
+        logger.info("Nothing to restore in VCN %s", vcn_id)
+        return {'restored': 0, 'failed': 0, 'resources': []}
+
+    client = oci_client(VirtualNetworkClient, configuration, secrets,
+                        skip_deserialization=False)
+    restoring = {backup['definition']['id'] for backup in backups}
+    replacements = {}  # type: Dict[str, str]
+    reports = []  # type: List[Dict[str, Any]]
+
+    waves = ([backup for backup in backups
+              if backup['resource_type'] in GATEWAY_TYPES],
+             [backup for backup in backups
+              if backup['resource_type'] == 'route_tables'])
+    try:
+        for wave in waves:
+            results = run_concurrently(
+                lambda backup: _recreate(client, backup, replacements,
+                                         restoring, timeout),
+                wave, max_workers=max_workers,
+                key=lambda backup: backup['definition']['id'])
+            for backup, report in zip(wave, results):
+                report = dict(report, resource_type=backup['resource_type'])
+                restored_id = report.pop('result', None)
+                if report['success']:
+                    replacements[backup['definition']['id']] = restored_id
+                    report['restored_id'] = restored_id
+                    mark_restored(backup, restored_id, configuration)
+                reports.append(report)
+
+        # the subnets and the gateways that used a deleted route table
+        moves = [('subnets', subnet_id,
+                  replacements[backup['definition']['id']])
+                 for backup in waves[1]
+                 if backup['definition']['id'] in replacements
+                 for subnet_id in backup['attachments'].get('subnet_ids',
+                                                            [])]
+        moves.extend((backup['resource_type'],
+                      replacements[backup['definition']['id']],
+                      replacements[backup['definition']['route_table_id']])
+                     for backup in waves[0]
+                     if backup['definition']['id'] in replacements and
+                     backup['definition'].get('route_table_id') in
+                     replacements)
+        results = run_concurrently(
+            lambda move: _attach(client, *move), moves,
+            max_workers=max_workers, key=lambda move: move[1])
+        reports.extend(dict(report, resource_type=move[0],
+                            route_table_id=move[2])
+                       for move, report in zip(moves, results))
+    finally:
+        invalidate_inventory('route_tables', 'subnets', *GATEWAY_TYPES)
+
+    summary = summarize(reports, 'restorations')
+    return {'restored': summary['succeeded'], 'failed': summary['failed'],
+            'resources': reports}
+
+
+def restore_route_rules(route_table_id: str,
+                        configuration: Configuration = None,
+                        secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Undo the changes `remove_route_rules` made to the route table: the
+    removed rules are put back and the blackhole rules it added are
+    dropped, in a single update of the route table, leaving any other rule
+    as it is now.
+
+        {"route_table_id": "ocid1.routetable...", "restored": 2,
+         "route_rules": 5}
+    """
+    if not route_table_id:
+        raise ActivityFailed('A route table id is required.')
+
+    backups = pending_backups(route_table_id, ['route_rules'], configuration)
+    if not backups:
+        logger.info("No route rules of %s to restore", route_table_id)
+        return {'route_table_id': route_table_id, 'restored': 0}
+
+    client = oci_client(VirtualNetworkClient, configuration, secrets,
+                        skip_deserialization=False)
+    response = client.get_route_table(route_table_id)
+    rules = [route_rule_definition(rule)
+             for rule in response.data.route_rules or []]
+
+    restored = 0
+    for backup in reversed(backups):
+        for rule in backup['definition']['added']:
+            if rule in rules:
+                rules.remove(rule)
+        for rule in backup['definition']['removed']:
+            if rule not in rules:
+                rules.append(rule)
+                restored += 1
+
+    client.update_route_table(
+        route_table_id,
+        UpdateRouteTableDetails(route_rules=[route_rule(rule)
+                                             for rule in rules]),
+        if_match=response.headers.get('etag'))
+    invalidate_inventory('route_tables')
+    for backup in backups:
+        mark_restored(backup, route_table_id, configuration)
+
+    logger.debug("Restored %d route rules of %s", restored, route_table_id)
+    return {'route_table_id': route_table_id, 'restored': restored,
+            'route_rules': len(rules)}
+
+
+def restore_security_rules(security_list_ids: List[str] = None,
+                           network_security_group_ids: List[str] = None,
+                           max_workers: int = DEFAULT_MAX_WORKERS,
+                           timeout: float = None,
+                           configuration: Configuration = None,
+                           secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Put back the rules `remove_security_rules` removed from the security
+    lists and network security groups, concurrently by up to `max_workers`
+    workers. Each security list is restored by a single conditional update
+    keeping the rules it has now, and each network security group by adding
+    the removed rules back, 25 per call. Every resource's outcome is
+    reported, with how many rules were restored to it:
+
+        {"restored": 4, "failed": 0,
+         "resources": [{"id": "ocid1.securitylist...",
+                        "resource_type": "security_lists", "restored": 2,
+                        "success": true, "duration": 0.48}, ...]}
+    """
+    if not security_list_ids and not network_security_group_ids:
+        raise ActivityFailed('Security list or network security group ids '
+                             'are required.')
+
+    client = oci_client(VirtualNetworkClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    def restore_security_list(security_list_id: str) -> int:
+        backups = pending_backups(security_list_id, ['security_list_rules'],
+                                  configuration)
+        if not backups:
+            return 0
+
+        response = client.get_security_list(security_list_id)
+        rules = {}  # type: Dict[str, List[Any]]
+        restored = 0
+        for attr, model in _SECURITY_LIST_RULES:
+            rules[attr] = list(getattr(response.data, attr) or [])
+            present = [resource_definition(rule) for rule in rules[attr]]
+            for backup in backups:
+                for definition in backup['definition'].get(attr, []):
+                    if definition not in present:
+                        rules[attr].append(
+                            model_from_definition(model, definition))
+                        present.append(definition)
+                        restored += 1
+
+        client.update_security_list(security_list_id,
+                                    UpdateSecurityListDetails(**rules),
+                                    if_match=response.headers.get('etag'))
+        for backup in backups:
+            mark_restored(backup, security_list_id, configuration)
+        return restored
+
+    def restore_network_security_group(nsg_id: str) -> int:
+        backups = pending_backups(nsg_id, ['network_security_group_rules'],
+                                  configuration)
+        rules = [model_from_definition(AddSecurityRuleDetails, definition)
+                 for backup in backups for definition in backup['definition']]
+        for start in range(0, len(rules), NSG_RULES_PER_CALL):
+            client.add_network_security_group_security_rules(
+                nsg_id, AddNetworkSecurityGroupSecurityRulesDetails(
+                    security_rules=rules[start:start + NSG_RULES_PER_CALL]))
+        for backup in backups:
+            mark_restored(backup, nsg_id, configuration)
+        return len(rules)
+
+    reports = []  # type: List[Dict[str, Any]]
+    try:
+        for resource_type, resource_ids, restore in (
+                ('security_lists', security_list_ids, restore_security_list),
+                ('network_security_groups', network_security_group_ids,
+                 restore_network_security_group)):
+            if not resource_ids:
+                continue
+            for report in run_concurrently(restore, resource_ids,
+                                           max_workers=max_workers,
+                                           timeout=timeout):
+                restored = report.pop('result', 0)
+                reports.append(dict(report, resource_type=resource_type,
+                                    restored=restored))
+    finally:
+        invalidate_inventory('security_lists')
+
+    summary = summarize(reports, 'security rule restorations')
+    return {'restored': sum(report['restored'] for report in reports),
+            'failed': summary['failed'], 'resources': reports}
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _recreate(client: VirtualNetworkClient, backup: Dict[str, Any],
+              replacements: Dict[str, str], restoring: Set[str],
+              timeout: float) -> str:
+    """
+    Create a resource from its backed up definition, wait for it to be
+    available and return its OCID.
+    """
+    resource_type = backup['resource_type']
+    definition = backup['definition']
+    common = {
+        'compartment_id': definition['compartment_id'],
+        'vcn_id': definition['vcn_id'],
+        'display_name': definition.get('display_name'),
+        'freeform_tags': definition.get('freeform_tags'),
+        'defined_tags': definition.get('defined_tags'),
+    }
+
+    route_table_id = definition.get('route_table_id')
+    if route_table_id in restoring:
+        # the route table is recreated after the gateways, which are then
+        # attached to it
+        route_table_id = None
+
+    if resource_type == 'nat_gateways':
+        create, get = client.create_nat_gateway, client.get_nat_gateway
+        details = CreateNatGatewayDetails(
+            block_traffic=definition.get('block_traffic'),
+            public_ip_id=definition.get('public_ip_id'),
+            route_table_id=route_table_id, **common)
+    elif resource_type == 'internet_gateways':
+        create = client.create_internet_gateway
+        get = client.get_internet_gateway
+        details = CreateInternetGatewayDetails(
+            is_enabled=definition.get('is_enabled'),
+            route_table_id=route_table_id, **common)
+    elif resource_type == 'service_gateways':
+        create = client.create_service_gateway
+        get = client.get_service_gateway
+        details = CreateServiceGatewayDetails(
+            services=[ServiceIdRequestDetails(service_id=service['service_id'])
+                      for service in definition.get('services') or []],
+            route_table_id=route_table_id, **common)
+    elif resource_type == 'route_tables':
+        create, get = client.create_route_table, client.get_route_table
+        details = CreateRouteTableDetails(route_rules=[
+            route_rule(dict(rule, network_entity_id=replacements.get(
+                rule.get('network_entity_id'), rule.get('network_entity_id'))))
+            for rule in definition.get('route_rules') or []], **common)
+    else:
+        raise ActivityFailed('Cannot restore {}'.format(resource_type))
+
+    resource_id = create(details).data.id
+    _wait_until_available(get, resource_id, timeout)
+    logger.debug("Restored %s %s as %s", resource_type,
+                 definition.get('display_name'), resource_id)
+    return resource_id
+
+
+def _attach(client: VirtualNetworkClient, resource_type: str,
+            resource_id: str, route_table_id: str) -> str:
+    """
+    Point a subnet or gateway at the route table, and return its OCID.
+    """
+    if resource_type == 'subnets':
+        update, details = client.update_subnet, UpdateSubnetDetails
+    elif resource_type == 'nat_gateways':
+        update, details = client.update_nat_gateway, UpdateNatGatewayDetails
+    elif resource_type == 'internet_gateways':
+        update = client.update_internet_gateway
+        details = UpdateInternetGatewayDetails
+    elif resource_type == 'service_gateways':
+        update = client.update_service_gateway
+        details = UpdateServiceGatewayDetails
+    else:
+        raise ActivityFailed('Cannot attach {} to a route table'.format(
+            resource_type))
+
+    update(resource_id, details(route_table_id=route_table_id))
+    logger.debug("Attached %s %s to route table %s", resource_type,
+                 resource_id, route_table_id)
+    return resource_id
+
+
+def _wait_until_available(get: Callable[[str], Any], resource_id: str,
+                          timeout: float):
+    report = wait_for_states(
+        lambda: {resource_id: get(resource_id).data.lifecycle_state},
+        [resource_id], 'AVAILABLE', timeout=timeout)
+    if not report['success']:
+        raise ActivityFailed('{} is still {} after {}s'.format(
+            resource_id, report['pending'][resource_id], timeout))
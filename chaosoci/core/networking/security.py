@@ -0,0 +1,78 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["PROTOCOLS", "DIRECTIONS", "rule_matches", "check_direction"]
+
+import ipaddress
+from typing import Any, Dict, Optional
+
+from chaoslib.exceptions import ActivityFailed
+
+# Protocol names accepted on top of the IANA numbers security rules use.
+PROTOCOLS = {'all': 'all', 'icmp': '1', 'tcp': '6', 'udp': '17',
+             'icmpv6': '58'}
+DIRECTIONS = ('INGRESS', 'EGRESS')
+
+
+def rule_matches(rule: Dict[str, Any], direction: str,
+                 protocol: str = None, port: int = None,
+                 cidr: str = None) -> bool:
+    """
+    Tell whether a security rule, given as a definition (see
+    `chaosoci.util.backups.resource_definition`) of a security list or
+    network security group rule in the `direction` given, allows traffic
+    matching the protocol, destination port and CIDR.
+
+    A rule allowing every protocol, or every port, allows those given, and
+    a CIDR matches the rules whose source (or destination, for egress
+    rules) overlaps it. Criteria left out match every rule.
+    """
+    if protocol is not None:
+        code = PROTOCOLS.get(str(protocol).lower(), str(protocol))
+        if rule.get('protocol') not in ('all', code):
+            return False
+
+    if port is not None:
+        if rule.get('protocol') not in ('all', '6', '17'):
+            return False
+        options = rule.get('tcp_options') or rule.get('udp_options') or {}
+        ports = options.get('destination_port_range')
+        if ports and not ports['min'] <= int(port) <= ports['max']:
+            return False
+
+    if cidr is not None:
+        side = 'source' if direction == 'INGRESS' else 'destination'
+        if not _overlaps(rule.get(side), rule.get(side + '_type'), cidr):
+            return False
+
+    return True
+
+
+def check_direction(direction: Optional[str]) -> Optional[str]:
+    """
+    Return the direction in upper case, or `None` for both directions, and
+    fail on unknown ones.
+    """
+    if direction is None:
+        return None
+    if direction.upper() not in DIRECTIONS:
+        raise ActivityFailed('Unknown rule direction: {}, expected one of '
+                             '{}'.format(direction, ', '.join(DIRECTIONS)))
+    return direction.upper()
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _overlaps(value: Optional[str], value_type: Optional[str],
+              cidr: str) -> bool:
+    if value is None:
+        return False
+    if value_type not in (None, 'CIDR_BLOCK'):
+        # service CIDR labels and security group OCIDs
+        return value == cidr
+    try:
+        return ipaddress.ip_network(value, strict=False).overlaps(
+            ipaddress.ip_network(cidr, strict=False))
+    except (TypeError, ValueError):
+        return value == cidr
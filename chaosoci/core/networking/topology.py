@@ -0,0 +1,170 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["VcnTopology", "RESOURCE_TYPES", "vcn_topology"]
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from chaoslib.exceptions import ActivityFailed
+from chaoslib.types import Configuration, Secrets
+
+from chaosoci import get_compartment_id, oci_client
+from chaosoci.util.cache import cached_inventory, client_scope
+from chaosoci.util.executor import DEFAULT_MAX_WORKERS, run_concurrently
+from chaosoci.util.pagination import prefetch_pages
+from chaosoci.util.records import compact_listings
+
+from logzero import logger
+
+from oci.core import VirtualNetworkClient
+
+from .common import (get_internet_gateway, get_nat_gateway, get_route_tables,
+                     get_security_lists, get_service_gateway, get_subnets)
+
+# The resources of a VCN a topology holds, and how each type is listed.
+_LISTINGS = OrderedDict([
+    ('route_tables', get_route_tables),
+    ('nat_gateways', get_nat_gateway),
+    ('internet_gateways', get_internet_gateway),
+    ('service_gateways', get_service_gateway),
+    ('subnets', get_subnets),
+    ('security_lists', get_security_lists),
+])
+RESOURCE_TYPES = tuple(_LISTINGS)
+
+
+class VcnTopology:
+    """
+    A snapshot of the route tables, gateways, subnets and security lists of
+    a VCN, indexed by OCID, along with the references between them: route
+    rules targeting gateways, gateways using route tables for transit
+    routing, and subnets using route tables and security lists.
+    """
+
+    def __init__(self, vcn_id: str, resources: Dict[str, Iterable[Any]]):
+        self.vcn_id = vcn_id
+        self._resources = {resource_type: list(resources.get(resource_type)
+                                               or [])
+                           for resource_type in RESOURCE_TYPES}
+        self._by_id = {}  # type: Dict[str, Any]
+        self._types = {}  # type: Dict[str, str]
+        self._referrers = {}  # type: Dict[str, List[str]]
+
+        for resource_type, members in self._resources.items():
+            for resource in members:
+                self._by_id[resource.id] = resource
+                self._types[resource.id] = resource_type
+
+        for route_table in self._resources['route_tables']:
+            for rule in _field(route_table, 'route_rules') or []:
+                self._refer(_field(rule, 'network_entity_id'),
+                            route_table.id)
+        for gateway_type in ('nat_gateways', 'internet_gateways',
+                             'service_gateways'):
+            for gateway in self._resources[gateway_type]:
+                self._refer(_field(gateway, 'route_table_id'), gateway.id)
+        for subnet in self._resources['subnets']:
+            self._refer(_field(subnet, 'route_table_id'), subnet.id)
+            for security_list_id in _field(subnet,
+                                           'security_list_ids') or []:
+                self._refer(security_list_id, subnet.id)
+
+    @classmethod
+    def fetch(cls, client: VirtualNetworkClient, compartment_id: str,
+              vcn_id: str, configuration: Configuration = None,
+              max_workers: int = DEFAULT_MAX_WORKERS) -> 'VcnTopology':
+        """
+        List every resource type of the VCN concurrently and build its
+        topology. Listings go through the inventory cache, under the same
+        keys as the networking probes, so with `oci_inventory_ttl` set a
+        topology and the probes share the same listings.
+        """
+        def load(resource_type: str) -> Iterable[Any]:
+            get_resources = _LISTINGS[resource_type]
+            return cached_inventory(
+                resource_type, (client_scope(client), compartment_id, vcn_id),
+                lambda: get_resources(
+                    client, compartment_id, vcn_id,
+                    prefetch=prefetch_pages(configuration),
+                    compact=compact_listings(configuration)),
+                configuration)
+
+        reports = run_concurrently(load, RESOURCE_TYPES,
+                                   max_workers=max_workers)
+        failed = [report for report in reports if not report['success']]
+        if failed:
+            raise ActivityFailed('Could not list the {} of VCN {}: {}'.format(
+                ', '.join(report['id'] for report in failed), vcn_id,
+                failed[0]['error']))
+
+        topology = cls(vcn_id, {report['id']: report['result']
+                                for report in reports})
+        logger.debug("Fetched the topology of VCN %s: %s", vcn_id, topology)
+        return topology
+
+    def resources(self, resource_type: str) -> List[Any]:
+        """Return the resources of the given type, see `RESOURCE_TYPES`."""
+        if resource_type not in self._resources:
+            raise ActivityFailed('Unknown VCN resource type: {}, expected '
+                                 'one of {}'.format(resource_type,
+                                                    ', '.join(RESOURCE_TYPES)))
+        return self._resources[resource_type]
+
+    def get(self, resource_id: str) -> Optional[Any]:
+        """Return the resource with the given OCID, if the VCN has it."""
+        return self._by_id.get(resource_id)
+
+    def resource_type(self, resource_id: str) -> Optional[str]:
+        """Return the type of the resource with the given OCID."""
+        return self._types.get(resource_id)
+
+    def referrers(self, resource_id: str) -> List[Any]:
+        """
+        Return the resources referencing the given one: the route tables
+        with a rule targeting a gateway, the gateways and subnets using a
+        route table, or the subnets using a security list.
+        """
+        return [self._by_id[referrer]
+                for referrer in self._referrers.get(resource_id, [])]
+
+    def __repr__(self) -> str:
+        return 'VcnTopology({})'.format(', '.join(
+            '{} {}'.format(len(members), resource_type)
+            for resource_type, members in self._resources.items()))
+
+    def _refer(self, resource_id: Optional[str], referrer_id: str):
+        if not resource_id:
+            return
+        referrers = self._referrers.setdefault(resource_id, [])
+        if referrer_id not in referrers:
+            referrers.append(referrer_id)
+
+
+def vcn_topology(compartment_id: str = None, vcn_id: str = None,
+                 configuration: Configuration = None,
+                 secrets: Secrets = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS) -> VcnTopology:
+    """
+    Fetch the topology of the VCN 'vcn_id' in the compartment
+    'compartment_id', see `VcnTopology.fetch`.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None or vcn_id is None:
+        raise ActivityFailed('A compartment id or vcn id is required.')
+
+    client = oci_client(VirtualNetworkClient, configuration, secrets,
+                        skip_deserialization=False)
+    return VcnTopology.fetch(client, compartment_id, vcn_id, configuration,
+                             max_workers)
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _field(resource: Any, name: str) -> Any:
+    # resources restored from the snapshot store may hold plain dicts
+    if isinstance(resource, dict):
+        return resource.get(name)
+    return getattr(resource, name, None)
@@ -10,12 +10,13 @@ from oci.load_balancer import LoadBalancerClient
 from oci.object_storage import ObjectStorageClient
 from oci.retry import DEFAULT_RETRY_STRATEGY
 
-from chaosoci import oci_client
+from chaosoci import get_compartment_id, oci_client
 from chaosoci.types import OCIResponse
+from chaosoci.util.cache import invalidate_inventory
+from chaosoci.util.pagination import prefetch_pages
 
 from logzero import logger
 
-from oci.config import from_file
 from oci.core import ComputeClient, ComputeManagementClient
 
 from .common import (get_buckets, filter_buckets, get_objects, filter_obstore_objects)
@@ -35,6 +36,7 @@ def delete_bucket(namespace_name: str,
     client = oci_client(ObjectStorageClient, configuration, secrets,
                         skip_deserialization=True)
     delete_bucket_response = client.delete_bucket(namespace_name, bucket_name).data
+    invalidate_inventory('buckets', 'objects')
 
     return delete_bucket_response
 
@@ -58,8 +60,10 @@ def delete_buckets_in_compartment(filters: List[Dict[str, Any]],
                        'delete all buckets in the Compartment %s! matching the filter criteria'
                        % compartment_id)
 
-        compartment_id = compartment_id or from_file().get('compartment')
-        bucket_names = get_buckets(client, compartment_id)
+        compartment_id = get_compartment_id(compartment_id, configuration)
+        bucket_names = get_buckets(client, compartment_id,
+                                   prefetch=prefetch_pages(configuration),
+                                   namespace_name=namespace_name)
 
         filters = filters or None
         if filters is not None:
@@ -92,6 +96,7 @@ def delete_object(namespace_name: str,
     client = oci_client(ObjectStorageClient, configuration, secrets,
                         skip_deserialization=True)
     delete_object_response = client.delete_object(namespace_name, bucket_name, object_name).data
+    invalidate_inventory('objects')
 
     return delete_object_response
 
@@ -116,24 +121,28 @@ def delete_objects_in_compartment(filters: List[Dict[str, Any]],
                        'delete all objects in the Compartment %s! matching the filter criteria'
                        % compartment_id)
 
-        compartment_id = compartment_id or from_file().get('compartment')
-        object_names = get_objects(client, compartment_id)
+        compartment_id = get_compartment_id(compartment_id, configuration)
+        objects = get_objects(client, namespace_name, bucket_name,
+                              prefetch=prefetch_pages(configuration),
+                              raw=True)
 
         filters = filters or None
         if filters is not None:
-            object_names = filter_obstore_objects(object_names, filters=filters)
+            objects = filter_obstore_objects(objects, filters=filters)
 
-        if not object_names:
+        if not objects:
             raise FailedActivity(
                 'No objects found matching filters: %s' % str(filters))
 
+        object_names = [o.name for o in objects]
         logger.debug('Objects in Compartment %s selected: %s}.' % (
             compartment_id, str(object_names)))
 
     delete_object_response = []
 
     for object_name in object_names:
-        logger.debug("Picked Object '{}' from Compartment '{}' to be deleted", bucket_name, compartment_id)
+        logger.debug("Picked Object '%s' from Bucket '%s' to be deleted",
+                     object_name, bucket_name)
 
         delete_object_response.append(delete_object(namespace_name, bucket_name, object_name))
 
@@ -1,105 +1,117 @@
 # -*- coding: utf-8 -*-
-__all__ = ["get_buckets", "filter_buckets", "get_objects", "filter_obstore_objects"]
+__all__ = ["get_buckets", "iter_buckets", "filter_buckets",
+           "get_objects", "iter_objects", "filter_obstore_objects"]
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Union
 
 from chaoslib.exceptions import ActivityFailed
 
 from logzero import logger
 
 from oci.core import ComputeClient, ComputeManagementClient
-from oci.object_storage.models import Bucket, ObjectSummary
+from oci.object_storage.models import Bucket, BucketSummary, ObjectSummary
 
 from oci.object_storage import ObjectStorageClient
 
+from chaosoci.util.filters import filter_resources
+from chaosoci.util.pagination import iter_pages, paginate
+from chaosoci.util.rawjson import paginate_raw
+from chaosoci.util.records import compact_records
+
 
 def get_buckets(client: ObjectStorageClient = None,
-                compartment_id: str = None) -> List[Bucket]:
+                compartment_id: str = None,
+                prefetch: int = 0,
+                compact: Union[bool, Sequence[str]] = False,
+                raw: bool = False,
+                namespace_name: str = None) -> List[Bucket]:
     """Return a complete, unfiltered list of buckets in the compartment."""
-    buckets = []
-
-    buckets_raw = client.list_buckets(compartment_id=compartment_id)
-    buckets.extend(buckets_raw.data)
-    while buckets_raw.has_next_page:
-        buckets_raw = client.list_buckets(compartment_id=compartment_id,
-                                          page=buckets_raw.next_page)
-        buckets.extend(buckets_raw.data)
-
-    return buckets
-
-
-def filter_buckets(buckets: List[Bucket] = None,
-                     filters: Dict[str, Any] = None) -> List[Bucket]:
+    resources = iter_buckets(client, compartment_id, prefetch=prefetch,
+                             raw=raw, namespace_name=namespace_name)
+    if compact:
+        resources = compact_records(resources, 'buckets', compact)
+    return list(resources)
+
+
+def iter_buckets(client: ObjectStorageClient = None,
+                 compartment_id: str = None,
+                 prefetch: int = 0,
+                 raw: bool = False,
+                 namespace_name: str = None) -> Iterator[Bucket]:
+    """
+    Lazily yield the buckets in the compartment, page by page, looking up
+    the tenancy's namespace when `namespace_name` is not given. With `raw`
+    set, and a client built with `skip_deserialization=True`, raw records
+    are yielded instead of `BucketSummary` models.
+    """
+    namespace_name = namespace_name or _namespace(client)
+    if raw:
+        return paginate_raw(client.list_buckets, BucketSummary,
+                            namespace_name, compartment_id,
+                            prefetch=prefetch)
+    return paginate(client.list_buckets, namespace_name, compartment_id,
+                    prefetch=prefetch)
+
+
+def filter_buckets(buckets: Iterable[Bucket] = None,
+                   filters: Dict[str, Any] = None) -> List[Bucket]:
     """Return only those buckets that match the filters provided."""
-    buckets = buckets or None
-
-    if buckets is None:
-        raise ActivityFailed('No buckets were found.')
-
-    filters_set = {x for x in filters}
-    available_filters_set = {x for x in buckets[0].attribute_map}
-
-    # Partial filtering may return buckets we do not want. We avoid it.
-    if not filters_set.issubset(available_filters_set):
-        raise ActivityFailed('Some of the chosen filters were not found,'
-                             ' we cannot continue.')
-
-    # Walk the buckets and find those that match the given filters.
-    filtered = []
-    for bucket in buckets:
-        sentinel = True
-        for attr, val in filters.items():
-            if val != getattr(bucket, attr, None):
-                sentinel = False
-                break
-
-        if sentinel:
-            filtered.append(bucket)
-
-    return filtered
+    return filter_resources(buckets or [], filters, 'buckets')
 
 
 def get_objects(client: ObjectStorageClient = None,
-                compartment_id: str = None) -> List[ObjectSummary]:
-    """Return a complete, unfiltered list of instances in the compartment."""
-    objects = []
-
-    objects_raw = client.list_objects(compartment_id=compartment_id)
-    objects.extend(objects_raw.data)
-    while objects_raw.has_next_page:
-        objects_raw = client.list_objects(compartment_id=compartment_id,
-                                          page=objects_raw.next_page)
-        objects.extend(objects_raw.data)
-
-    return objects
-
-
-def filter_obstore_objects(objects: List[ObjectSummary] = None,
-                     filters: Dict[str, Any] = None) -> List[ObjectSummary]:
-    """Return only those instances that match the filters provided."""
-    objects = objects or None
-
-    if objects is None:
-        raise ActivityFailed('No instances were found.')
-
-    filters_set = {x for x in filters}
-    available_filters_set = {x for x in objects[0].attribute_map}
-
-    # Partial filtering may return instances we do not want. We avoid it.
-    if not filters_set.issubset(available_filters_set):
-        raise ActivityFailed('Some of the chosen filters were not found,'
-                             ' we cannot continue.')
-
-    # Walk the instances and find those that match the given filters.
-    filtered = []
-    for bucket in objects:
-        sentinel = True
-        for attr, val in filters.items():
-            if val != getattr(bucket, attr, None):
-                sentinel = False
-                break
-
-        if sentinel:
-            filtered.append(bucket)
-
-    return filtered
\ No newline at end of file
+                namespace_name: str = None,
+                bucket_name: str = None,
+                prefetch: int = 0,
+                compact: Union[bool, Sequence[str]] = False,
+                raw: bool = False) -> List[ObjectSummary]:
+    """Return a complete, unfiltered list of objects in the bucket."""
+    resources = iter_objects(client, namespace_name, bucket_name,
+                             prefetch=prefetch, raw=raw)
+    if compact:
+        resources = compact_records(resources, 'objects', compact)
+    return list(resources)
+
+
+def iter_objects(client: ObjectStorageClient = None,
+                 namespace_name: str = None,
+                 bucket_name: str = None,
+                 prefetch: int = 0,
+                 raw: bool = False) -> Iterator[ObjectSummary]:
+    """
+    Lazily yield the objects in the bucket, page by page, looking up the
+    tenancy's namespace when `namespace_name` is not given. See
+    `iter_buckets` for the meaning of `raw`.
+    """
+    namespace_name = namespace_name or _namespace(client)
+    if raw:
+        return paginate_raw(client.list_objects, ObjectSummary,
+                            namespace_name, bucket_name, key='objects',
+                            prefetch=prefetch)
+    return _objects(iter_pages(client.list_objects, namespace_name,
+                               bucket_name, prefetch=prefetch))
+
+
+def filter_obstore_objects(objects: Iterable[ObjectSummary] = None,
+                           filters: Dict[str, Any] = None
+                           ) -> List[ObjectSummary]:
+    """Return only those objects that match the filters provided."""
+    return filter_resources(objects or [], filters, 'objects')
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _namespace(client: ObjectStorageClient) -> str:
+    namespace = client.get_namespace().data
+    # Without deserialization, the namespace comes back as a JSON string.
+    if isinstance(namespace, bytes):
+        namespace = namespace.decode('utf-8')
+    return namespace.strip('"') if isinstance(namespace, str) else namespace
+
+
+def _objects(pages: Iterable[Any]) -> Iterator[ObjectSummary]:
+    # `list_objects` wraps the objects of each page in a `ListObjects`.
+    for response in pages:
+        for item in response.data.objects or []:
+            yield item
@@ -1,15 +1,18 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Union
 
 from chaoslib.exceptions import ActivityFailed
 from chaoslib.types import Configuration, Secrets
 
-from oci.config import from_file
-from oci.core import ComputeClient, ComputeManagementClient
+from oci.object_storage import ObjectStorageClient
 
-from chaosoci import oci_client
+from chaosoci import get_compartment_id, oci_client
+from chaosoci.util.cache import cached_inventory, client_scope
+from chaosoci.util.filters import count_by
+from chaosoci.util.pagination import prefetch_pages
+from chaosoci.util.records import compact_listings
 
-__all__ = ['count_buckets', 'count_objects']
+__all__ = ['count_buckets', 'count_objects', 'count_buckets_by']
 
 from chaosoci.core.objectStorage.common import get_buckets, filter_buckets, filter_obstore_objects, get_objects
 
@@ -24,17 +27,22 @@ def count_buckets(filters: List[Dict[str, Any]], compartment_id: str = None,
 
     for details on the available filters under the 'parameters' section.
     """  # noqa: E501
-    compartment_id = compartment_id or from_file().get('compartment')
+    compartment_id = get_compartment_id(compartment_id, configuration)
 
     if compartment_id is None:
         raise ActivityFailed('We have not been able to find a compartment,'
                              ' without one, we cannot continue.')
 
-    client = oci_client(ComputeClient, configuration, secrets,
+    client = oci_client(ObjectStorageClient, configuration, secrets,
                         skip_deserialization=False)
 
     filters = filters or None
-    buckets = get_buckets(client, compartment_id)
+    buckets = cached_inventory(
+        'buckets', (client_scope(client), compartment_id),
+        lambda: get_buckets(client, compartment_id,
+                            prefetch=prefetch_pages(configuration),
+                            compact=compact_listings(configuration)),
+        configuration)
 
     if filters is not None:
         return len(filter_buckets(buckets, filters=filters))
@@ -42,29 +50,60 @@ def count_buckets(filters: List[Dict[str, Any]], compartment_id: str = None,
     return len(buckets)
 
 
-def count_objects(filters: List[Dict[str, Any]], compartment_id: str = None,
-                         configuration: Configuration = None,
-                         secrets: Secrets = None) -> int:
+def count_objects(filters: List[Dict[str, Any]], bucket_name: str,
+                  namespace_name: str = None,
+                  configuration: Configuration = None,
+                  secrets: Secrets = None) -> int:
     """
-    Return the number of objects in accordance with the given filters.
+    Return the number of objects in the bucket in accordance with the given
+    filters. The tenancy's namespace is looked up when `namespace_name` is
+    not given.
 
-    Please refer to: https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/core/models/oci.core.models.InstancePool.html#oci.core.models.Instance
+    Please refer to: https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/api/object_storage/models/oci.object_storage.models.ObjectSummary.html#oci.object_storage.models.ObjectSummary
 
     for details on the available filters under the 'parameters' section.
     """  # noqa: E501
-    compartment_id = compartment_id or from_file().get('compartment')
-
-    if compartment_id is None:
-        raise ActivityFailed('We have not been able to find a compartment,'
-                             ' without one, we cannot continue.')
-
-    client = oci_client(ComputeManagementClient, configuration, secrets,
+    client = oci_client(ObjectStorageClient, configuration, secrets,
                         skip_deserialization=False)
 
     filters = filters or None
-    objects = get_objects(client, compartment_id)
+    objects = cached_inventory(
+        'objects', (client_scope(client), namespace_name, bucket_name),
+        lambda: get_objects(client, namespace_name, bucket_name,
+                            prefetch=prefetch_pages(configuration),
+                            compact=compact_listings(configuration)),
+        configuration)
 
     if filters is not None:
         return len(filter_obstore_objects(objects, filters=filters))
 
     return len(objects)
+
+
+def count_buckets_by(group_by: Union[str, List[str]],
+                     filters: Dict[str, Any] = None,
+                     compartment_id: str = None,
+                     configuration: Configuration = None,
+                     secrets: Secrets = None) -> Dict[str, Any]:
+    """
+    Return the number of buckets matching the filters for each value of the
+    `group_by` attribute, e.g. `freeform_tags.team`, from a single listing
+    of the compartment. With a list of attributes, the counts are nested.
+    """
+    compartment_id = get_compartment_id(compartment_id, configuration)
+
+    if compartment_id is None:
+        raise ActivityFailed('We have not been able to find a compartment,'
+                             ' without one, we cannot continue.')
+
+    client = oci_client(ObjectStorageClient, configuration, secrets,
+                        skip_deserialization=False)
+
+    buckets = cached_inventory(
+        'buckets', (client_scope(client), compartment_id),
+        lambda: get_buckets(client, compartment_id,
+                            prefetch=prefetch_pages(configuration),
+                            compact=compact_listings(configuration)),
+        configuration)
+
+    return count_by(buckets, group_by, filters)
@@ -0,0 +1,171 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["resource_definition", "model_from_definition", "save_backup",
+           "pending_backups", "mark_restored", "discard_backup"]
+
+import importlib
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List
+
+from chaoslib.types import Configuration
+from logzero import logger
+from oci.util import to_dict
+
+from chaosoci.util.constants import BACKUP_STORE
+from chaosoci.util.records import Record
+
+# Backups made by this process, by id.
+_backups = {}  # type: Dict[str, Dict[str, Any]]
+_backups_lock = threading.Lock()
+
+
+def resource_definition(resource: Any) -> Dict[str, Any]:
+    """
+    Return the full definition of a resource, SDK model or record, as plain
+    JSON-compatible data.
+    """
+    if isinstance(resource, Record):
+        resource = resource.to_dict()
+    return to_dict(resource)
+
+
+def model_from_definition(model: type, definition: Dict[str, Any]) -> Any:
+    """
+    Rebuild an SDK model of the `model` class, nested models included, from
+    the definition `resource_definition` made of it or of a similar model,
+    ignoring the fields `model` does not have.
+    """
+    if definition is None:
+        return None
+
+    package = importlib.import_module(model.__module__.rsplit('.', 1)[0])
+    values = {}
+    for attr, swagger_type in model().swagger_types.items():
+        value = definition.get(attr)
+        nested = re.match(r'^list\[(\w+)\]$', swagger_type)
+        if value is not None and nested and hasattr(package, nested.group(1)):
+            nested_model = getattr(package, nested.group(1))
+            value = [model_from_definition(nested_model, item)
+                     for item in value]
+        elif value is not None and hasattr(package, swagger_type):
+            value = model_from_definition(getattr(package, swagger_type),
+                                          value)
+        values[attr] = value
+    return model(**values)
+
+
+def save_backup(scope: str, resource_type: str, resource: Any,
+                attachments: Dict[str, Any] = None,
+                configuration: Configuration = None) -> Dict[str, Any]:
+    """
+    Record the definition of a resource about to be deleted, so that it can
+    be recreated later:
+
+        {"backup_id": "...", "scope": "ocid1.vcn...",
+         "resource_type": "nat_gateways", "definition": {...},
+         "attachments": {}, "created_at": "2020-06-01T10:00:00+00:00",
+         "restored_id": null}
+
+    `scope` groups the backups a rollback restores together, such as the
+    resource's VCN, and `attachments` records how other resources used it.
+    Backups are kept in memory, and saved as JSON in the `oci_backup_store`
+    directory when the configuration sets one.
+    """
+    backup = {
+        'backup_id': uuid.uuid4().hex,
+        'scope': scope,
+        'resource_type': resource_type,
+        'definition': resource_definition(resource),
+        'attachments': attachments or {},
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'restored_id': None,
+    }
+    with _backups_lock:
+        _backups[backup['backup_id']] = backup
+    _write(backup, configuration)
+
+    logger.debug("Backed up %s %s", resource_type,
+                 getattr(resource, 'display_name', None))
+    return backup
+
+
+def pending_backups(scope: str, resource_types: Iterable[str] = None,
+                    configuration: Configuration = None
+                    ) -> List[Dict[str, Any]]:
+    """
+    Return the backups of the scope not restored yet, of the given resource
+    types only when some are given, oldest first. Backups saved by earlier
+    runs are read from the `oci_backup_store` directory.
+    """
+    with _backups_lock:
+        backups = dict(_backups)
+
+    directory = (configuration or {}).get(BACKUP_STORE)
+    if directory and os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            backup_id, extension = os.path.splitext(name)
+            if extension != '.json' or backup_id in backups:
+                continue
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    backups[backup_id] = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable backup %s: %s", name, e)
+
+    resource_types = set(resource_types) if resource_types else None
+    return sorted((backup for backup in backups.values()
+                   if backup['scope'] == scope and
+                   backup['restored_id'] is None and
+                   (resource_types is None or
+                    backup['resource_type'] in resource_types)),
+                  key=lambda backup: backup['created_at'])
+
+
+def mark_restored(backup: Dict[str, Any], restored_id: str,
+                  configuration: Configuration = None):
+    """
+    Record that the backed up resource was recreated as `restored_id`, so
+    that it is not restored again.
+    """
+    backup['restored_id'] = restored_id
+    with _backups_lock:
+        _backups[backup['backup_id']] = backup
+    _write(backup, configuration)
+
+
+def discard_backup(backup: Dict[str, Any],
+                   configuration: Configuration = None):
+    """
+    Forget a backup, such as that of a resource whose deletion failed, so
+    that it is never restored.
+    """
+    with _backups_lock:
+        _backups.pop(backup['backup_id'], None)
+
+    directory = (configuration or {}).get(BACKUP_STORE)
+    if directory:
+        try:
+            os.remove(os.path.join(directory, '{}.json'.format(
+                backup['backup_id'])))
+        except FileNotFoundError:
+            pass
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _write(backup: Dict[str, Any], configuration: Configuration = None):
+    directory = (configuration or {}).get(BACKUP_STORE)
+    if not directory:
+        return
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '{}.json'.format(
+            backup['backup_id'])), 'w') as f:
+        json.dump(backup, f, indent=2)
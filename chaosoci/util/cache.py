@@ -0,0 +1,139 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["InventoryCache", "inventory_cache", "cached_inventory",
+           "client_scope", "invalidate_inventory", "inventory_ttl",
+           "inventory_version"]
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+from chaoslib.types import Configuration
+from logzero import logger
+
+from chaosoci.util.constants import INVENTORY_TTL
+from chaosoci.util.inventory import Inventory
+from chaosoci.util.snapshots import invalidate_snapshots, snapshot_loader
+
+
+class InventoryCache:
+    """
+    In-process cache of compartment listings, keyed by resource type and
+    scope (compartment, VCN or load balancer, region and server-side
+    filters). Entries expire after their TTL, or as soon as an action
+    invalidates their resource type.
+    """
+
+    def __init__(self):
+        self._entries = {}  # type: Dict[Tuple, Tuple[float, Inventory]]
+        self._versions = {}  # type: Dict[str, int]
+        self._lock = threading.Lock()
+
+    def get_or_load(self, resource_type: str, scope: Tuple[Hashable, ...],
+                    loader: Callable[[], Iterable[Any]],
+                    ttl: float) -> Inventory:
+        """
+        Return the cached inventory for the key, calling `loader` to list
+        the resources when it is missing or older than `ttl` seconds. A
+        listing during which an action invalidated the resource type is
+        returned but not cached, as it may predate the action.
+        """
+        key = (resource_type,) + tuple(_hashable(part) for part in scope)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                logger.debug("Serving %s from the inventory cache",
+                             resource_type)
+                return entry[1]
+            version = self._versions.get(resource_type, 0)
+
+        inventory = Inventory(loader())
+        with self._lock:
+            if self._versions.get(resource_type, 0) == version:
+                self._entries[key] = (time.monotonic() + ttl, inventory)
+        return inventory
+
+    def invalidate(self, *resource_types: str):
+        """
+        Drop every cached listing of the given resource types, and move on
+        to their next version.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k[0] in resource_types]:
+                del self._entries[key]
+            for resource_type in resource_types:
+                self._versions[resource_type] = \
+                    self._versions.get(resource_type, 0) + 1
+
+    def version(self, resource_type: str) -> int:
+        """
+        Return the version of the resource type's listings, which changes
+        each time an action invalidates them.
+        """
+        with self._lock:
+            return self._versions.get(resource_type, 0)
+
+    def clear(self):
+        """Drop every cached listing."""
+        with self._lock:
+            self._entries.clear()
+
+
+inventory_cache = InventoryCache()
+
+
+def inventory_ttl(configuration: Configuration = None) -> float:
+    """Return how long, in seconds, listings may be served from the cache."""
+    return float((configuration or {}).get(INVENTORY_TTL) or 0)
+
+
+def cached_inventory(resource_type: str, scope: Tuple[Hashable, ...],
+                     loader: Callable[[], Iterable[Any]],
+                     configuration: Configuration = None) -> Iterable[Any]:
+    """
+    Return the listing produced by `loader`, served from the inventory cache
+    when the configuration enables it through `oci_inventory_ttl`, and from
+    the snapshot store when `oci_snapshot_store` is set.
+    """
+    loader = snapshot_loader(resource_type, scope, loader, configuration)
+    ttl = inventory_ttl(configuration)
+    if ttl <= 0:
+        return loader()
+    return inventory_cache.get_or_load(resource_type, scope, loader, ttl)
+
+
+def invalidate_inventory(*resource_types: str):
+    """
+    Forget the cached and stored listings of resource types an action
+    modified.
+    """
+    inventory_cache.invalidate(*resource_types)
+    invalidate_snapshots(*resource_types)
+
+
+def inventory_version(resource_type: str) -> int:
+    """
+    Return the version of the resource type's listings in this process,
+    bumped by every action modifying resources of that type.
+    """
+    return inventory_cache.version(resource_type)
+
+
+def client_scope(client: Any) -> Hashable:
+    """
+    Return what identifies the region and tenancy a client talks to, so
+    listings from different configurations are cached apart.
+    """
+    base_client = getattr(client, 'base_client', None)
+    return getattr(base_client, 'endpoint', None) or id(client)
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _hashable(part: Any) -> Hashable:
+    if isinstance(part, dict):
+        return tuple(sorted(part.items()))
+    return part
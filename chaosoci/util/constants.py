@@ -2,3 +2,33 @@
 # Copyright 2020, Oracle Corporation and/or its affiliates.
 
 FILTER_ERR = 'Some of the chosen filters were not found, we cannot continue.'
+
+# Configuration key holding, in seconds, how long probes may reuse a
+# compartment listing. Listings are not cached when unset or zero.
+INVENTORY_TTL = 'oci_inventory_ttl'
+
+# Configuration keys enabling the SQLite snapshot store: the path of the
+# database, and the age, in seconds, up to which probes answer from it.
+SNAPSHOT_STORE = 'oci_snapshot_store'
+SNAPSHOT_MAX_AGE = 'oci_snapshot_max_age'
+
+# Configuration key naming a directory where plans of compartment-wide
+# actions are saved, so they can be applied by a later run.
+PLAN_STORE = 'oci_plan_store'
+
+# Configuration key naming a directory where the definitions of deleted
+# resources are saved, so a rollback in a later run can recreate them.
+BACKUP_STORE = 'oci_backup_store'
+
+# Configuration key setting how many pages of a listing may be fetched
+# ahead of the one being read, on a background thread. Pages are fetched
+# one at a time when unset or zero.
+PREFETCH_PAGES = 'oci_prefetch_pages'
+
+# Configuration key asking the probes to keep their listings as compact
+# records, holding only the default fields of each resource type.
+COMPACT_LISTINGS = 'oci_compact_listings'
+
+# Configuration key setting how old, in seconds, a plan may be when an
+# action applies it. Plans of any age are applied when unset.
+PLAN_MAX_AGE = 'oci_plan_max_age'
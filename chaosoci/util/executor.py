@@ -0,0 +1,122 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["run_concurrently", "summarize", "DEFAULT_MAX_WORKERS"]
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List
+
+from logzero import logger
+
+# Enough to overlap the latency of many API calls without running into the
+# services' request throttling.
+DEFAULT_MAX_WORKERS = 10
+
+# How often calls are checked against their timeout.
+TIMEOUT_POLL_INTERVAL = 0.05
+
+Report = Dict[str, Any]
+
+
+def run_concurrently(func: Callable[[Any], Any], items: Iterable[Any],
+                     max_workers: int = DEFAULT_MAX_WORKERS,
+                     timeout: float = None,
+                     key: Callable[[Any], Any] = None) -> List[Report]:
+    """
+    Call `func` on every item, running up to `max_workers` calls at once,
+    and return one report per item, in the order of `items`:
+
+        {"id": ..., "success": True, "result": ..., "duration": 0.42}
+        {"id": ..., "success": False, "error": "...", "duration": 0.42}
+
+    `id` is the item itself, or `key(item)` when `key` is given. A failing
+    call is reported and does not stop the others. A call still running
+    `timeout` seconds after it started is no longer waited for, and is
+    reported as failed with `"timed_out": True`. It cannot be cancelled
+    though, so it may still complete, and its effect take place, later.
+    """
+    items = list(items)
+    key = key or (lambda item: item)
+    reports = [None] * len(items)  # type: List[Report]
+    if not items:
+        return reports
+
+    started = {}  # type: Dict[int, float]
+    durations = {}  # type: Dict[int, float]
+    lock = threading.Lock()
+
+    def call(position: int, item: Any) -> Any:
+        start = time.monotonic()
+        with lock:
+            started[position] = start
+        try:
+            return func(item)
+        finally:
+            with lock:
+                durations[position] = time.monotonic() - start
+
+    workers = max(1, min(max_workers or DEFAULT_MAX_WORKERS, len(items)))
+    executor = ThreadPoolExecutor(max_workers=workers,
+                                  thread_name_prefix='chaosoci')
+    futures = {executor.submit(call, position, item): position
+               for position, item in enumerate(items)}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(
+                pending, return_when=FIRST_COMPLETED,
+                timeout=TIMEOUT_POLL_INTERVAL if timeout else None)
+
+            for future in done:
+                position = futures[future]
+                with lock:
+                    duration = durations.get(position, 0.0)
+                report = {'id': key(items[position]), 'duration': duration}
+                try:
+                    report['result'] = future.result()
+                    report['success'] = True
+                except Exception as e:
+                    logger.debug("Call for %s failed: %s", report['id'], e)
+                    report['error'] = str(e) or type(e).__name__
+                    report['success'] = False
+                reports[position] = report
+
+            if timeout:
+                now = time.monotonic()
+                with lock:
+                    expired = [future for future in pending
+                               if now - started.get(futures[future], now) >=
+                               timeout]
+                for future in expired:
+                    pending.discard(future)
+                    position = futures[future]
+                    reports[position] = {
+                        'id': key(items[position]), 'success': False,
+                        'timed_out': True,
+                        'error': 'Timed out after {}s (may still '
+                                 'complete)'.format(timeout),
+                        'duration': timeout}
+    finally:
+        # calls that timed out may still be running, do not wait for them
+        executor.shutdown(wait=False)
+
+    return reports
+
+
+def summarize(reports: List[Report], what: str = "calls") -> Dict[str, int]:
+    """
+    Log and return how many of the reported calls succeeded and failed.
+    """
+    failed = [report for report in reports if not report['success']]
+    summary = {'succeeded': len(reports) - len(failed),
+               'failed': len(failed)}
+    if failed:
+        logger.warning("%d of %d %s failed: %s", len(failed), len(reports),
+                       what, ', '.join('{} ({})'.format(
+                           report['id'], report['error'])
+                           for report in failed))
+    else:
+        logger.debug("All %d %s succeeded", len(reports), what)
+    return summary
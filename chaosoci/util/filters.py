@@ -0,0 +1,379 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["compile_filters", "count_by", "filter_resources",
+           "iter_filtered", "get_attribute", "pushdown_filters", "OPERATORS"]
+
+import re
+import threading
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import (Any, Callable, Dict, FrozenSet, Iterable, Iterator, List,
+                    Optional, Sequence, Tuple, Union)
+
+from chaoslib.exceptions import ActivityFailed
+from dateutil.parser import isoparse
+
+from chaosoci.util.constants import FILTER_ERR
+
+Filters = Union[Dict[str, Any], List[Dict[str, Any]]]
+Predicate = Callable[[Any], bool]
+
+# A filter value is either compared for equality with the attribute, or is
+# a mapping of one or more of these operators to their operand, e.g.
+# {"lifecycle_state": {"in": ["RUNNING", "STARTING"]}}.
+OPERATORS = ("eq", "not", "in", "not_in", "prefix", "regex", "range")
+
+# Attribute names of the SDK model classes already seen, so the filters are
+# validated against a model class once rather than on every call.
+_known_attributes = {}  # type: Dict[type, Optional[FrozenSet[str]]]
+_known_attributes_lock = threading.Lock()
+
+
+def filter_resources(resources: Iterable[Any], filters: Filters,
+                     resource_type: str = "resources") -> List[Any]:
+    """
+    Return only those resources that match the filters provided.
+
+    `filters` maps attribute names to expected values or operators (see
+    `OPERATORS`); dotted names such as `freeform_tags.env` look into nested
+    mappings like tags. A list of such mappings matches resources that
+    satisfy any one of them.
+
+    Filtering on attributes the resources do not have fails rather than
+    returning a partial match, as does an empty listing.
+
+    When `resources` is an `Inventory`, equality filters are answered from
+    its attribute indexes and only the matching resources are visited.
+    """
+    candidates = _indexed_candidates(resources, filters)
+    if candidates is not None:
+        _validate(resources[0], _top_level_attributes(filters))
+        predicate = compile_filters(filters)
+        return [resource for resource in candidates if predicate(resource)]
+
+    return list(iter_filtered(resources, filters, resource_type))
+
+
+def iter_filtered(resources: Iterable[Any], filters: Filters,
+                  resource_type: str = "resources") -> Iterator[Any]:
+    """
+    Lazily yield the resources matching the filters, as they are read from
+    `resources`, so a streamed listing is filtered without being held in
+    memory. Fails like `filter_resources` does, once the filters are found
+    not to apply or the listing turns out to be empty.
+    """
+    predicate = compile_filters(filters)
+    attributes = _top_level_attributes(filters)
+
+    found = False
+    for resource in resources:
+        if not found:
+            found = True
+            _validate(resource, attributes)
+        if predicate(resource):
+            yield resource
+
+    if not found:
+        raise ActivityFailed('No {} were found.'.format(resource_type))
+
+
+def count_by(resources: Iterable[Any], group_by: Union[str, Sequence[str]],
+             filters: Filters = None) -> Dict[Any, Any]:
+    """
+    Count the resources matching the filters by the value of their
+    attribute at `group_by`, in a single pass over them:
+
+        {"RUNNING": 12, "STOPPED": 3}
+
+    With a list of attributes, the counts are nested in that order, e.g.
+    by availability domain then lifecycle state. Values that cannot be used
+    as keys of a JSON object are counted under their string form. An empty
+    listing gives no counts.
+    """
+    paths = [group_by] if isinstance(group_by, str) else list(group_by)
+    if not paths:
+        raise ActivityFailed('At least one attribute to count by is needed.')
+
+    getters = [_getter(path) for path in paths]
+    predicate = compile_filters(filters)
+    attributes = _top_level_attributes(filters) | frozenset(
+        path.partition('.')[0] for path in paths)
+
+    counts = {}  # type: Dict[Any, Any]
+    found = False
+    for resource in resources:
+        if not found:
+            found = True
+            _validate(resource, attributes)
+        if not predicate(resource):
+            continue
+
+        node = counts
+        for get in getters[:-1]:
+            node = node.setdefault(_count_key(get(resource)), {})
+        key = _count_key(getters[-1](resource))
+        node[key] = node.get(key, 0) + 1
+
+    return counts
+
+
+def compile_filters(filters: Filters) -> Predicate:
+    """
+    Compile the filters into a single predicate telling whether a resource
+    matches them.
+    """
+    if not filters:
+        return lambda resource: True
+
+    if isinstance(filters, Mapping):
+        return _compile_clause(filters)
+
+    clauses = [_compile_clause(clause) for clause in filters]
+    return lambda resource: any(clause(resource) for clause in clauses)
+
+
+def get_attribute(resource: Any, path: str) -> Any:
+    """
+    Return the value of the attribute at the dotted `path` of the resource,
+    looking up mapping keys past the first segment, or `None` when missing.
+    """
+    return _getter(path)(resource)
+
+
+def pushdown_filters(filters: Dict[str, Any],
+                     supported: Iterable[str]) -> Dict[str, Any]:
+    """
+    Return the subset of `filters` that the listing call accepts as query
+    parameters, so the service does the filtering before sending results
+    back. The returned filters must still be matched client-side: only
+    equality on plain values is pushed down, and anything else is left to
+    the client.
+    """
+    if not isinstance(filters, dict):
+        return {}
+
+    return {attr: val for attr, val in filters.items()
+            if attr in supported and isinstance(val, str)}
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _compile_clause(clause: Dict[str, Any]) -> Predicate:
+    tests = tuple((_getter(attr), _compile_test(attr, val))
+                  for attr, val in clause.items())
+
+    def predicate(resource: Any) -> bool:
+        for get, test in tests:
+            if not test(get(resource)):
+                return False
+        return True
+
+    return predicate
+
+
+def _getter(path: str) -> Callable[[Any], Any]:
+    head, _, rest = path.partition('.')
+    if not rest:
+        return lambda resource: getattr(resource, head, None)
+
+    keys = rest.split('.')
+
+    def get(resource: Any) -> Any:
+        value = getattr(resource, head, None)
+        for key in keys:
+            if isinstance(value, Mapping):
+                value = value.get(key)
+            else:
+                value = getattr(value, key, None)
+            if value is None:
+                return None
+        return value
+
+    return get
+
+
+def _is_operator_spec(val: Any) -> bool:
+    return isinstance(val, Mapping) and len(val) > 0 and \
+        all(op in OPERATORS for op in val)
+
+
+def _compile_test(attr: str, val: Any) -> Predicate:
+    if not _is_operator_spec(val):
+        return lambda value: value == val
+
+    tests = tuple(_compile_operator(attr, op, operand)
+                  for op, operand in val.items())
+    if len(tests) == 1:
+        return tests[0]
+    return lambda value: all(test(value) for test in tests)
+
+
+def _compile_operator(attr: str, op: str, operand: Any) -> Predicate:
+    if op == "eq":
+        return lambda value: value == operand
+
+    if op == "not":
+        return lambda value: value != operand
+
+    if op in ("in", "not_in"):
+        members = _as_members(operand)
+        if op == "in":
+            return lambda value: _contains(members, value)
+        return lambda value: not _contains(members, value)
+
+    if op == "prefix":
+        prefixes = tuple(operand) if isinstance(operand, (list, tuple)) \
+            else (operand,)
+        return lambda value: isinstance(value, str) and \
+            value.startswith(prefixes)
+
+    if op == "regex":
+        pattern = re.compile(operand)
+        return lambda value: isinstance(value, str) and \
+            pattern.search(value) is not None
+
+    if op == "range":
+        if not isinstance(operand, (list, tuple)) or len(operand) != 2:
+            raise ActivityFailed(
+                'A range filter takes a [lower, upper] pair, got: {}'.format(
+                    operand))
+        lower, upper = (_Bound(bound) for bound in operand)
+
+        def in_range(value: Any) -> bool:
+            if value is None:
+                return False
+            try:
+                return lower.below(value) and upper.above(value)
+            except TypeError:
+                raise ActivityFailed(
+                    'Cannot compare {} {!r} with the range {}'.format(
+                        attr, value, operand))
+
+        return in_range
+
+    raise ActivityFailed('Unknown filter operator: {}'.format(op))
+
+
+def _as_members(operand: Any) -> Tuple[Any, ...]:
+    if not isinstance(operand, (list, tuple, set, frozenset)):
+        operand = (operand,)
+    try:
+        return frozenset(operand)
+    except TypeError:
+        return tuple(operand)
+
+
+def _contains(members: Iterable[Any], value: Any) -> bool:
+    try:
+        return value in members
+    except TypeError:
+        # unhashable attribute values, such as tags, against a frozenset
+        return any(value == member for member in members)
+
+
+class _Bound:
+    """
+    One end of a range filter, `None` meaning unbounded. Dates and times
+    without a timezone are taken as UTC, like those of the SDK models.
+    """
+
+    def __init__(self, bound: Any):
+        self.bound = bound
+        self.as_datetime = None
+        if isinstance(bound, datetime):
+            self.as_datetime = _utc(bound)
+        elif isinstance(bound, str):
+            try:
+                self.as_datetime = _utc(isoparse(bound))
+            except ValueError:
+                pass
+
+    def _operand(self, value: Any) -> Any:
+        if self.as_datetime is not None and isinstance(value, datetime):
+            return self.as_datetime
+        return self.bound
+
+    def below(self, value: Any) -> bool:
+        return self.bound is None or self._operand(value) <= _utc(value)
+
+    def above(self, value: Any) -> bool:
+        return self.bound is None or _utc(value) <= self._operand(value)
+
+
+def _utc(value: Any) -> Any:
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _indexed_candidates(resources: Iterable[Any],
+                        filters: Filters) -> Optional[List[Any]]:
+    """
+    Return the smallest set of candidates the inventory's indexes give for
+    the equality filters, in listing order, or `None` when the resources
+    must be scanned.
+    """
+    # imported here as the inventory relies on this module's lookups
+    from chaosoci.util.inventory import Inventory
+
+    if not isinstance(resources, Inventory) or not len(resources) or \
+            not isinstance(filters, Mapping):
+        return None
+
+    best = None
+    for attr, val in filters.items():
+        if not _is_operator_spec(val):
+            values = (val,)
+        elif set(val) == {"eq"}:
+            values = (val["eq"],)
+        elif set(val) == {"in"}:
+            values = tuple(_as_members(val["in"]))
+        else:
+            continue
+
+        positions = resources.positions(attr, values)
+        if positions is not None and (best is None or
+                                      len(positions) < len(best)):
+            best = positions
+
+    if best is None:
+        return None
+    return [resources[position] for position in best]
+
+
+def _count_key(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _top_level_attributes(filters: Filters) -> FrozenSet[str]:
+    if not filters:
+        return frozenset()
+    clauses = [filters] if isinstance(filters, Mapping) else filters
+    return frozenset(attr.partition('.')[0]
+                     for clause in clauses for attr in clause)
+
+
+def _validate(resource: Any, attributes: FrozenSet[str]):
+    """
+    Partial filtering may return resources we do not want, so filtering on
+    an attribute the resource's model does not define is refused.
+    """
+    if not attributes:
+        return
+
+    cls = type(resource)
+    with _known_attributes_lock:
+        if cls in _known_attributes:
+            known = _known_attributes[cls]
+        else:
+            attribute_map = getattr(resource, 'attribute_map', None)
+            known = frozenset(attribute_map) \
+                if isinstance(attribute_map, Mapping) else None
+            _known_attributes[cls] = known
+
+    if known is not None and not attributes.issubset(known):
+        raise ActivityFailed(FILTER_ERR)
@@ -0,0 +1,84 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["Inventory"]
+
+import threading
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from chaosoci.util.filters import get_attribute
+
+
+class Inventory(Sequence):
+    """
+    An immutable listing of resources that builds a hash index on an
+    attribute the first time it is filtered on, so that later equality
+    filters on that attribute only visit the matching resources.
+
+    Inventories can be passed wherever a list of resources is expected,
+    including to every `filter_*` function.
+    """
+
+    def __init__(self, resources: Iterable[Any] = ()):
+        self._resources = list(resources)
+        self._indexes = {}  # type: Dict[str, Optional[Dict[Any, List[int]]]]
+        self._lock = threading.Lock()
+
+    def __getitem__(self, position):
+        return self._resources[position]
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._resources)
+
+    def __repr__(self) -> str:
+        return 'Inventory({} resources, indexed on {})'.format(
+            len(self._resources), sorted(self._indexes))
+
+    def positions(self, path: str, values: Iterable[Any]) -> Optional[
+            List[int]]:
+        """
+        Return the sorted positions of the resources whose attribute at
+        `path` equals one of `values`, or `None` when the attribute cannot
+        be indexed because its values are not hashable.
+        """
+        index = self._index(path)
+        if index is None:
+            return None
+
+        positions = []
+        for value in values:
+            try:
+                positions.extend(index.get(value, ()))
+            except TypeError:
+                return None
+        positions.sort()
+        return positions
+
+    def lookup(self, path: str, value: Any) -> List[Any]:
+        """
+        Return the resources whose attribute at `path` equals `value`.
+        """
+        positions = self.positions(path, (value,))
+        if positions is None:
+            return [r for r in self._resources
+                    if get_attribute(r, path) == value]
+        return [self._resources[position] for position in positions]
+
+    def _index(self, path: str) -> Optional[Dict[Any, List[int]]]:
+        with self._lock:
+            if path in self._indexes:
+                return self._indexes[path]
+
+            index = {}  # type: Optional[Dict[Any, List[int]]]
+            try:
+                for position, resource in enumerate(self._resources):
+                    value = get_attribute(resource, path)
+                    index.setdefault(value, []).append(position)
+            except TypeError:
+                index = None
+            self._indexes[path] = index
+            return index
@@ -0,0 +1,106 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["iter_pages", "paginate", "prefetch_pages"]
+
+import queue
+import threading
+from typing import Any, Callable, Iterator
+
+from chaoslib.types import Configuration
+from oci.response import Response
+
+from chaosoci.util.constants import PREFETCH_PAGES
+
+# How long the prefetching thread waits on a full queue before checking
+# whether the consumer went away.
+PREFETCH_POLL_INTERVAL = 0.1
+
+_END = object()
+
+
+def iter_pages(list_func: Callable[..., Response], *args, prefetch: int = 0,
+               **kwargs) -> Iterator[Response]:
+    """
+    Call the OCI `list_func` with the given arguments and yield each page of
+    results in turn.
+
+    By default the next page is only requested once the consumer asks for
+    it, so stopping the iteration stops the fetching. With `prefetch` set to
+    a positive number, pages are fetched on a background thread while the
+    current one is being consumed, staying at most `prefetch` pages ahead.
+    """
+    if prefetch and prefetch > 0:
+        return _prefetched_pages(list_func, args, kwargs, prefetch)
+    return _pages(list_func, args, kwargs)
+
+
+def paginate(list_func: Callable[..., Response], *args, prefetch: int = 0,
+             **kwargs) -> Iterator[Any]:
+    """
+    Yield every item returned by the OCI `list_func`, one page at a time.
+    See `iter_pages` for the meaning of `prefetch`.
+    """
+    for response in iter_pages(list_func, *args, prefetch=prefetch,
+                               **kwargs):
+        for item in response.data:
+            yield item
+
+
+def prefetch_pages(configuration: Configuration = None) -> int:
+    """
+    Return how many pages the listings of an activity may fetch ahead, as
+    set by the `oci_prefetch_pages` configuration key.
+    """
+    return int((configuration or {}).get(PREFETCH_PAGES) or 0)
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _pages(list_func: Callable[..., Response], args, kwargs
+           ) -> Iterator[Response]:
+    response = list_func(*args, **kwargs)
+    yield response
+    while response.has_next_page:
+        response = list_func(*args, page=response.next_page, **kwargs)
+        yield response
+
+
+def _prefetched_pages(list_func: Callable[..., Response], args, kwargs,
+                      depth: int) -> Iterator[Response]:
+    pages = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                pages.put(item, timeout=PREFETCH_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch():
+        try:
+            for response in _pages(list_func, args, kwargs):
+                if not put((response, None)):
+                    return
+            put((_END, None))
+        except Exception as x:
+            put((None, x))
+
+    fetcher = threading.Thread(target=fetch, name="chaosoci-prefetch",
+                               daemon=True)
+    fetcher.start()
+    try:
+        while True:
+            response, error = pages.get()
+            if error is not None:
+                raise error
+            if response is _END:
+                return
+            yield response
+    finally:
+        # Releases the fetcher if the consumer stopped early.
+        stopped.set()
@@ -0,0 +1,130 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["create_plan", "load_plan"]
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from chaoslib.exceptions import ActivityFailed
+from chaoslib.types import Configuration
+from dateutil.parser import isoparse
+from logzero import logger
+
+from chaosoci.util.cache import inventory_version
+from chaosoci.util.constants import PLAN_MAX_AGE, PLAN_STORE
+
+# Plans made by this process, by id.
+_plans = {}  # type: Dict[str, Dict[str, Any]]
+_plans_lock = threading.Lock()
+
+
+def create_plan(resource_type: str, targets: List[str],
+                scope: Dict[str, Any] = None,
+                configuration: Configuration = None) -> Dict[str, Any]:
+    """
+    Record the resources a compartment-wide action would act on, so that
+    the action can later be applied to exactly these resources, without
+    listing them again, by passing it the returned `plan_id`:
+
+        {"plan_id": "...", "resource_type": "instances",
+         "targets": ["ocid1..."], "scope": {"compartment_id": "..."},
+         "created_at": "2020-06-01T10:00:00+00:00", "inventory_version": 0}
+
+    `inventory_version` is the version of the listings the targets were
+    resolved from, see `chaosoci.util.cache.inventory_version`. Plans are
+    kept in memory, and saved as JSON in the `oci_plan_store` directory
+    when the configuration sets one.
+    """
+    plan = {
+        'plan_id': uuid.uuid4().hex,
+        'resource_type': resource_type,
+        'targets': list(targets),
+        'scope': scope or {},
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'inventory_version': inventory_version(resource_type),
+    }
+
+    with _plans_lock:
+        _plans[plan['plan_id']] = plan
+
+    directory = (configuration or {}).get(PLAN_STORE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        with open(_plan_path(directory, plan['plan_id']), 'w') as f:
+            json.dump(plan, f, indent=2)
+
+    logger.info("Planned %s on %d %s", plan['plan_id'], len(targets),
+                resource_type)
+    return plan
+
+
+def load_plan(plan_id: str, resource_type: str,
+              configuration: Configuration = None,
+              max_age: float = None) -> Dict[str, Any]:
+    """
+    Return the plan `plan_id`, made for `resource_type`, from memory or from
+    the `oci_plan_store` directory.
+
+    Fails when the plan is unknown, was made for other resources, or is
+    older than `max_age` seconds, which defaults to the `oci_plan_max_age`
+    configuration key. A plan made by this process while actions have
+    since modified its resources is applied all the same, as approved, but
+    a warning is logged. Whether the resources of a plan made by another
+    run changed cannot be told, so only its age guards against applying it
+    to stale targets.
+    """
+    with _plans_lock:
+        plan = _plans.get(plan_id)
+    local = plan is not None
+
+    directory = (configuration or {}).get(PLAN_STORE)
+    if plan is None and directory:
+        try:
+            with open(_plan_path(directory, plan_id)) as f:
+                plan = json.load(f)
+        except (OSError, ValueError):
+            plan = None
+
+    if plan is None:
+        raise ActivityFailed('No plan {} was found.'.format(plan_id))
+
+    if plan['resource_type'] != resource_type:
+        raise ActivityFailed('Plan {} was made for {}, not {}.'.format(
+            plan_id, plan['resource_type'], resource_type))
+
+    if max_age is None:
+        max_age = (configuration or {}).get(PLAN_MAX_AGE)
+    if max_age is not None:
+        max_age = float(max_age)
+        age = (datetime.now(timezone.utc) -
+               isoparse(plan['created_at'])).total_seconds()
+        if age > max_age:
+            raise ActivityFailed('Plan {} is {:.0f}s old, more than the '
+                                 '{}s allowed.'.format(plan_id, age, max_age))
+
+    if not local:
+        if max_age is None:
+            logger.warning("Plan %s was made by another run, its %s may "
+                           "have changed since; set oci_plan_max_age to "
+                           "refuse stale plans", plan_id, resource_type)
+    elif plan['inventory_version'] != inventory_version(resource_type):
+        logger.warning("The %s of plan %s were modified since it was made",
+                       resource_type, plan_id)
+
+    return plan
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _plan_path(directory: str, plan_id: str) -> str:
+    # plan ids are hex strings, anything else is refused rather than used
+    # as a path
+    if not plan_id or not all(c in '0123456789abcdef' for c in plan_id):
+        raise ActivityFailed('Invalid plan id: {}'.format(plan_id))
+    return os.path.join(directory, '{}.json'.format(plan_id))
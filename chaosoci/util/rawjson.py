@@ -0,0 +1,130 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["RawRecord", "loads", "paginate_raw", "raw_page",
+           "raw_record_type"]
+
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Type
+
+from dateutil.parser import isoparse
+from oci.response import Response
+
+from chaosoci.util.pagination import iter_pages
+from chaosoci.util.records import Record
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+_raw_types = {}  # type: Dict[type, Type[RawRecord]]
+_raw_types_lock = threading.Lock()
+
+
+class RawRecord(Record):
+    """
+    Stands in for an SDK model on top of the decoded JSON of a listing.
+    Attributes carry the model's snake_case names and are only converted
+    from the camelCase JSON field the first time they are read; datetimes
+    are parsed then, while nested models are left as plain mappings.
+    """
+
+    __slots__ = ('_data', '_values')
+    swagger_types = {}  # type: Dict[str, str]
+
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+        self._values = {}
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes not found on the class or in the slots
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        values = self._values
+        if name in values:
+            return values[name]
+
+        key = self.attribute_map.get(name)
+        if key is None:
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                type(self).__name__, name))
+
+        value = values[name] = _convert(self._data.get(key),
+                                        self.swagger_types.get(name))
+        return value
+
+    def __repr__(self) -> str:
+        return '{}({!r})'.format(type(self).__name__, self._data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return every field of the record, converted, as a dictionary."""
+        return {field: getattr(self, field) for field in self.attribute_map}
+
+
+def raw_record_type(model: type) -> Type[RawRecord]:
+    """
+    Return the raw record class standing in for the SDK `model` class,
+    created once from the model's attribute and type maps.
+    """
+    with _raw_types_lock:
+        cls = _raw_types.get(model)
+        if cls is None:
+            sample = model()
+            cls = type('Raw' + model.__name__, (RawRecord,), {
+                '__slots__': (),
+                'attribute_map': dict(sample.attribute_map),
+                'swagger_types': dict(sample.swagger_types)})
+            _raw_types[model] = cls
+    return cls
+
+
+def raw_page(data: Any, model: type, key: str = None) -> List[Any]:
+    """
+    Return the resources of one page of a listing as raw records of the
+    `model` class.
+
+    `data` is the page as returned by a client built with
+    `skip_deserialization=True`: either the response body or, with recent
+    SDKs, the body already decoded. `key` names the field holding the
+    resources when the listing wraps them in an object, as `list_objects`
+    does. Resources that were already deserialized are returned unchanged.
+    """
+    if isinstance(data, (bytes, bytearray, str)):
+        data = loads(data)
+    if key is not None and isinstance(data, Mapping):
+        data = data.get(key) or []
+    if not data:
+        return []
+
+    cls = raw_record_type(model)
+    return [cls(item) if isinstance(item, Mapping) else item
+            for item in data]
+
+
+def paginate_raw(list_func: Callable[..., Response], model: type, *args,
+                 key: str = None, prefetch: int = 0,
+                 **kwargs) -> Iterator[Any]:
+    """
+    Like `paginate`, but yield raw records of the `model` class rather than
+    the SDK models. `list_func` must belong to a client built with
+    `skip_deserialization=True` to benefit from it.
+    """
+    for response in iter_pages(list_func, *args, prefetch=prefetch,
+                               **kwargs):
+        for item in raw_page(response.data, model, key):
+            yield item
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _convert(value: Any, swagger_type: str = None) -> Any:
+    if isinstance(value, str):
+        if swagger_type == 'datetime':
+            return isoparse(value)
+        if swagger_type == 'date':
+            return isoparse(value).date()
+    return value
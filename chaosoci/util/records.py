@@ -0,0 +1,114 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["Record", "record_type", "compact_records", "compact_listings",
+           "DEFAULT_FIELDS"]
+
+import threading
+from typing import (Any, Dict, Iterable, Iterator, Sequence, Tuple, Type,
+                    Union)
+
+from chaoslib.types import Configuration
+
+from chaosoci.util.constants import COMPACT_LISTINGS
+
+# The fields kept by default when compacting each kind of resource: what the
+# probes and actions of this extension read, plus the usual filters.
+_COMMON_FIELDS = ('id', 'display_name', 'lifecycle_state', 'compartment_id',
+                  'time_created', 'freeform_tags', 'defined_tags')
+DEFAULT_FIELDS = {
+    'instances': _COMMON_FIELDS + ('availability_domain', 'fault_domain',
+                                   'shape', 'region'),
+    'instance_pools': _COMMON_FIELDS + ('size',),
+    'route_tables': _COMMON_FIELDS + ('vcn_id', 'route_rules'),
+    'nat_gateways': _COMMON_FIELDS + ('vcn_id', 'block_traffic',
+                                      'route_table_id'),
+    'internet_gateways': _COMMON_FIELDS + ('vcn_id', 'is_enabled',
+                                           'route_table_id'),
+    'service_gateways': _COMMON_FIELDS + ('vcn_id', 'block_traffic',
+                                          'route_table_id'),
+    'subnets': _COMMON_FIELDS + ('vcn_id', 'cidr_block', 'route_table_id',
+                                 'security_list_ids', 'availability_domain'),
+    'security_lists': _COMMON_FIELDS + ('vcn_id', 'ingress_security_rules',
+                                        'egress_security_rules'),
+    'load_balancers': _COMMON_FIELDS + ('shape_name', 'is_private'),
+    'backend_sets': ('name', 'policy', 'backends'),
+    'buckets': ('name', 'namespace', 'compartment_id', 'time_created',
+                'etag', 'freeform_tags', 'defined_tags'),
+    'objects': ('name', 'size', 'time_created', 'md5', 'etag'),
+}  # type: Dict[str, Tuple[str, ...]]
+
+_record_types = {}  # type: Dict[Tuple[str, Tuple[str, ...]], Type[Record]]
+_record_types_lock = threading.Lock()
+
+
+class Record:
+    """
+    Base class of the compact records standing in for SDK models. Records
+    only carry a handful of fields, stored in slots, and advertise them
+    through `attribute_map` so they can be filtered like the models.
+    """
+
+    __slots__ = ()
+    attribute_map = {}  # type: Dict[str, str]
+
+    def __init__(self, **values):
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and \
+            self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(field, getattr(self, field))
+            for field in self.__slots__))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record's fields as a dictionary."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def record_type(name: str, fields: Iterable[str]) -> Type[Record]:
+    """
+    Return the record class named `name` holding exactly `fields`, created
+    once and reused for every later call with the same arguments.
+    """
+    fields = tuple(fields)
+    key = (name, fields)
+    with _record_types_lock:
+        cls = _record_types.get(key)
+        if cls is None:
+            cls = type(name, (Record,), {
+                '__slots__': fields,
+                'attribute_map': {field: field for field in fields}})
+            _record_types[key] = cls
+    return cls
+
+
+def compact_records(resources: Iterable[Any], resource_type: str,
+                    fields: Union[bool, Sequence[str]] = True
+                    ) -> Iterator[Record]:
+    """
+    Yield a compact record for each resource, keeping only `fields`, or the
+    default fields of `resource_type` when `fields` is `True`.
+    """
+    if fields is True:
+        fields = DEFAULT_FIELDS[resource_type]
+
+    cls = None
+    for resource in resources:
+        if cls is None:
+            name = type(resource).__name__ + 'Record'
+            cls = record_type(name, fields)
+        yield cls(**{field: getattr(resource, field, None)
+                     for field in fields})
+
+
+def compact_listings(configuration: Configuration = None) -> bool:
+    """
+    Return whether the probes should keep their listings as compact records,
+    as set by the `oci_compact_listings` configuration key.
+    """
+    return bool((configuration or {}).get(COMPACT_LISTINGS))
@@ -0,0 +1,71 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["reservoir_sample", "sample_percentage", "sample_stream"]
+
+import math
+import random
+from typing import Any, Callable, Iterable, List
+
+from chaoslib.exceptions import ActivityFailed
+
+
+def reservoir_sample(items: Iterable[Any], k: int,
+                     rng: random.Random = None) -> List[Any]:
+    """
+    Return `k` items picked uniformly at random from `items` in a single
+    pass, holding no more than `k` of them at any time, or all of them when
+    there are fewer. With a seeded `rng`, the same stream always yields the
+    same sample.
+    """
+    rng = rng or random.Random()
+    reservoir = []  # type: List[Any]
+    if k <= 0:
+        return reservoir
+
+    for seen, item in enumerate(items):
+        if seen < k:
+            reservoir.append(item)
+        else:
+            position = rng.randrange(seen + 1)
+            if position < k:
+                reservoir[position] = item
+    return reservoir
+
+
+def sample_percentage(items: Iterable[Any], percentage: float,
+                      rng: random.Random = None,
+                      key: Callable[[Any], Any] = None) -> List[Any]:
+    """
+    Return `percentage` percent of the items, rounded up, picked uniformly
+    at random. The size of the stream is only known once it is exhausted,
+    so `key(item)` (such as the item's OCID) rather than the item itself is
+    kept for every item until then.
+    """
+    rng = rng or random.Random()
+    keys = [key(item) for item in items] if key else list(items)
+    count = min(len(keys), math.ceil(len(keys) * percentage / 100.0))
+    return rng.sample(keys, count)
+
+
+def sample_stream(items: Iterable[Any], count: int = None,
+                  percentage: float = None, seed: Any = None,
+                  key: Callable[[Any], Any] = None) -> List[Any]:
+    """
+    Sample `count` items, or `percentage` percent of them, from the stream,
+    returning `key(item)` for each when `key` is given. `seed` makes the
+    sample reproducible for the same stream.
+    """
+    if (count is None) == (percentage is None):
+        raise ActivityFailed('Sample either a count or a percentage of the '
+                             'resources.')
+    if percentage is not None and not 0 < percentage <= 100:
+        raise ActivityFailed('A percentage must be in ]0, 100], got: '
+                             '{}'.format(percentage))
+
+    rng = random.Random(seed)
+    if percentage is not None:
+        return sample_percentage(items, percentage, rng, key)
+
+    sample = reservoir_sample(items, count, rng)
+    return [key(item) for item in sample] if key else sample
@@ -0,0 +1,281 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["SnapshotStore", "snapshot_loader", "snapshot_store",
+           "invalidate_snapshots"]
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import (Any, Callable, Dict, Hashable, Iterable, List, Optional,
+                    Tuple)
+
+from chaoslib.types import Configuration
+from dateutil.parser import isoparse
+from logzero import logger
+from oci.util import to_dict
+
+from chaosoci.util.constants import SNAPSHOT_MAX_AGE, SNAPSHOT_STORE
+from chaosoci.util.records import Record, record_type
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    resource_type TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    refreshed_at REAL NOT NULL,
+    PRIMARY KEY (resource_type, scope)
+);
+CREATE TABLE IF NOT EXISTS resources (
+    resource_type TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    id TEXT NOT NULL,
+    lifecycle_state TEXT,
+    time_created TEXT,
+    payload TEXT NOT NULL,
+    payload_hash TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (resource_type, scope, id)
+);
+"""
+
+_stores = {}  # type: Dict[str, SnapshotStore]
+_stores_lock = threading.Lock()
+
+# When, in seconds since the epoch, an action in this process last modified
+# resources of each type.
+_invalidated = {}  # type: Dict[str, float]
+
+
+class SnapshotStore:
+    """
+    Persists compartment listings in a SQLite database so that scheduled
+    runs of the same experiment can answer probes from recent listings
+    rather than listing every compartment again.
+
+    A refresh only rewrites the resources that appeared, disappeared or
+    changed in any of their fields since the last one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def age(self, resource_type: str,
+            scope: Tuple[Hashable, ...]) -> Optional[float]:
+        """
+        Return how many seconds ago the listing was last refreshed, or
+        `None` when it was never stored.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT refreshed_at FROM listings "
+                "WHERE resource_type = ? AND scope = ?",
+                (resource_type, _scope_key(scope))).fetchone()
+        return None if row is None else max(0.0, time.time() - row[0])
+
+    def load(self, resource_type: str, scope: Tuple[Hashable, ...],
+             max_age: float = None,
+             since: float = None) -> Optional[List[Record]]:
+        """
+        Return the stored listing, or `None` when there is none, it was
+        refreshed more than `max_age` seconds ago or before `since`, in
+        seconds since the epoch. Resources come back as records carrying
+        the attributes of the SDK models they were saved from, so they can
+        be filtered like them.
+        """
+        age = self.age(resource_type, scope)
+        if age is None or (max_age is not None and age > max_age):
+            return None
+        if since is not None and time.time() - age < since:
+            return None
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM resources "
+                "WHERE resource_type = ? AND scope = ? ORDER BY rowid",
+                (resource_type, _scope_key(scope))).fetchall()
+        return [_record(json.loads(payload)) for (payload,) in rows]
+
+    def refresh(self, resource_type: str, scope: Tuple[Hashable, ...],
+                resources: Iterable[Any]) -> Dict[str, int]:
+        """
+        Store a fresh listing and return how many resources were added,
+        changed, removed and left unchanged.
+        """
+        key = _scope_key(scope)
+        now = time.time()
+        stats = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+
+        with self._connect() as conn:
+            known = {
+                row[0]: row[1] for row in conn.execute(
+                    "SELECT id, payload_hash FROM resources "
+                    "WHERE resource_type = ? AND scope = ?",
+                    (resource_type, key))}
+
+            seen = set()
+            for resource in resources:
+                payload = _payload(resource)
+                resource_id = str(payload.get('id') or payload.get('name'))
+                serialized = json.dumps(payload, default=str,
+                                        sort_keys=True)
+                digest = hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+                seen.add(resource_id)
+
+                if known.get(resource_id) == digest:
+                    stats['unchanged'] += 1
+                    continue
+
+                stats['changed' if resource_id in known else 'added'] += 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO resources VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?)",
+                    (resource_type, key, resource_id,
+                     _text(payload.get('lifecycle_state')),
+                     _text(payload.get('time_created')), serialized, digest,
+                     now))
+
+            removed = [(resource_type, key, resource_id)
+                       for resource_id in known if resource_id not in seen]
+            conn.executemany(
+                "DELETE FROM resources "
+                "WHERE resource_type = ? AND scope = ? AND id = ?", removed)
+            stats['removed'] = len(removed)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?)",
+                (resource_type, key, now))
+
+        logger.debug("Refreshed %s snapshot: %s", resource_type, stats)
+        return stats
+
+    def invalidate(self, *resource_types: str):
+        """
+        Mark every stored listing of the given resource types as stale, so
+        the next load lists the resources again.
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE listings SET refreshed_at = 0 "
+                "WHERE resource_type = ?",
+                [(resource_type,) for resource_type in resource_types])
+
+    def _connect(self) -> '_Transaction':
+        return _Transaction(sqlite3.connect(self.path))
+
+
+def snapshot_store(configuration: Configuration = None
+                   ) -> Optional[SnapshotStore]:
+    """
+    Return the snapshot store set by the `oci_snapshot_store` configuration
+    key, or `None` when snapshots are not enabled.
+    """
+    path = (configuration or {}).get(SNAPSHOT_STORE)
+    if not path:
+        return None
+
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SnapshotStore(path)
+    return store
+
+
+def snapshot_loader(resource_type: str, scope: Tuple[Hashable, ...],
+                    loader: Callable[[], Iterable[Any]],
+                    configuration: Configuration = None
+                    ) -> Callable[[], Iterable[Any]]:
+    """
+    Wrap a listing loader so that it answers from the snapshot store while
+    the stored listing is younger than `oci_snapshot_max_age` seconds, and
+    otherwise lists the resources and refreshes the store.
+    """
+    store = snapshot_store(configuration)
+    if store is None:
+        return loader
+
+    max_age = float((configuration or {}).get(SNAPSHOT_MAX_AGE) or 0)
+
+    def load() -> Iterable[Any]:
+        stored = store.load(resource_type, scope, max_age,
+                            since=_invalidated.get(resource_type))
+        if stored is not None:
+            logger.debug("Serving %s from the snapshot store", resource_type)
+            return stored
+
+        resources = list(loader())
+        store.refresh(resource_type, scope, resources)
+        return resources
+
+    return load
+
+
+def invalidate_snapshots(*resource_types: str):
+    """
+    Forget the stored listings of resource types an action modified: those
+    stored before now are no longer served in this process, and those of
+    the stores opened so far are marked stale for the other processes too.
+    """
+    now = time.time()
+    with _stores_lock:
+        for resource_type in resource_types:
+            _invalidated[resource_type] = now
+        stores = list(_stores.values())
+
+    for store in stores:
+        store.invalidate(*resource_types)
+
+
+###############################################################################
+# Private functions
+###############################################################################
+class _Transaction:
+    """Commits on success, rolls back on error, and always closes."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.conn
+
+    def __exit__(self, *exc_info):
+        with closing(self.conn):
+            if exc_info[0] is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+
+
+def _scope_key(scope: Tuple[Hashable, ...]) -> str:
+    return json.dumps([_jsonable(part) for part in scope], default=str)
+
+
+def _jsonable(part: Any) -> Any:
+    if isinstance(part, dict):
+        return sorted(part.items())
+    return part
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _payload(resource: Any) -> Dict[str, Any]:
+    if isinstance(resource, Record):
+        return resource.to_dict()
+    return to_dict(resource)
+
+
+def _record(payload: Dict[str, Any]) -> Record:
+    for attr, value in payload.items():
+        if attr.startswith('time_') and isinstance(value, str):
+            try:
+                payload[attr] = isoparse(value)
+            except ValueError:
+                pass
+
+    return record_type('SnapshotRecord', sorted(payload))(**payload)
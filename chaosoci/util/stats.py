@@ -0,0 +1,75 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["percentile", "histogram", "describe_durations",
+           "DEFAULT_BUCKETS", "DEFAULT_PERCENTILES"]
+
+import math
+from typing import Any, Dict, List, Sequence
+
+# Upper bounds, in seconds, of the recovery-time histogram buckets: from a
+# quick restart to a slow reprovisioning.
+DEFAULT_BUCKETS = (5, 10, 30, 60, 120, 300, 600, 1800)
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Return the `pct` percentile of the values, interpolating linearly
+    between the closest ranks.
+    """
+    if not values:
+        raise ValueError('No values to take a percentile of.')
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def histogram(values: Sequence[float],
+              buckets: Sequence[float] = DEFAULT_BUCKETS
+              ) -> List[Dict[str, Any]]:
+    """
+    Count the values falling in each bucket. Buckets are given by their
+    inclusive upper bound, and a last bucket with a `None` bound takes the
+    values above the largest one:
+
+        [{"le": 5, "count": 3}, {"le": 10, "count": 1},
+         {"le": None, "count": 0}]
+    """
+    bounds = sorted(buckets)
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        position = len(bounds)
+        for i, bound in enumerate(bounds):
+            if value <= bound:
+                position = i
+                break
+        counts[position] += 1
+
+    return [{'le': bound, 'count': count}
+            for bound, count in zip(list(bounds) + [None], counts)]
+
+
+def describe_durations(values: Sequence[float],
+                       percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                       buckets: Sequence[float] = DEFAULT_BUCKETS
+                       ) -> Dict[str, Any]:
+    """
+    Summarise durations, in seconds, as their count, min, mean, max,
+    percentiles (keyed `p50`, `p90`...) and histogram, ready to be stored in
+    the experiment's journal.
+    """
+    summary = {'count': len(values),
+               'histogram': histogram(values, buckets)}  # type: Dict
+    if not values:
+        return summary
+
+    summary['min'] = min(values)
+    summary['mean'] = sum(values) / len(values)
+    summary['max'] = max(values)
+    for pct in percentiles:
+        summary['p{:g}'.format(pct)] = percentile(values, pct)
+    return summary
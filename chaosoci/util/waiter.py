@@ -0,0 +1,164 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["wait_for_states", "measure_recovery"]
+
+import time
+from typing import (Any, Callable, Dict, Iterable, Mapping, Optional,
+                    Sequence, Set, Union)
+
+from chaoslib.exceptions import ActivityFailed
+from dateutil.parser import isoparse
+from logzero import logger
+
+from chaosoci.util.stats import DEFAULT_BUCKETS, describe_durations
+
+
+def wait_for_states(poll: Callable[[], Mapping[str, str]],
+                    resource_ids: Iterable[str],
+                    states: Union[str, Iterable[str]],
+                    timeout: float = 600, interval: float = 2,
+                    max_interval: float = 30, backoff: float = 2,
+                    sleep: Callable[[float], Any] = time.sleep,
+                    clock: Callable[[], float] = time.monotonic,
+                    disrupted_first: bool = False) -> Dict[str, Any]:
+    """
+    Wait until every resource in `resource_ids` reaches one of the lifecycle
+    `states`, or until `timeout` seconds have elapsed.
+
+    Each round calls `poll` once, which lists the resources and returns
+    their lifecycle state by OCID, so tracking many resources costs a
+    single listing per round rather than a `get_*` call per resource.
+    Rounds are `interval` seconds apart at first, the delay growing by
+    `backoff` after every round up to `max_interval` seconds.
+
+    Returns when each resource converged, in seconds since the wait began,
+    and the last state seen of those that did not:
+
+        {"states": ["STOPPED"], "success": false, "elapsed": 600.2,
+         "rounds": 24, "converged": {"ocid1...": 48.1},
+         "pending": {"ocid1...": "STOPPING"}}
+
+    A resource missing from the listing is reported as pending with a
+    `None` state.
+
+    With `disrupted_first`, a resource only converges once it has been
+    seen out of the `states`, so that one still in them because the
+    disruption has not shown yet does not count as back right away. Those
+    never seen out of them are reported apart, as `undisrupted`, with
+    their last state.
+    """
+    states = (states,) if isinstance(states, str) else tuple(states)
+    pending = dict.fromkeys(resource_ids)  # type: Dict[str, Optional[str]]
+    if not pending:
+        raise ActivityFailed('No resources were given to wait for.')
+    if not states:
+        raise ActivityFailed('No lifecycle states were given to wait for.')
+
+    converged = {}  # type: Dict[str, float]
+    disrupted = set()  # type: Set[str]
+    start = clock()
+    deadline = start + timeout
+    delay = interval
+    rounds = 0
+
+    while True:
+        rounds += 1
+        current = poll()
+        now = clock()
+        for resource_id in list(pending):
+            state = current.get(resource_id)
+            if state not in states:
+                disrupted.add(resource_id)
+            if state in states and (not disrupted_first or
+                                    resource_id in disrupted):
+                converged[resource_id] = now - start
+                del pending[resource_id]
+            else:
+                pending[resource_id] = state
+
+        logger.debug("Round %d: %d resources in %s, %d pending", rounds,
+                     len(converged), '/'.join(states), len(pending))
+        if not pending or now >= deadline:
+            break
+
+        sleep(max(0.0, min(delay, deadline - now)))
+        delay = min(delay * backoff, max_interval)
+
+    undisrupted = {}  # type: Dict[str, Optional[str]]
+    if disrupted_first:
+        undisrupted = {resource_id: state
+                       for resource_id, state in pending.items()
+                       if resource_id not in disrupted}
+        for resource_id in undisrupted:
+            del pending[resource_id]
+
+    return {
+        'states': list(states),
+        'success': not pending and not undisrupted,
+        'elapsed': clock() - start,
+        'rounds': rounds,
+        'converged': converged,
+        'pending': pending,
+        'undisrupted': undisrupted,
+    }
+
+
+def measure_recovery(poll: Callable[[], Mapping[str, str]],
+                     resource_ids: Iterable[str],
+                     states: Union[str, Iterable[str]],
+                     started_at: Union[str, float] = None,
+                     buckets: Sequence[float] = DEFAULT_BUCKETS,
+                     disrupted_first: bool = True,
+                     **kwargs) -> Dict[str, Any]:
+    """
+    Wait for the resources to recover, see `wait_for_states`, and return
+    each one's recovery time along with their percentiles and histogram:
+
+        {"states": ["RUNNING"], "success": true, "elapsed": 75.2,
+         "recovered": {"ocid1...": 75.1}, "unrecovered": {},
+         "undisrupted": {},
+         "stats": {"count": 1, "p50": 75.1, ..., "histogram": [...]}}
+
+    Recovery times are counted from `started_at`, the time the disrupting
+    action ran, given in seconds since the epoch or as an ISO 8601
+    timestamp. Without it they are counted from when the measure began.
+
+    A resource only recovers once it has been seen disrupted, out of the
+    `states`, unless `disrupted_first` is unset: otherwise, one polled
+    before the disruption shows, such as an instance still `RUNNING` while
+    it is being stopped, would be timed as recovering at once. Resources
+    never seen disrupted are reported as `undisrupted` and left out of the
+    stats.
+    """
+    offset = _seconds_since(started_at) if started_at is not None else 0.0
+    report = wait_for_states(poll, resource_ids, states,
+                             disrupted_first=disrupted_first, **kwargs)
+
+    recovered = {resource_id: offset + seconds
+                 for resource_id, seconds in report['converged'].items()}
+    return {
+        'states': report['states'],
+        'success': report['success'],
+        'elapsed': offset + report['elapsed'],
+        'recovered': recovered,
+        'unrecovered': report['pending'],
+        'undisrupted': report['undisrupted'],
+        'stats': describe_durations(list(recovered.values()),
+                                    buckets=buckets),
+    }
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _seconds_since(timestamp: Union[str, float]) -> float:
+    if isinstance(timestamp, str):
+        try:
+            timestamp = float(timestamp)
+        except ValueError:
+            moment = isoparse(timestamp)
+            if moment.tzinfo is None:
+                moment = moment.astimezone()
+            timestamp = moment.timestamp()
+    return max(0.0, time.time() - timestamp)
@@ -0,0 +1,123 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+__all__ = ["TERMINAL_STATUSES", "work_request_id", "find_work_request",
+           "wait_for_work_requests"]
+
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from logzero import logger
+
+from chaosoci.util.executor import DEFAULT_MAX_WORKERS, run_concurrently
+from chaosoci.util.waiter import wait_for_states
+
+# Statuses a work request does not move on from.
+TERMINAL_STATUSES = ("SUCCEEDED", "FAILED", "CANCELED")
+
+
+def work_request_id(response: Any) -> Optional[str]:
+    """
+    Return the id of the work request an asynchronous operation started,
+    from the `opc-work-request-id` header of its response, if any.
+    """
+    return (getattr(response, 'headers', None) or {}).get(
+        'opc-work-request-id')
+
+
+def find_work_request(client: Any, compartment_id: str, resource_id: str,
+                      since: datetime = None) -> Optional[str]:
+    """
+    Return the id of the latest work request of the resource accepted at or
+    after `since`, for operations whose response does not name the work
+    request they started. `client` is a deserializing `WorkRequestClient`.
+    """
+    summaries = client.list_work_requests(compartment_id,
+                                          resource_id=resource_id).data
+    candidates = [summary for summary in summaries
+                  if since is None or summary.time_accepted >= since]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda summary: summary.time_accepted).id
+
+
+def wait_for_work_requests(client: Any, work_request_ids: Iterable[str],
+                           timeout: float = 1800, interval: float = 5,
+                           max_interval: float = 60, backoff: float = 2,
+                           max_workers: int = DEFAULT_MAX_WORKERS,
+                           sleep: Callable[[float], Any] = time.sleep,
+                           clock: Callable[[], float] = time.monotonic
+                           ) -> Dict[str, Any]:
+    """
+    Poll the work requests until they all finished, or until `timeout`
+    seconds have elapsed, and report how each one ended:
+
+        {"success": false, "elapsed": 312.4, "rounds": 7,
+         "work_requests": {
+            "ocid1.workrequest...": {"status": "SUCCEEDED",
+                                     "operation_type": "StopInstancePool",
+                                     "percent_complete": 100.0,
+                                     "duration": 95.0},
+            "ocid1.workrequest...": {"status": "IN_PROGRESS", ...}}}
+
+    Every round fetches the unfinished work requests only, concurrently by
+    up to `max_workers` workers, and rounds back off as with
+    `chaosoci.util.waiter.wait_for_states`. `duration` is the time, in
+    seconds, the service took to carry the work request out. `success` is
+    true when every work request succeeded.
+    """
+    work_request_ids = list(work_request_ids)
+    latest = {}  # type: Dict[str, Any]
+
+    def poll() -> Dict[str, str]:
+        pending = [request_id for request_id in work_request_ids
+                   if request_id not in latest or
+                   latest[request_id].status not in TERMINAL_STATUSES]
+        reports = run_concurrently(
+            lambda request_id: client.get_work_request(request_id).data,
+            pending, max_workers=max_workers)
+        for report in reports:
+            if report['success']:
+                latest[report['id']] = report['result']
+            else:
+                logger.debug("Could not fetch work request %s: %s",
+                             report['id'], report['error'])
+        return {request_id: work_request.status
+                for request_id, work_request in latest.items()}
+
+    report = wait_for_states(poll, work_request_ids, TERMINAL_STATUSES,
+                             timeout=timeout, interval=interval,
+                             max_interval=max_interval, backoff=backoff,
+                             sleep=sleep, clock=clock)
+
+    work_requests = {request_id: _describe(latest.get(request_id))
+                     for request_id in work_request_ids}
+    return {
+        'success': report['success'] and all(
+            work_request['status'] == 'SUCCEEDED'
+            for work_request in work_requests.values()),
+        'elapsed': report['elapsed'],
+        'rounds': report['rounds'],
+        'work_requests': work_requests,
+    }
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def _describe(work_request: Any) -> Dict[str, Any]:
+    if work_request is None:
+        return {'status': None}
+
+    started = work_request.time_started or work_request.time_accepted
+    duration = None
+    if started is not None and work_request.time_finished is not None:
+        duration = (work_request.time_finished - started).total_seconds()
+
+    return {
+        'status': work_request.status,
+        'operation_type': work_request.operation_type,
+        'percent_complete': work_request.percent_complete,
+        'duration': duration,
+    }
@@ -2,7 +2,8 @@
 from unittest import TestCase as T
 from unittest.mock import MagicMock, patch
 
-from chaosoci.core.loadBalancer.probes import count_load_bal, count_backend_sets
+from chaosoci.core.loadBalancer.probes import count_load_bal, count_backend_sets, \
+    measure_backends_recovery
 
 
 @patch('chaosoci.core.loadBalancer.probes.filter_load_balancers', autospec=True)
@@ -33,3 +34,30 @@ def test_count_count_backend_sets(oci_client, get_backend_sets, filter_load_bala
     count_backend_sets(filters=filters, loadbalancer_id=lb_id)
     filter_load_balancers.assert_called_with(get_backend_sets(oci_client, lb_id),
                                              filters)
+
+
+@patch('chaosoci.core.loadBalancer.probes.oci_client', autospec=True)
+def test_measure_backends_recovery(oci_client):
+    lb_client = MagicMock()
+    oci_client.return_value = lb_client
+    backends = [MagicMock(), MagicMock()]
+    backends[0].name = '10.0.0.1:80'
+    backends[1].name = '10.0.0.2:80'
+    lb_client.get_backend_set.return_value.data.backends = backends
+    lb_client.get_backend_set_health.side_effect = [
+        MagicMock(data=MagicMock(critical_state_backend_names=['10.0.0.2:80'],
+                                 warning_state_backend_names=['10.0.0.1:80'],
+                                 unknown_state_backend_names=None)),
+        MagicMock(data=MagicMock(critical_state_backend_names=[],
+                                 warning_state_backend_names=[],
+                                 unknown_state_backend_names=[])),
+    ]
+
+    lb_id = "ocid1.loadbalancer.oc1..aaaa"
+    report = measure_backends_recovery('web', lb_id, interval=0.01)
+
+    lb_client.get_backend_set.assert_called_with(lb_id, 'web')
+    assert report['success'] is True
+    assert set(report['recovered']) == {'10.0.0.1:80', '10.0.0.2:80'}
+    assert report['stats']['count'] == 2
+    assert lb_client.get_backend_set_health.call_count == 2
@@ -70,7 +70,26 @@ def test_delete_objects_in_compartment(oci_client, get_objects, filter_obstore_o
     delete_objects_in_compartment(filters=filters, namespace_name=namespace_name, bucket_name=bucket_name,
                                   object_names=[], compartment_id=c_id)
 
-    filter_obstore_objects.assert_called_with(objects=get_objects(oci_client,
-                                                                c_id),
-                                        filters=filters)
+    get_objects.assert_called_with(objectStore_client, namespace_name,
+                                   bucket_name, prefetch=0, raw=True)
+    filter_obstore_objects.assert_called_with(get_objects.return_value,
+                                              filters=filters)
+
+
 
+@patch('chaosoci.core.objectStorage.actions.oci_client', autospec=True)
+def test_delete_objects_in_compartment_lists_raw_pages(oci_client):
+    objectStore_client = MagicMock()
+    oci_client.return_value = objectStore_client
+    objectStore_client.list_objects.return_value = MagicMock(
+        data={'objects': [{'name': 'a', 'size': 1},
+                          {'name': 'b', 'size': 2}]},
+        has_next_page=False)
+
+    delete_objects_in_compartment(filters=None, namespace_name='ns',
+                                  bucket_name='bucket', object_names=[],
+                                  compartment_id='ocid1.compartment.oc1..a')
+
+    objectStore_client.list_objects.assert_called_once_with('ns', 'bucket')
+    assert [c[0] for c in objectStore_client.delete_object.call_args_list] \
+        == [('ns', 'bucket', 'a'), ('ns', 'bucket', 'b')]
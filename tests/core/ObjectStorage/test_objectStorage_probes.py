@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 from unittest import TestCase as T
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, create_autospec, patch
 
-from chaosoci.core.objectStorage.probes import count_buckets, count_objects
+from oci.object_storage import ObjectStorageClient
+from oci.object_storage.models import BucketSummary, ListObjects, \
+    ObjectSummary
+
+from chaosoci.core.objectStorage.probes import count_buckets, \
+    count_buckets_by, count_objects
+from chaosoci.util.cache import inventory_cache
 
 
 @patch('chaosoci.core.objectStorage.probes.filter_buckets', autospec=True)
@@ -30,6 +36,59 @@ def test_count_objects(oci_client, get_objects, filter_obstore_objects):
     c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
     filters = [{'display_name': 'random_name', 'region': 'uk-london-1'}]
 
-    count_objects(filters=filters, compartment_id=c_id)
-    filter_obstore_objects.assert_called_with(get_objects(oci_client, c_id),
-                                              filters)
+    count_objects(filters=filters, bucket_name='bucket',
+                  namespace_name='ns')
+    filter_obstore_objects.assert_called_with(
+        get_objects(oci_client, 'ns', 'bucket'), filters=filters)
+
+
+@patch('chaosoci.core.objectStorage.probes.oci_client', autospec=True)
+def test_count_buckets_by_lists_the_tenancy_namespace(oci_client):
+    inventory_cache.clear()
+    client = create_autospec(ObjectStorageClient, instance=True)
+    oci_client.return_value = client
+    client.get_namespace.return_value = MagicMock(data='tenancy-ns')
+    client.list_buckets.return_value = MagicMock(
+        data=[BucketSummary(name='a', freeform_tags={'team': 'web'}),
+              BucketSummary(name='b', freeform_tags={'team': 'db'}),
+              BucketSummary(name='c', freeform_tags={'team': 'web'})],
+        has_next_page=False)
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    counts = count_buckets_by('freeform_tags.team', compartment_id=c_id)
+
+    assert counts == {'web': 2, 'db': 1}
+    client.list_buckets.assert_called_once_with('tenancy-ns', c_id)
+
+
+@patch('chaosoci.core.objectStorage.probes.oci_client', autospec=True)
+def test_count_buckets_lists_with_an_object_storage_client(oci_client):
+    inventory_cache.clear()
+    client = create_autospec(ObjectStorageClient, instance=True)
+    oci_client.return_value = client
+    client.get_namespace.return_value = MagicMock(data='tenancy-ns')
+    client.list_buckets.return_value = MagicMock(
+        data=[BucketSummary(name='a'), BucketSummary(name='b')],
+        has_next_page=False)
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+
+    assert count_buckets(filters=None, compartment_id=c_id) == 2
+    assert oci_client.call_args[0][0] is ObjectStorageClient
+    client.list_buckets.assert_called_once_with('tenancy-ns', c_id)
+
+
+@patch('chaosoci.core.objectStorage.probes.oci_client', autospec=True)
+def test_count_objects_lists_the_bucket(oci_client):
+    inventory_cache.clear()
+    client = create_autospec(ObjectStorageClient, instance=True)
+    oci_client.return_value = client
+    client.get_namespace.return_value = MagicMock(data='tenancy-ns')
+    client.list_objects.return_value = MagicMock(
+        data=ListObjects(objects=[ObjectSummary(name='a'),
+                                  ObjectSummary(name='b')]),
+        has_next_page=False)
+
+    assert count_objects(filters=None, bucket_name='bucket') == 2
+    assert oci_client.call_args[0][0] is ObjectStorageClient
+    client.list_objects.assert_called_once_with('tenancy-ns', 'bucket')
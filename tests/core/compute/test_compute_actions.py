@@ -7,6 +7,7 @@ from chaosoci.core.compute.actions import stop_instance, stop_random_instance, s
     terminate_instance_pool, terminate_all_instance_pools_in_compartment, \
     reset_instance_pool, reset_all_instance_pools_in_compartment, \
     softreset_instance_pool, softreset_all_instance_pools_in_compartment
+from chaosoci.util.plans import create_plan
 
 
 @patch('chaosoci.core.compute.actions.oci_client', autospec=True)
@@ -259,3 +260,175 @@ def test_softreset_all_instance_pools_in_compartment(oci_client, get_instance_po
     filter_instance_pools.assert_called_with(get_instance_pools(oci_client,
                                                                           c_id),
                                              filters)
+
+
+@patch('chaosoci.core.compute.actions.get_instances', autospec=True)
+@patch('chaosoci.core.compute.actions.oci_client', autospec=True)
+def test_stop_instances_in_compartment_concurrently(oci_client,
+                                                    get_instances):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    compute_client.instance_action.side_effect = \
+        lambda instance_id, action: MagicMock(data=instance_id)
+    get_instances.return_value = [MagicMock(id='i-{}'.format(n))
+                                  for n in range(5)]
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    reports = stop_instances_in_compartment(filters=None, compartment_id=c_id,
+                                            max_workers=3)
+
+    assert [r['id'] for r in reports] == ['i-{}'.format(n) for n in range(5)]
+    assert [r['result'] for r in reports] == [r['id'] for r in reports]
+    assert compute_client.instance_action.call_count == 5
+
+
+@patch('chaosoci.core.compute.actions.oci_client', autospec=True)
+def test_reset_all_instance_pools_reports_every_pool(oci_client):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+
+    def reset(instance_pool_id):
+        if instance_pool_id == 'pool-1':
+            raise RuntimeError('conflict')
+        return MagicMock(data=instance_pool_id)
+
+    compute_client.reset_instance_pool.side_effect = reset
+
+    reports = reset_all_instance_pools_in_compartment(
+        instance_pool_ids=['pool-0', 'pool-1', 'pool-2'], filters=None,
+        max_workers=2)
+
+    assert [(r['id'], r['success']) for r in reports] == [
+        ('pool-0', True), ('pool-1', False), ('pool-2', True)]
+    assert reports[1]['error'] == 'conflict'
+    assert reports[2]['result'] == 'pool-2'
+
+
+@patch('chaosoci.core.compute.actions.oci_client', autospec=True)
+def test_stop_random_instance_samples_count_from_stream(oci_client):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    compute_client.list_instances.return_value = MagicMock(
+        has_next_page=False,
+        data=[{'id': 'i-{}'.format(n),
+               'lifecycleState': 'RUNNING' if n % 2 else 'STOPPED'}
+              for n in range(20)])
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    filters = {'lifecycle_state': 'RUNNING'}
+    reports = stop_random_instance(filters=filters, compartment_id=c_id,
+                                   count=3, seed=42)
+    again = stop_random_instance(filters=filters, compartment_id=c_id,
+                                 count=3, seed=42)
+
+    stopped = [r['id'] for r in reports]
+    assert len(stopped) == 3
+    assert all(int(i.split('-')[1]) % 2 for i in stopped)
+    assert stopped == [r['id'] for r in again]
+    compute_client.list_instances.assert_called_with(
+        compartment_id=c_id, lifecycle_state='RUNNING')
+    assert compute_client.instance_action.call_count == 6
+
+
+@patch('chaosoci.core.compute.actions.get_instances', autospec=True)
+@patch('chaosoci.core.compute.actions.oci_client', autospec=True)
+def test_stop_instances_in_compartment_applies_plan(oci_client,
+                                                    get_instances):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    plan = create_plan('instances', ['i-1', 'i-2'], {'compartment_id': c_id})
+
+    stop_instances_in_compartment(filters=None, plan_id=plan['plan_id'])
+
+    get_instances.assert_not_called()
+    assert [c[1]['instance_id'] for c in
+            compute_client.instance_action.call_args_list] == ['i-1', 'i-2']
+
+
+@patch('chaosoci.core.compute.actions.get_instance_pools', autospec=True)
+@patch('chaosoci.core.compute.actions.oci_client', autospec=True)
+def test_instance_pools_action_applies_plan(oci_client, get_instance_pools):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+
+    plan = create_plan('instance_pools', ['pool-1'])
+
+    reports = reset_all_instance_pools_in_compartment(
+        instance_pool_ids=None, filters=None, plan_id=plan['plan_id'])
+
+    get_instance_pools.assert_not_called()
+    compute_client.reset_instance_pool.assert_called_once_with('pool-1')
+    assert [r['id'] for r in reports] == ['pool-1']
+
+
+@patch('chaosoci.core.compute.actions.wait_for_work_requests', autospec=True)
+@patch('chaosoci.core.compute.actions.oci_client', autospec=True)
+def test_instance_pools_action_tracks_work_requests(oci_client,
+                                                    wait_for_work_requests):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    compute_client.stop_instance_pool.side_effect = \
+        lambda pool_id: MagicMock(
+            data=pool_id,
+            headers={'opc-work-request-id': 'wr-' + pool_id})
+    wait_for_work_requests.return_value = {
+        'success': True, 'elapsed': 60.0, 'rounds': 3,
+        'work_requests': {'wr-pool-1': {'status': 'SUCCEEDED',
+                                        'duration': 42.0},
+                          'wr-pool-2': {'status': 'SUCCEEDED',
+                                        'duration': 57.0}}}
+
+    reports = stop_all_instance_pools_in_compartment(
+        instance_pool_ids=['pool-1', 'pool-2'], filters=None,
+        track_work_requests=True)
+
+    assert [r['work_request_id'] for r in reports] == ['wr-pool-1',
+                                                        'wr-pool-2']
+    assert [r['work_request']['duration'] for r in reports] == [42.0, 57.0]
+    assert wait_for_work_requests.call_args[0][1] == ['wr-pool-1',
+                                                      'wr-pool-2']
+    compute_client.list_work_requests.assert_not_called()
+
+
+@patch('chaosoci.core.compute.actions.oci_client', autospec=True)
+def test_stop_instances_in_compartment_lists_raw_pages(oci_client):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    # a client built with skip_deserialization=True returns plain dicts
+    compute_client.list_instances.return_value = MagicMock(
+        data=[{'id': 'i-0', 'displayName': 'web-0',
+               'lifecycleState': 'RUNNING'},
+              {'id': 'i-1', 'displayName': 'db-0',
+               'lifecycleState': 'RUNNING'}],
+        has_next_page=False)
+    compute_client.instance_action.side_effect = \
+        lambda instance_id, action: MagicMock(data=instance_id)
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    assert stop_instances_in_compartment(
+        filters=None, compartment_id=c_id) == ['i-0', 'i-1']
+    assert stop_instances_in_compartment(
+        filters={'display_name': 'web-0'}, compartment_id=c_id) == ['i-0']
+
+
+@patch('chaosoci.core.compute.actions.oci_client', autospec=True)
+def test_instance_pools_actions_list_raw_pages(oci_client):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    compute_client.list_instance_pools.return_value = MagicMock(
+        data=[{'id': 'pool-0', 'displayName': 'web', 'size': 2},
+              {'id': 'pool-1', 'displayName': 'db', 'size': 1}],
+        has_next_page=False)
+    compute_client.stop_instance_pool.side_effect = \
+        lambda instance_pool_id: MagicMock(data=instance_pool_id, headers={})
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    reports = stop_all_instance_pools_in_compartment(
+        instance_pool_ids=None, filters={'display_name': 'web'},
+        compartment_id=c_id)
+
+    assert [report['id'] for report in reports] == ['pool-0']
+    assert reports[0]['success'] is True
+    compute_client.stop_instance_pool.assert_called_once_with('pool-0')
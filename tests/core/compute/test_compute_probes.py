@@ -2,7 +2,15 @@
 from unittest import TestCase as T
 from unittest.mock import MagicMock, patch
 
-from chaosoci.core.compute.probes import count_instances, count_instance_pools
+from oci.core.models import Instance
+
+from chaosoci.core.compute.probes import count_instances, count_instance_pools, \
+    wait_for_instances_state, count_instances_by, \
+    plan_stop_instances_in_compartment
+from chaosoci.util.cache import inventory_cache
+from chaosoci.util.filters import count_by
+from chaosoci.util.plans import load_plan
+from chaosoci.util.records import Record
 
 
 @patch('chaosoci.core.compute.probes.filter_instances', autospec=True)
@@ -65,3 +73,159 @@ def test_count_instances_ret_int(oci_client, get_instance_pools, filter_instance
 
     n = count_instance_pools(filters=filters, compartment_id=c_id)
     T().assertEqual(n, 3)
+
+
+@patch('chaosoci.core.compute.probes.filter_instances', autospec=True)
+@patch('chaosoci.core.compute.probes.get_instances', autospec=True)
+@patch('chaosoci.core.compute.probes.oci_client', autospec=True)
+def test_count_instances_pushes_down_filters(oci_client, get_instances,
+                                            filter_instances):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    filters = {'lifecycle_state': 'RUNNING', 'shape': 'VM.Standard2.1'}
+
+    count_instances(filters=filters, compartment_id=c_id)
+    get_instances.assert_called_with(compute_client, c_id, prefetch=0,
+                                     compact=False,
+                                     lifecycle_state='RUNNING')
+    filter_instances.assert_called_with(get_instances.return_value,
+                                        filters=filters)
+
+
+@patch('chaosoci.core.compute.probes.get_instances', autospec=True)
+@patch('chaosoci.core.compute.probes.oci_client', autospec=True)
+def test_count_instances_served_from_inventory_cache(oci_client,
+                                                    get_instances):
+    inventory_cache.clear()
+    oci_client.return_value = MagicMock()
+    get_instances.return_value = [MagicMock(), MagicMock()]
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    configuration = {'oci_inventory_ttl': 60}
+
+    assert count_instances(None, c_id, configuration) == 2
+    assert count_instances(None, c_id, configuration) == 2
+    assert get_instances.call_count == 1
+
+
+@patch('chaosoci.core.compute.probes.oci_client', autospec=True)
+def test_wait_for_instances_state_lists_once_per_round(oci_client):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    compute_client.list_instances.side_effect = [
+        MagicMock(data=[{'id': 'i-1', 'lifecycleState': 'STOPPING'},
+                        {'id': 'i-2', 'lifecycleState': 'STOPPED'}],
+                  has_next_page=False),
+        MagicMock(data=[{'id': 'i-1', 'lifecycleState': 'STOPPED'},
+                        {'id': 'i-2', 'lifecycleState': 'STOPPED'}],
+                  has_next_page=False),
+    ]
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    report = wait_for_instances_state(['i-1', 'i-2'], 'STOPPED',
+                                      compartment_id=c_id, interval=0.01)
+
+    assert report['success'] is True
+    assert report['rounds'] == 2
+    assert set(report['converged']) == {'i-1', 'i-2'}
+    assert compute_client.list_instances.call_count == 2
+
+
+@patch('chaosoci.core.compute.probes.get_instances', autospec=True)
+@patch('chaosoci.core.compute.probes.oci_client', autospec=True)
+def test_count_instances_by_lists_once(oci_client, get_instances):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    get_instances.return_value = [
+        MagicMock(lifecycle_state='RUNNING', fault_domain='FAULT-DOMAIN-1'),
+        MagicMock(lifecycle_state='RUNNING', fault_domain='FAULT-DOMAIN-2'),
+        MagicMock(lifecycle_state='STOPPED', fault_domain='FAULT-DOMAIN-1')]
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    counts = count_instances_by(['fault_domain', 'lifecycle_state'],
+                                compartment_id=c_id)
+
+    assert counts == {'FAULT-DOMAIN-1': {'RUNNING': 1, 'STOPPED': 1},
+                      'FAULT-DOMAIN-2': {'RUNNING': 1}}
+    get_instances.assert_called_once_with(compute_client, c_id, prefetch=0,
+                                          compact=False)
+
+
+@patch('chaosoci.core.compute.probes.oci_client', autospec=True)
+def test_count_instances_prefetches_pages(oci_client):
+    inventory_cache.clear()
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    compute_client.list_instances.side_effect = [
+        MagicMock(data=[MagicMock(), MagicMock()], has_next_page=True,
+                  next_page='page-2'),
+        MagicMock(data=[MagicMock()], has_next_page=False)]
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    count = count_instances(filters=None, compartment_id=c_id,
+                            configuration={'oci_prefetch_pages': 2})
+
+    assert count == 3
+    assert compute_client.list_instances.call_args_list[1][1]['page'] == \
+        'page-2'
+
+
+@patch('chaosoci.core.compute.probes.count_by', wraps=count_by)
+@patch('chaosoci.core.compute.probes.oci_client', autospec=True)
+def test_count_instances_by_compacts_listings(oci_client, counter):
+    inventory_cache.clear()
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    compute_client.list_instances.return_value = MagicMock(
+        data=[Instance(id='i-1', fault_domain='FAULT-DOMAIN-1',
+                       lifecycle_state='RUNNING', metadata={'a': 'b'}),
+              Instance(id='i-2', fault_domain='FAULT-DOMAIN-2',
+                       lifecycle_state='RUNNING')],
+        has_next_page=False)
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    counts = count_instances_by('fault_domain', compartment_id=c_id,
+                                configuration={'oci_compact_listings': True})
+
+    assert counts == {'FAULT-DOMAIN-1': 1, 'FAULT-DOMAIN-2': 1}
+    instances = counter.call_args[0][0]
+    assert all(isinstance(instance, Record) for instance in instances)
+    assert not hasattr(instances[0], 'metadata')
+
+
+@patch('chaosoci.core.compute.probes.filter_instances', autospec=True)
+@patch('chaosoci.core.compute.probes.get_instances', autospec=True)
+@patch('chaosoci.core.compute.probes.oci_client', autospec=True)
+def test_plan_stop_instances_in_compartment(oci_client, get_instances,
+                                            filter_instances):
+    instance = MagicMock()
+    instance.id = "i-1234567890abcdef0"
+    filter_instances.return_value = [instance]
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    filters = [{'display_name': 'random_name'}]
+    plan = plan_stop_instances_in_compartment(filters=filters,
+                                              compartment_id=c_id)
+
+    assert plan['targets'] == [instance.id]
+    assert plan['scope'] == {'compartment_id': c_id, 'filters': filters}
+    assert load_plan(plan['plan_id'], 'instances') == plan
+
+
+@patch('chaosoci.core.compute.probes.get_instances', autospec=True)
+@patch('chaosoci.core.compute.probes.oci_client', autospec=True)
+def test_plan_lists_the_compartment_afresh(oci_client, get_instances):
+    inventory_cache.clear()
+    oci_client.return_value = MagicMock()
+    get_instances.return_value = []
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    configuration = {'oci_inventory_ttl': 60}
+    count_instances(filters=None, compartment_id=c_id,
+                    configuration=configuration)
+    plan_stop_instances_in_compartment(compartment_id=c_id,
+                                       configuration=configuration)
+
+    assert get_instances.call_count == 2
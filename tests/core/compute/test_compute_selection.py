@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from chaoslib.exceptions import ActivityFailed
+
+from chaosoci.core.compute.actions import stop_instances_by_domain
+from chaosoci.core.compute.selection import group_by_domain, select_targets
+
+
+def make_instances():
+    instances = []
+    for ad, fd, size in (('AD-1', 'FAULT-DOMAIN-1', 6),
+                         ('AD-1', 'FAULT-DOMAIN-2', 3),
+                         ('AD-2', 'FAULT-DOMAIN-1', 1)):
+        for n in range(size):
+            instances.append(MagicMock(id='{}-{}-{}'.format(ad, fd, n),
+                                       availability_domain=ad,
+                                       fault_domain=fd))
+    return instances
+
+
+def domains(targets):
+    return Counter((t.availability_domain, t.fault_domain) for t in targets)
+
+
+def test_group_by_domain_in_one_pass():
+    groups = group_by_domain(iter(make_instances()))
+
+    assert [(domain, len(members)) for domain, members in groups.items()] == [
+        (('AD-1', 'FAULT-DOMAIN-1'), 6), (('AD-1', 'FAULT-DOMAIN-2'), 3),
+        (('AD-2', 'FAULT-DOMAIN-1'), 1)]
+
+
+def test_one_per_fault_domain():
+    targets = select_targets(make_instances(), 'one_per_fault_domain')
+    assert set(domains(targets).values()) == {1}
+    assert len(targets) == 3
+
+    targets = select_targets(make_instances(), 'one_per_fault_domain',
+                             availability_domain='AD-1')
+    assert len(targets) == 2
+
+
+def test_whole_fault_domain():
+    targets = select_targets(make_instances(), 'whole_fault_domain',
+                             fault_domain='FAULT-DOMAIN-2')
+    assert domains(targets) == {('AD-1', 'FAULT-DOMAIN-2'): 3}
+
+    targets = select_targets(make_instances(), 'whole_fault_domain', seed=1)
+    assert len(domains(targets)) == 1
+
+    with pytest.raises(ActivityFailed):
+        select_targets(make_instances(), 'whole_fault_domain',
+                       fault_domain='FAULT-DOMAIN-3')
+
+
+def test_weighted_spread():
+    targets = select_targets(make_instances(), 'weighted_spread', count=5,
+                             seed=3)
+    assert domains(targets) == {('AD-1', 'FAULT-DOMAIN-1'): 3,
+                                ('AD-1', 'FAULT-DOMAIN-2'): 2}
+
+    targets = select_targets(make_instances(), 'weighted_spread', count=4,
+                             weights={'FAULT-DOMAIN-1': 1,
+                                      'AD-1/FAULT-DOMAIN-2': 1})
+    assert domains(targets) == {('AD-1', 'FAULT-DOMAIN-1'): 2,
+                                ('AD-1', 'FAULT-DOMAIN-2'): 1,
+                                ('AD-2', 'FAULT-DOMAIN-1'): 1}
+
+    assert len(select_targets(make_instances(), 'weighted_spread',
+                              count=50)) == 10
+    with pytest.raises(ActivityFailed):
+        select_targets(make_instances(), 'weighted_spread')
+    with pytest.raises(ActivityFailed):
+        select_targets(make_instances(), 'everywhere')
+
+
+@patch('chaosoci.core.compute.actions.oci_client', autospec=True)
+def test_stop_instances_by_domain(oci_client):
+    compute_client = MagicMock()
+    oci_client.return_value = compute_client
+    compute_client.list_instances.return_value = MagicMock(
+        has_next_page=False,
+        data=[{'id': 'i-{}'.format(n), 'lifecycleState': 'RUNNING',
+               'availabilityDomain': 'AD-1',
+               'faultDomain': 'FAULT-DOMAIN-{}'.format(n % 3 + 1)}
+              for n in range(9)])
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    result = stop_instances_by_domain('one_per_fault_domain',
+                                      filters={'lifecycle_state': 'RUNNING'},
+                                      compartment_id=c_id)
+
+    assert sorted(t['fault_domain'] for t in result['targets']) == [
+        'FAULT-DOMAIN-1', 'FAULT-DOMAIN-2', 'FAULT-DOMAIN-3']
+    assert all(r['success'] for r in result['reports'])
+    assert compute_client.instance_action.call_count == 3
@@ -10,8 +10,13 @@ from chaoslib.exceptions import ActivityFailed
 from chaosoci.core.networking.actions import (delete_route_table_by_id, delete_route_table_by_filters,
                                               delete_nat_gateway_by_id, delete_nat_gateway_by_filters,
                                               delete_internet_gateway_by_id, delete_internet_gateway_by_filters,
-                                              delete_service_gateway_by_id, delete_service_gateway_by_filters)
+                                              delete_service_gateway_by_id, delete_service_gateway_by_filters,
+                                              delete_nat_gateways_by_filters, delete_vcn_resources_by_filters,
+                                              delete_route_tables_by_filters)
+from chaosoci.core.networking.actions import _DELETES
 from chaosoci.core.networking.common import get_nat_gateway
+from chaosoci.core.networking.rollbacks import restore_vcn_resources
+from chaosoci.util.backups import pending_backups
 from chaosoci.util.constants import FILTER_ERR
 # FILTER_ERR = 'Some of the chosen filters were not found, we cannot continue.'
 
@@ -210,3 +215,202 @@ def test_delete_service_gateway_by_filters(oci_client, get_service_gateway,
                         network_client.delete_service_gateway.assert_called_with(
                             filter_service_gateway(get_service_gateway(
                                 oci_client, c, v), filters=f)[0].id)
+
+
+def _vcn_client():
+    def resource(ocid, name, **fields):
+        resource = MagicMock(id=ocid, **fields)
+        resource.display_name = name
+        return resource
+
+    client = MagicMock()
+    listings = {
+        'list_route_tables': [
+            resource('rt-0', 'default', route_rules=[]),
+            resource('rt-1', 'egress', route_rules=[
+                MagicMock(network_entity_id='nat-1')]),
+            resource('rt-2', 'transit', route_rules=[])],
+        'list_nat_gateways': [resource('nat-1', 'nat-a'),
+                              resource('nat-2', 'nat-b'),
+                              resource('nat-3', 'transit-nat',
+                                       route_table_id='rt-2')],
+        'list_internet_gateways': [],
+        'list_service_gateways': [],
+        'list_subnets': [resource('subnet-1', 'app', route_table_id='rt-0',
+                                  security_list_ids=[])],
+        'list_security_lists': [],
+    }
+
+    def listing(resources):
+        def list_resources(*args, **kwargs):
+            # deleted resources drop out of the listing
+            deleted = {c[0][0] for operation in _DELETES.values()
+                       for c in getattr(client, operation).call_args_list}
+            return MagicMock(data=[resource for resource in resources
+                                   if resource.id not in deleted],
+                             has_next_page=False)
+        return list_resources
+
+    for operation, resources in listings.items():
+        getattr(client, operation).side_effect = listing(resources)
+    return client
+
+
+@patch('chaosoci.core.networking.topology.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_delete_vcn_resources_by_filters_in_dependency_order(
+        oci_client, topology_client):
+    client = _vcn_client()
+    oci_client.return_value = client
+    topology_client.return_value = client
+    calls = []
+
+    def delete(ocid, **kwargs):
+        calls.append(ocid)
+        return MagicMock(data=None)
+
+    client.delete_route_table.side_effect = delete
+    client.delete_nat_gateway.side_effect = delete
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    vcn_id = "ocid1.vcn.oc1.phx.amaaaaaapwxjxiqavc6zohqv4whr6y65qwwjcexhex"
+    report = delete_vcn_resources_by_filters(
+        c_id, vcn_id, {'route_tables': {'display_name': {'in': ['default',
+                                                                 'egress']}},
+                       'nat_gateways': {'display_name': 'nat-a'}})
+
+    # the default route table is still used by a subnet, rt-1 goes first so
+    # nat-1 is no longer targeted
+    assert calls == ['rt-1', 'nat-1']
+    assert report['deleted'] == 2
+    assert report['failed'] == 1
+    skipped = [r for r in report['resources'] if not r['success']][0]
+    assert skipped['id'] == 'rt-0'
+    assert skipped['error'] == 'Still used by app'
+    assert {r['resource_type'] for r in report['resources']} == {
+        'route_tables', 'nat_gateways'}
+
+
+@patch('chaosoci.core.networking.topology.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_delete_vcn_resources_by_filters_waits_for_deleted_users(
+        oci_client, topology_client):
+    client = _vcn_client()
+    oci_client.return_value = client
+    topology_client.return_value = client
+    calls = []
+
+    def delete(ocid, **kwargs):
+        calls.append(ocid)
+        return MagicMock(data=None)
+
+    client.delete_route_table.side_effect = delete
+    client.delete_nat_gateway.side_effect = delete
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    vcn_id = "ocid1.vcn.oc1.phx.transit"
+    report = delete_vcn_resources_by_filters(
+        c_id, vcn_id, {'route_tables': {'display_name': 'transit'},
+                       'nat_gateways': {'display_name': 'transit-nat'}})
+
+    # the transit route table is attached to the gateway deleted along
+    # with it, so it goes once the gateway is gone
+    assert calls == ['nat-3', 'rt-2']
+    assert report['deleted'] == 2
+    assert report['failed'] == 0
+
+
+@patch('chaosoci.core.networking.topology.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_delete_nat_gateways_by_filters_reports_each_gateway(
+        oci_client, topology_client):
+    client = _vcn_client()
+    oci_client.return_value = client
+    topology_client.return_value = client
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    vcn_id = "ocid1.vcn.oc1.phx.amaaaaaapwxjxiqavc6zohqv4whr6y65qwwjcexhex"
+    report = delete_nat_gateways_by_filters(c_id, vcn_id,
+                                            {'display_name': {'prefix': 'nat'}})
+
+    outcomes = {r['id']: r['success'] for r in report['resources']}
+    assert outcomes == {'nat-1': False, 'nat-2': True}
+    client.delete_nat_gateway.assert_called_once()
+    assert client.delete_nat_gateway.call_args[0][0] == 'nat-2'
+    assert all('duration' in r for r in report['resources'])
+
+
+@patch('chaosoci.core.networking.rollbacks.oci_client', autospec=True)
+@patch('chaosoci.core.networking.topology.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_subnets_are_detached_then_restored(oci_client, topology_client,
+                                            rollbacks_client):
+    client = _vcn_client()
+    oci_client.return_value = client
+    topology_client.return_value = client
+    rollbacks_client.return_value = client
+    client.get_vcn.return_value = MagicMock(data=MagicMock(
+        default_route_table_id='rt-vcn'))
+    calls = []
+
+    def update_subnet(ocid, details):
+        calls.append((ocid, details.route_table_id))
+        return MagicMock(data=None)
+
+    def delete(ocid, **kwargs):
+        calls.append(ocid)
+        return MagicMock(data=None)
+
+    client.update_subnet.side_effect = update_subnet
+    client.delete_route_table.side_effect = delete
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    vcn_id = "ocid1.vcn.oc1.phx.detach"
+    report = delete_route_tables_by_filters(
+        c_id, vcn_id, {'display_name': 'default'}, detach_subnets=True)
+
+    assert report['deleted'] == 1
+    assert calls == [('subnet-1', 'rt-vcn'), 'rt-0']
+    backup = pending_backups(vcn_id)[0]
+    assert backup['attachments'] == {'subnet_ids': ['subnet-1']}
+
+    client.create_route_table.return_value = MagicMock(
+        data=MagicMock(id='rt-new'))
+    client.get_route_table.return_value = MagicMock(
+        data=MagicMock(lifecycle_state='AVAILABLE'))
+    # the listing holds mocks rather than SDK models
+    backup['definition'] = {'id': 'rt-0', 'compartment_id': c_id,
+                            'vcn_id': vcn_id, 'route_rules': []}
+    restore_vcn_resources(vcn_id)
+
+    assert calls[-1] == ('subnet-1', 'rt-new')
+
+
+@patch('chaosoci.core.networking.topology.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_detached_subnets_are_moved_back_when_deletion_fails(
+        oci_client, topology_client):
+    client = _vcn_client()
+    oci_client.return_value = client
+    topology_client.return_value = client
+    client.get_vcn.return_value = MagicMock(data=MagicMock(
+        default_route_table_id='rt-vcn'))
+    client.delete_route_table.side_effect = Exception('Conflict')
+
+    vcn_id = "ocid1.vcn.oc1.phx.detach-failed"
+    report = delete_route_tables_by_filters(
+        'c', vcn_id, {'display_name': 'default'}, detach_subnets=True)
+
+    assert report['failed'] == 1
+    assert [(c[0][0], c[0][1].route_table_id)
+            for c in client.update_subnet.call_args_list] == [
+        ('subnet-1', 'rt-vcn'), ('subnet-1', 'rt-0')]
+    assert pending_backups(vcn_id) == []
+
+
+def test_delete_vcn_resources_by_filters_needs_known_types():
+    with pytest.raises(ActivityFailed):
+        delete_vcn_resources_by_filters('c', 'vcn', {'subnets': {}})
+    with pytest.raises(ActivityFailed):
+        delete_vcn_resources_by_filters('c', 'vcn', None)
+
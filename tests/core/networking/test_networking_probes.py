@@ -10,7 +10,7 @@ from chaoslib.exceptions import ActivityFailed
 
 from chaosoci.core.networking.probes import (count_route_tables,
                                              filter_route_tables, count_nat_gateway, count_internet_gateway,
-                                             count_service_gateway)
+                                             count_service_gateway, count_nat_gateway_by)
 
 @patch('chaosoci.core.networking.probes.filter_route_tables', autospec=True)
 @patch('chaosoci.core.networking.probes.get_route_tables', autospec=True)
@@ -102,4 +102,25 @@ def test_count_service_gateway(oci_client, get_service_gateway, filter_service_g
         else:
             with pytest.raises(ActivityFailed) as f:
                 count_service_gateway(filters=filters, compartment_id=id)
-            assert 'A valid compartment id is required.'
\ No newline at end of file
+            assert 'A valid compartment id is required.'
+
+
+@patch('chaosoci.core.networking.probes.get_nat_gateway', autospec=True)
+@patch('chaosoci.core.networking.probes.oci_client', autospec=True)
+def test_count_nat_gateway_by(oci_client, get_nat_gateway):
+    network_client = MagicMock()
+    oci_client.return_value = network_client
+    get_nat_gateway.return_value = [
+        MagicMock(lifecycle_state='AVAILABLE', block_traffic=False),
+        MagicMock(lifecycle_state='AVAILABLE', block_traffic=True),
+        MagicMock(lifecycle_state='TERMINATING', block_traffic=False)]
+
+    c_id = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+    vcn_id = "ocid1.vcn.oc1.phx.amaaaaaapwxjxiqavc6zohqv4whr6y65qwwjcexhex"
+
+    assert count_nat_gateway_by(compartment_id=c_id, vcn_id=vcn_id) == {
+        'AVAILABLE': 2, 'TERMINATING': 1}
+    assert count_nat_gateway_by('block_traffic', {'lifecycle_state': 'AVAILABLE'},
+                                c_id, vcn_id) == {False: 1, True: 1}
+    get_nat_gateway.assert_called_with(network_client, c_id, vcn_id,
+                                       prefetch=0, compact=False)
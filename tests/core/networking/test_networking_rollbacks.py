@@ -3,8 +3,249 @@
 
 import pytest
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, create_autospec, patch
 
+from oci.core import VirtualNetworkClient
 from oci.exceptions import ServiceError
+from oci.retry import DEFAULT_RETRY_STRATEGY
 
 from chaoslib.exceptions import ActivityFailed
+from oci.core.models import (InternetGateway, NatGateway, RouteRule,
+                             RouteTable)
+
+from chaosoci.core.networking.actions import (delete_nat_gateway_by_filters,
+                                              remove_route_rules)
+from chaosoci.core.networking.rollbacks import (delete_nat_rollback,
+                                                restore_route_rules,
+                                                restore_vcn_resources)
+from chaosoci.util.backups import pending_backups, save_backup
+from chaosoci.util.records import compact_records
+
+C_ID = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+
+
+def _created(ocid):
+    return MagicMock(data=MagicMock(id=ocid))
+
+
+def _available(ocid):
+    return MagicMock(data=MagicMock(lifecycle_state='AVAILABLE'))
+
+
+@patch('chaosoci.core.networking.actions.filter_nat_gateway', autospec=True)
+@patch('chaosoci.core.networking.actions.get_nat_gateway', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_deleted_gateway_is_backed_up(oci_client, get_nat_gateway,
+                                      filter_nat_gateway):
+    vcn_id = 'vcn-rollbacks-1'
+    nat = NatGateway(id='nat-1', display_name='egress', vcn_id=vcn_id,
+                     compartment_id=C_ID, block_traffic=False,
+                     public_ip_id='ip-1')
+    # the listing may hold compact records, missing fields such as the
+    # public IP, so the full gateway is fetched before being backed up
+    filter_nat_gateway.return_value = list(
+        compact_records([nat], 'nat_gateways'))
+    oci_client.return_value.get_nat_gateway.return_value = MagicMock(
+        data=nat)
+
+    delete_nat_gateway_by_filters(C_ID, vcn_id, {'display_name': 'egress'})
+
+    backups = pending_backups(vcn_id)
+    assert [b['definition']['id'] for b in backups] == ['nat-1']
+    assert backups[0]['definition']['public_ip_id'] == 'ip-1'
+    assert backups[0]['resource_type'] == 'nat_gateways'
+    oci_client.return_value.delete_nat_gateway.assert_called_once_with(
+        'nat-1', retry_strategy=DEFAULT_RETRY_STRATEGY)
+
+
+@patch('chaosoci.core.networking.actions.filter_nat_gateway', autospec=True)
+@patch('chaosoci.core.networking.actions.get_nat_gateway', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_gateway_is_backed_up_before_being_deleted(oci_client,
+                                                   get_nat_gateway,
+                                                   filter_nat_gateway):
+    vcn_id = 'vcn-rollbacks-4'
+    network_client = create_autospec(VirtualNetworkClient, instance=True)
+    oci_client.return_value = network_client
+    nat = NatGateway(id='nat-1', display_name='egress', vcn_id=vcn_id)
+    filter_nat_gateway.return_value = [nat]
+    network_client.get_nat_gateway.return_value = MagicMock(data=nat)
+
+    def delete(nat_gateway_id, **kwargs):
+        assert [b['definition']['id']
+                for b in pending_backups(vcn_id)] == ['nat-1']
+        raise ServiceError(409, 'Conflict', {}, 'still in use')
+
+    network_client.delete_nat_gateway.side_effect = delete
+    with pytest.raises(ServiceError):
+        delete_nat_gateway_by_filters(C_ID, vcn_id, {'display_name': 'egress'})
+
+    # a resource that was not deleted is never restored
+    assert pending_backups(vcn_id) == []
+
+
+@patch('chaosoci.core.networking.rollbacks.oci_client', autospec=True)
+def test_restore_recreates_gateways_before_route_tables(oci_client):
+    network_client = MagicMock()
+    oci_client.return_value = network_client
+    network_client.create_nat_gateway.return_value = _created('nat-new')
+    network_client.create_route_table.return_value = _created('rt-new')
+    network_client.get_nat_gateway.side_effect = _available
+    network_client.get_route_table.side_effect = _available
+
+    vcn_id = 'vcn-rollbacks-2'
+    save_backup(vcn_id, 'route_tables', RouteTable(
+        id='rt-1', display_name='private', compartment_id=C_ID,
+        vcn_id=vcn_id, route_rules=[RouteRule(
+            destination='0.0.0.0/0', destination_type='CIDR_BLOCK',
+            network_entity_id='nat-1')]),
+        {'subnet_ids': ['subnet-1']})
+    save_backup(vcn_id, 'nat_gateways', NatGateway(
+        id='nat-1', display_name='egress', compartment_id=C_ID,
+        vcn_id=vcn_id, block_traffic=False))
+
+    report = restore_vcn_resources(vcn_id)
+
+    assert report['restored'] == 3
+    assert [(r['id'], r['resource_type']) for r in report['resources']] == [
+        ('nat-1', 'nat_gateways'), ('rt-1', 'route_tables'),
+        ('subnet-1', 'subnets')]
+    details = network_client.create_route_table.call_args[0][0]
+    assert details.route_rules[0].network_entity_id == 'nat-new'
+    subnet_id, update = network_client.update_subnet.call_args[0]
+    assert (subnet_id, update.route_table_id) == ('subnet-1', 'rt-new')
+    assert pending_backups(vcn_id) == []
+
+    # nothing is left to restore
+    assert restore_vcn_resources(vcn_id)['restored'] == 0
+
+
+@patch('chaosoci.core.networking.rollbacks.oci_client', autospec=True)
+def test_restored_gateways_are_attached_to_restored_route_tables(oci_client):
+    network_client = MagicMock()
+    oci_client.return_value = network_client
+    network_client.create_internet_gateway.return_value = _created('ig-new')
+    network_client.create_route_table.return_value = _created('rt-new')
+    network_client.get_internet_gateway.side_effect = _available
+    network_client.get_route_table.side_effect = _available
+
+    vcn_id = 'vcn-rollbacks-5'
+    save_backup(vcn_id, 'internet_gateways', InternetGateway(
+        id='ig-1', display_name='ingress', compartment_id=C_ID,
+        vcn_id=vcn_id, is_enabled=True, route_table_id='rt-1'))
+    save_backup(vcn_id, 'route_tables', RouteTable(
+        id='rt-1', display_name='transit', compartment_id=C_ID,
+        vcn_id=vcn_id, route_rules=[]))
+
+    report = restore_vcn_resources(vcn_id)
+
+    assert network_client.create_internet_gateway.call_args[0][0] \
+        .route_table_id is None
+    gateway_id, update = network_client.update_internet_gateway.call_args[0]
+    assert (gateway_id, update.route_table_id) == ('ig-new', 'rt-new')
+    attached = report['resources'][-1]
+    assert (attached['id'], attached['resource_type'],
+            attached['route_table_id'], attached['success']) == (
+        'ig-new', 'internet_gateways', 'rt-new', True)
+    assert report['restored'] == 3
+
+
+@patch('chaosoci.core.networking.rollbacks.oci_client', autospec=True)
+def test_delete_nat_rollback_restores_nat_gateways_only(oci_client):
+    network_client = MagicMock()
+    oci_client.return_value = network_client
+    network_client.create_nat_gateway.return_value = _created('nat-new')
+    network_client.get_nat_gateway.side_effect = _available
+
+    vcn_id = 'vcn-rollbacks-3'
+    save_backup(vcn_id, 'nat_gateways', NatGateway(
+        id='nat-1', compartment_id=C_ID, vcn_id=vcn_id))
+    save_backup(vcn_id, 'route_tables', RouteTable(
+        id='rt-1', compartment_id=C_ID, vcn_id=vcn_id, route_rules=[]))
+
+    report = delete_nat_rollback(vcn_id)
+
+    assert report['restored'] == 1
+    network_client.create_route_table.assert_not_called()
+    assert [b['resource_type'] for b in pending_backups(vcn_id)] == [
+        'route_tables']
+
+
+def test_restore_needs_a_vcn():
+    with pytest.raises(ActivityFailed):
+        restore_vcn_resources(None)
+
+
+def _route_table_client(rules):
+    network_client = MagicMock()
+    network_client.get_route_table.return_value = MagicMock(
+        data=RouteTable(id='rt-1', route_rules=rules),
+        headers={'etag': 'etag-1'})
+    return network_client
+
+
+def _rules(network_client):
+    details = network_client.update_route_table.call_args[0][1]
+    return [(rule.destination, rule.network_entity_id)
+            for rule in details.route_rules]
+
+
+@patch('chaosoci.core.networking.rollbacks.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_route_rules_removed_then_restored(actions_client, rollbacks_client):
+    rules = [RouteRule(destination='0.0.0.0/0', network_entity_id='nat-1'),
+             RouteRule(destination='10.1.0.0/16', network_entity_id='drg-1'),
+             RouteRule(destination='10.2.0.0/16', network_entity_id='drg-1')]
+    network_client = _route_table_client(rules)
+    actions_client.return_value = network_client
+    rollbacks_client.return_value = network_client
+
+    report = remove_route_rules('rt-1', network_entity_ids=['drg-1'])
+
+    assert len(report['removed']) == 2
+    assert _rules(network_client) == [('0.0.0.0/0', 'nat-1')]
+    assert network_client.update_route_table.call_args[1] == {
+        'if_match': 'etag-1'}
+
+    # a rule added meanwhile is left alone
+    network_client.get_route_table.return_value.data = RouteTable(
+        id='rt-1', route_rules=[rules[0], RouteRule(
+            destination='10.9.0.0/16', network_entity_id='lpg-1')])
+
+    assert restore_route_rules('rt-1')['restored'] == 2
+    assert _rules(network_client) == [('0.0.0.0/0', 'nat-1'),
+                                      ('10.9.0.0/16', 'lpg-1'),
+                                      ('10.1.0.0/16', 'drg-1'),
+                                      ('10.2.0.0/16', 'drg-1')]
+    assert network_client.update_route_table.call_count == 2
+    assert restore_route_rules('rt-1')['restored'] == 0
+
+
+@patch('chaosoci.core.networking.rollbacks.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_route_rules_blackholed_then_restored(actions_client,
+                                              rollbacks_client):
+    rules = [RouteRule(destination='0.0.0.0/0', network_entity_id='nat-1')]
+    network_client = _route_table_client(rules)
+    actions_client.return_value = network_client
+    rollbacks_client.return_value = network_client
+
+    remove_route_rules('rt-2', destinations=['0.0.0.0/0'],
+                       blackhole_entity_id='privateip-1')
+    assert _rules(network_client) == [('0.0.0.0/0', 'privateip-1')]
+
+    network_client.get_route_table.return_value.data = RouteTable(
+        id='rt-2', route_rules=[RouteRule(destination='0.0.0.0/0',
+                                          network_entity_id='privateip-1')])
+    restore_route_rules('rt-2')
+    assert _rules(network_client) == [('0.0.0.0/0', 'nat-1')]
+
+
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_remove_route_rules_needs_matching_rules(oci_client):
+    oci_client.return_value = _route_table_client([])
+
+    with pytest.raises(ActivityFailed):
+        remove_route_rules('rt-3')
+    with pytest.raises(ActivityFailed):
+        remove_route_rules('rt-3', destinations=['0.0.0.0/0'])
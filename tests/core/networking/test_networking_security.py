@@ -0,0 +1,138 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import pytest
+
+from unittest.mock import MagicMock, patch
+
+from chaoslib.exceptions import ActivityFailed
+from oci.core.models import (EgressSecurityRule, IngressSecurityRule,
+                             PortRange, SecurityList, SecurityRule,
+                             TcpOptions)
+
+from chaosoci.core.networking.actions import remove_security_rules
+from chaosoci.core.networking.rollbacks import restore_security_rules
+from chaosoci.core.networking.security import check_direction, rule_matches
+from chaosoci.util.backups import resource_definition
+
+
+def _tcp(port_min, port_max):
+    return TcpOptions(destination_port_range=PortRange(min=port_min,
+                                                       max=port_max))
+
+
+def _security_list_client(ingress, egress):
+    network_client = MagicMock()
+    network_client.get_security_list.return_value = MagicMock(
+        data=SecurityList(id='sl-1', ingress_security_rules=ingress,
+                          egress_security_rules=egress),
+        headers={'etag': 'etag-1'})
+    return network_client
+
+
+def _updated(network_client):
+    details = network_client.update_security_list.call_args[0][1]
+    return ([rule.source for rule in details.ingress_security_rules],
+            [rule.destination for rule in details.egress_security_rules])
+
+
+def test_rule_matches():
+    ssh = resource_definition(IngressSecurityRule(
+        protocol='6', source='0.0.0.0/0', source_type='CIDR_BLOCK',
+        tcp_options=_tcp(22, 22)))
+    everything = resource_definition(EgressSecurityRule(
+        protocol='all', destination='10.0.0.0/16'))
+
+    assert rule_matches(ssh, 'INGRESS')
+    assert rule_matches(ssh, 'INGRESS', protocol='tcp', port=22,
+                        cidr='192.168.1.0/24')
+    assert not rule_matches(ssh, 'INGRESS', protocol='udp')
+    assert not rule_matches(ssh, 'INGRESS', port=443)
+    assert rule_matches(everything, 'EGRESS', protocol='17', port=53,
+                        cidr='10.0.1.0/24')
+    assert not rule_matches(everything, 'EGRESS', cidr='10.1.0.0/24')
+
+
+def test_check_direction():
+    assert check_direction(None) is None
+    assert check_direction('ingress') == 'INGRESS'
+    with pytest.raises(ActivityFailed):
+        check_direction('sideways')
+
+
+@patch('chaosoci.core.networking.rollbacks.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_security_list_rules_removed_then_restored(actions_client,
+                                                   rollbacks_client):
+    ingress = [IngressSecurityRule(protocol='6', source='0.0.0.0/0',
+                                   tcp_options=_tcp(22, 22)),
+               IngressSecurityRule(protocol='6', source='10.0.0.0/16',
+                                   tcp_options=_tcp(443, 443))]
+    egress = [EgressSecurityRule(protocol='all', destination='0.0.0.0/0')]
+    network_client = _security_list_client(ingress, egress)
+    actions_client.return_value = network_client
+    rollbacks_client.return_value = network_client
+
+    report = remove_security_rules(security_list_ids=['sl-1'],
+                                   protocol='tcp', port=22)
+
+    assert report['removed'] == 2
+    assert report['resources'][0]['removed'] == 2
+    assert _updated(network_client) == (['10.0.0.0/16'], [])
+    assert network_client.update_security_list.call_args[1] == {
+        'if_match': 'etag-1'}
+
+    network_client.get_security_list.return_value.data = SecurityList(
+        id='sl-1', ingress_security_rules=[ingress[1]],
+        egress_security_rules=[])
+
+    assert restore_security_rules(security_list_ids=['sl-1'])[
+        'restored'] == 2
+    assert _updated(network_client) == (['10.0.0.0/16', '0.0.0.0/0'],
+                                        ['0.0.0.0/0'])
+    assert network_client.update_security_list.call_count == 2
+    assert restore_security_rules(security_list_ids=['sl-1'])[
+        'restored'] == 0
+
+
+@patch('chaosoci.core.networking.rollbacks.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_network_security_group_rules_removed_then_restored(
+        actions_client, rollbacks_client):
+    rules = [SecurityRule(id='rule-{}'.format(i), direction='INGRESS',
+                          protocol='6', source='0.0.0.0/0',
+                          tcp_options=_tcp(8000 + i, 8000 + i))
+             for i in range(30)]
+    network_client = MagicMock()
+    network_client.list_network_security_group_security_rules.return_value \
+        = MagicMock(data=rules, has_next_page=False)
+    actions_client.return_value = network_client
+    rollbacks_client.return_value = network_client
+
+    report = remove_security_rules(network_security_group_ids=['nsg-1'],
+                                   direction='ingress', cidr='10.0.0.0/8')
+
+    assert report['removed'] == 30
+    network_client.list_network_security_group_security_rules \
+        .assert_called_once_with('nsg-1', direction='INGRESS')
+    network_client.remove_network_security_group_security_rules \
+        .assert_called_once()
+    details = network_client.remove_network_security_group_security_rules \
+        .call_args[0][1]
+    assert len(details.security_rule_ids) == 30
+
+    assert restore_security_rules(network_security_group_ids=['nsg-1'])[
+        'restored'] == 30
+    calls = network_client.add_network_security_group_security_rules \
+        .call_args_list
+    assert [len(call[0][1].security_rules) for call in calls] == [25, 5]
+    assert calls[0][0][1].security_rules[0].tcp_options \
+        .destination_port_range.min == 8000
+
+
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_remove_security_rules_needs_resources(oci_client):
+    with pytest.raises(ActivityFailed):
+        remove_security_rules()
+    with pytest.raises(ActivityFailed):
+        remove_security_rules(security_list_ids=['sl-1'], direction='up')
@@ -0,0 +1,122 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import pytest
+
+from unittest.mock import MagicMock, patch
+
+from chaoslib.exceptions import ActivityFailed
+
+from chaosoci.core.networking.actions import (delete_nat_gateway_by_filters,
+                                              delete_route_table_by_filters)
+from chaosoci.core.networking.topology import VcnTopology, vcn_topology
+
+C_ID = "ocid1.compartment.oc1..oadsocmof6r6ksovxmda44ikwxje7xxu"
+VCN_ID = "ocid1.vcn.oc1.phx.amaaaaaapwxjxiqavc6zohqv4whr6y65qwwjcexhex"
+
+
+def _resource(ocid, name, **fields):
+    resource = MagicMock(id=ocid, **fields)
+    resource.display_name = name
+    return resource
+
+
+def _network_client():
+    client = MagicMock()
+    nat = _resource('nat-1', 'egress', block_traffic=False,
+                    route_table_id=None)
+    unused = _resource('nat-2', 'spare', block_traffic=False,
+                       route_table_id=None)
+    transit = _resource('rt-2', 'transit', route_rules=[])
+    gateway = _resource('ig-1', 'ingress', route_table_id='rt-2')
+    route_table = _resource('rt-1', 'private', route_rules=[
+        MagicMock(network_entity_id='nat-1'),
+        MagicMock(network_entity_id='nat-1')])
+    subnet = _resource('subnet-1', 'app', route_table_id='rt-1',
+                       security_list_ids=['sl-1'])
+    security_list = _resource('sl-1', 'default')
+    listings = {
+        'list_route_tables': [route_table, transit],
+        'list_nat_gateways': [nat, unused],
+        'list_internet_gateways': [gateway],
+        'list_service_gateways': [],
+        'list_subnets': [subnet],
+        'list_security_lists': [security_list],
+    }
+    for operation, resources in listings.items():
+        getattr(client, operation).return_value = MagicMock(
+            data=resources, has_next_page=False)
+    return client
+
+
+def test_topology_cross_references_resources():
+    client = _network_client()
+
+    topology = VcnTopology.fetch(client, C_ID, VCN_ID)
+
+    assert [r.id for r in topology.resources('nat_gateways')] == ['nat-1',
+                                                                  'nat-2']
+    assert topology.get('subnet-1').display_name == 'app'
+    assert topology.resource_type('sl-1') == 'security_lists'
+    assert [r.id for r in topology.referrers('nat-1')] == ['rt-1']
+    assert [r.id for r in topology.referrers('rt-1')] == ['subnet-1']
+    assert [r.id for r in topology.referrers('rt-2')] == ['ig-1']
+    assert [r.id for r in topology.referrers('sl-1')] == ['subnet-1']
+    assert topology.referrers('nat-2') == []
+    for operation in ('list_route_tables', 'list_subnets',
+                      'list_security_lists'):
+        getattr(client, operation).assert_called_once_with(
+            compartment_id=C_ID, vcn_id=VCN_ID)
+
+
+def test_topology_fails_when_a_listing_fails():
+    client = _network_client()
+    client.list_subnets.side_effect = Exception('throttled')
+
+    with pytest.raises(ActivityFailed, match='subnets'):
+        VcnTopology.fetch(client, C_ID, VCN_ID)
+
+
+def test_unknown_resource_type_fails():
+    with pytest.raises(ActivityFailed):
+        VcnTopology(VCN_ID, {}).resources('vcns')
+
+
+@patch('chaosoci.core.networking.topology.oci_client', autospec=True)
+def test_vcn_topology_needs_a_vcn(oci_client):
+    with pytest.raises(ActivityFailed):
+        vcn_topology(C_ID, None)
+
+
+@patch('chaosoci.core.networking.topology.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_delete_by_filters_refuses_gateway_in_use(oci_client,
+                                                  topology_client):
+    client = _network_client()
+    oci_client.return_value = client
+    topology_client.return_value = client
+
+    with pytest.raises(ActivityFailed, match='route_tables private'):
+        delete_nat_gateway_by_filters(C_ID, VCN_ID,
+                                      {'display_name': 'egress'},
+                                      topology=True)
+    client.delete_nat_gateway.assert_not_called()
+
+    delete_nat_gateway_by_filters(C_ID, VCN_ID, {'display_name': 'spare'},
+                                  topology=True)
+    assert client.delete_nat_gateway.call_args[0][0] == 'nat-2'
+
+
+@patch('chaosoci.core.networking.topology.oci_client', autospec=True)
+@patch('chaosoci.core.networking.actions.oci_client', autospec=True)
+def test_delete_by_filters_refuses_route_table_of_a_gateway(oci_client,
+                                                           topology_client):
+    client = _network_client()
+    oci_client.return_value = client
+    topology_client.return_value = client
+
+    with pytest.raises(ActivityFailed, match='internet_gateways ingress'):
+        delete_route_table_by_filters(C_ID, VCN_ID,
+                                      {'display_name': 'transit'},
+                                      topology=True)
+    client.delete_route_table.assert_not_called()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import os
+from unittest.mock import MagicMock, patch
+
+from chaosoci import (clear_client_pool, get_compartment_id, oci_client,
+                      oci_config)
+
+CONFIG = {'tenancy': 'ocid1.tenancy.oc1..aaaaaaaa', 'region': 'uk-london-1'}
+
+
+@patch('chaosoci.validate_config', autospec=True)
+def test_oci_client_is_pooled(validate_config):
+    clear_client_pool()
+    client_class = MagicMock()
+
+    first = oci_client(client_class, dict(CONFIG))
+    second = oci_client(client_class, dict(CONFIG))
+
+    assert first is second
+    client_class.assert_called_once_with(CONFIG, skip_deserialization=False)
+
+
+@patch('chaosoci.validate_config', autospec=True)
+def test_oci_client_pool_is_keyed_by_config_and_deserialization(
+        validate_config):
+    clear_client_pool()
+    client_class = MagicMock(side_effect=lambda *a, **kw: MagicMock())
+
+    base = oci_client(client_class, dict(CONFIG))
+    raw = oci_client(client_class, dict(CONFIG), skip_deserialization=True)
+    other = oci_client(client_class, dict(CONFIG, region='us-phoenix-1'))
+
+    assert len({id(base), id(raw), id(other)}) == 3
+
+
+@patch('chaosoci.validate_config', autospec=True)
+def test_clear_client_pool(validate_config):
+    clear_client_pool()
+    client_class = MagicMock(side_effect=lambda *a, **kw: MagicMock())
+
+    first = oci_client(client_class, dict(CONFIG))
+    clear_client_pool()
+    second = oci_client(client_class, dict(CONFIG))
+
+    assert first is not second
+    first.base_client.session.close.assert_called_once_with()
+
+
+@patch('chaosoci.from_file', autospec=True)
+def test_oci_config_is_parsed_once_until_modified(from_file, tmp_path):
+    config_file = tmp_path / 'config'
+    config_file.write_text('[DEFAULT]\n')
+    from_file.return_value = {'compartment': 'ocid1.compartment.oc1..a'}
+
+    oci_config(str(config_file))
+    oci_config(str(config_file))
+    assert from_file.call_count == 1
+
+    os.utime(str(config_file), (0, 0))
+    oci_config(str(config_file))
+    assert from_file.call_count == 2
+
+
+@patch('chaosoci.oci_config', autospec=True)
+def test_get_compartment_id(oci_config):
+    oci_config.return_value = {'compartment': 'from-file'}
+
+    assert get_compartment_id('explicit') == 'explicit'
+    assert get_compartment_id(
+        None, {'compartment': 'from-configuration'}) == 'from-configuration'
+    assert get_compartment_id(None, {}) == 'from-file'
+    oci_config.assert_called_once_with()
@@ -0,0 +1,63 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import json
+import os
+
+from oci.core.models import NatGateway, RouteRule, RouteTable
+
+from chaosoci.util.backups import (_backups, discard_backup, mark_restored,
+                                   pending_backups, resource_definition,
+                                   save_backup)
+
+
+def test_definition_of_sdk_models_is_plain_data():
+    route_table = RouteTable(id='rt-1', display_name='egress', route_rules=[
+        RouteRule(destination='0.0.0.0/0', network_entity_id='nat-1')])
+
+    definition = resource_definition(route_table)
+
+    assert definition['display_name'] == 'egress'
+    assert definition['route_rules'][0]['network_entity_id'] == 'nat-1'
+    json.dumps(definition)
+
+
+def test_pending_backups_until_restored():
+    nat = NatGateway(id='nat-1', display_name='egress')
+    backup = save_backup('vcn-backups-1', 'nat_gateways', nat)
+    save_backup('vcn-backups-other', 'nat_gateways', nat)
+
+    assert pending_backups('vcn-backups-1') == [backup]
+    assert pending_backups('vcn-backups-1', ['route_tables']) == []
+
+    mark_restored(backup, 'nat-2')
+
+    assert pending_backups('vcn-backups-1') == []
+
+
+def test_backups_are_read_back_from_the_store(tmpdir):
+    configuration = {'oci_backup_store': str(tmpdir)}
+    backup = save_backup('vcn-backups-2', 'nat_gateways',
+                         NatGateway(id='nat-1'), {'subnet_ids': []},
+                         configuration)
+    assert os.path.exists(os.path.join(
+        str(tmpdir), '{}.json'.format(backup['backup_id'])))
+
+    # as when the rollback runs in another process
+    del _backups[backup['backup_id']]
+    assert pending_backups('vcn-backups-2', None, configuration) == [backup]
+
+    mark_restored(backup, 'nat-2', configuration)
+    del _backups[backup['backup_id']]
+    assert pending_backups('vcn-backups-2', None, configuration) == []
+
+
+def test_discarded_backups_are_forgotten(tmpdir):
+    configuration = {'oci_backup_store': str(tmpdir)}
+    backup = save_backup('vcn-backups-3', 'nat_gateways',
+                         NatGateway(id='nat-1'), None, configuration)
+
+    discard_backup(backup, configuration)
+
+    assert pending_backups('vcn-backups-3', None, configuration) == []
+    assert os.listdir(str(tmpdir)) == []
@@ -0,0 +1,89 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+from unittest.mock import MagicMock, patch
+
+from chaosoci.util.cache import (InventoryCache, cached_inventory,
+                                 inventory_cache, invalidate_inventory)
+from chaosoci.util.inventory import Inventory
+
+
+def test_cache_disabled_by_default():
+    loader = MagicMock(return_value=['a'])
+
+    assert cached_inventory('instances', ('c',), loader) == ['a']
+    assert cached_inventory('instances', ('c',), loader, {}) == ['a']
+    assert loader.call_count == 2
+
+
+def test_cache_serves_listing_within_ttl():
+    inventory_cache.clear()
+    loader = MagicMock(return_value=['a', 'b'])
+    configuration = {'oci_inventory_ttl': 60}
+
+    first = cached_inventory('instances', ('c', {'x': 1}), loader,
+                             configuration)
+    second = cached_inventory('instances', ('c', {'x': 1}), loader,
+                              configuration)
+    other = cached_inventory('instances', ('other',), loader, configuration)
+
+    assert isinstance(first, Inventory)
+    assert list(first) == ['a', 'b']
+    assert first is second
+    assert other is not first
+    assert loader.call_count == 2
+
+
+@patch('chaosoci.util.cache.time.monotonic')
+def test_cache_entries_expire(monotonic):
+    cache = InventoryCache()
+    loader = MagicMock(side_effect=[['a'], ['b']])
+
+    monotonic.return_value = 100.0
+    assert list(cache.get_or_load('instances', ('c',), loader, 10)) == ['a']
+    monotonic.return_value = 105.0
+    assert list(cache.get_or_load('instances', ('c',), loader, 10)) == ['a']
+    monotonic.return_value = 111.0
+    assert list(cache.get_or_load('instances', ('c',), loader, 10)) == ['b']
+
+
+def test_actions_invalidate_their_resource_types():
+    inventory_cache.clear()
+    configuration = {'oci_inventory_ttl': 60}
+    instances = MagicMock(return_value=['i'])
+    buckets = MagicMock(return_value=['b'])
+
+    cached_inventory('instances', ('c',), instances, configuration)
+    cached_inventory('buckets', ('c',), buckets, configuration)
+    invalidate_inventory('instances')
+    cached_inventory('instances', ('c',), instances, configuration)
+    cached_inventory('buckets', ('c',), buckets, configuration)
+
+    assert instances.call_count == 2
+    assert buckets.call_count == 1
+
+
+def test_invalidation_bumps_inventory_version():
+    cache = InventoryCache()
+
+    assert cache.version('instances') == 0
+    cache.invalidate('instances', 'instance_pools')
+    cache.invalidate('instances')
+
+    assert cache.version('instances') == 2
+    assert cache.version('instance_pools') == 1
+    assert cache.version('buckets') == 0
+
+
+def test_listing_invalidated_while_loading_is_not_cached():
+    cache = InventoryCache()
+
+    def stale_listing():
+        # an action modifies the instances while they are being listed
+        cache.invalidate('instances')
+        return ['stale']
+
+    assert list(cache.get_or_load('instances', ('c',), stale_listing,
+                                  60)) == ['stale']
+    assert list(cache.get_or_load('instances', ('c',), lambda: ['fresh'],
+                                  60)) == ['fresh']
@@ -0,0 +1,58 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import threading
+import time
+
+from chaosoci.util.executor import run_concurrently, summarize
+
+
+def test_reports_every_item_in_order():
+    def double(n):
+        if n == 3:
+            raise ValueError('three')
+        return n * 2
+
+    reports = run_concurrently(double, range(5), max_workers=3)
+
+    assert [r['id'] for r in reports] == [0, 1, 2, 3, 4]
+    assert [r.get('result') for r in reports] == [0, 2, 4, None, 8]
+    assert reports[3]['success'] is False
+    assert reports[3]['error'] == 'three'
+    assert all(r['duration'] >= 0 for r in reports)
+    assert summarize(reports) == {'succeeded': 4, 'failed': 1}
+
+
+def test_runs_calls_concurrently():
+    barrier = threading.Barrier(4, timeout=2)
+
+    reports = run_concurrently(lambda n: barrier.wait(), range(4),
+                               max_workers=4)
+
+    assert all(r['success'] for r in reports)
+
+
+def test_gives_up_on_calls_past_their_timeout():
+    release = threading.Event()
+
+    def call(n):
+        if n == 'slow':
+            release.wait(5)
+        return n
+
+    start = time.monotonic()
+    reports = run_concurrently(call, ['fast', 'slow'], max_workers=2,
+                               timeout=0.2, key=str.upper)
+    release.set()
+
+    assert time.monotonic() - start < 2
+    assert reports[0] == {'id': 'FAST', 'success': True, 'result': 'fast',
+                          'duration': reports[0]['duration']}
+    assert reports[1]['success'] is False
+    assert reports[1]['timed_out'] is True
+    assert reports[1]['error'] == 'Timed out after 0.2s (may still complete)'
+    assert 'timed_out' not in reports[0]
+
+
+def test_no_items():
+    assert run_concurrently(lambda n: n, []) == []
@@ -0,0 +1,122 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+from datetime import datetime, timezone
+
+import pytest
+
+from chaoslib.exceptions import ActivityFailed
+
+from chaosoci.util.constants import FILTER_ERR
+from chaosoci.util.filters import (compile_filters, count_by,
+                                   filter_resources, pushdown_filters)
+
+
+def test_pushdown_filters_keeps_supported_plain_values():
+    filters = {'lifecycle_state': 'RUNNING', 'shape': 'VM.Standard2.1',
+               'display_name': {'prefix': 'web-'}}
+
+    assert pushdown_filters(filters, ('lifecycle_state', 'display_name')) \
+        == {'lifecycle_state': 'RUNNING'}
+
+
+def test_pushdown_filters_ignores_missing_filters():
+    assert pushdown_filters(None, ('lifecycle_state',)) == {}
+    assert pushdown_filters([{'lifecycle_state': 'RUNNING'}],
+                            ('lifecycle_state',)) == {}
+
+
+class Instance:
+    attribute_map = {'id': 'id', 'display_name': 'displayName',
+                     'lifecycle_state': 'lifecycleState',
+                     'freeform_tags': 'freeformTags', 'shape': 'shape',
+                     'time_created': 'timeCreated'}
+
+    def __init__(self, **kwargs):
+        for attr in self.attribute_map:
+            setattr(self, attr, kwargs.get(attr))
+
+
+INSTANCES = [
+    Instance(id='1', display_name='web-1', lifecycle_state='RUNNING',
+             freeform_tags={'env': 'prod'},
+             time_created=datetime(2020, 1, 1, tzinfo=timezone.utc)),
+    Instance(id='2', display_name='web-2', lifecycle_state='STOPPED',
+             freeform_tags={'env': 'dev'},
+             time_created=datetime(2020, 6, 1, tzinfo=timezone.utc)),
+    Instance(id='3', display_name='db-1', lifecycle_state='RUNNING',
+             freeform_tags={},
+             time_created=datetime(2021, 1, 1, tzinfo=timezone.utc)),
+]
+
+
+def ids(resources):
+    return [resource.id for resource in resources]
+
+
+@pytest.mark.parametrize('filters,expected', [
+    ({'lifecycle_state': 'RUNNING'}, ['1', '3']),
+    ({'lifecycle_state': {'in': ['RUNNING', 'STARTING']},
+      'display_name': {'prefix': 'web-'}}, ['1']),
+    ({'lifecycle_state': {'not': 'RUNNING'}}, ['2']),
+    ({'display_name': {'regex': r'^web-\d$'}}, ['1', '2']),
+    ({'freeform_tags.env': 'prod'}, ['1']),
+    ({'freeform_tags.env': {'not_in': ['prod', 'dev']}}, ['3']),
+    ({'time_created': {'range': ['2020-03-01T00:00:00+00:00', None]}},
+     ['2', '3']),
+    ({'time_created': {'range': ['2020-03-01', '2020-12-31T23:59']}},
+     ['2']),
+    ([{'display_name': 'db-1'}, {'lifecycle_state': 'STOPPED'}],
+     ['2', '3']),
+    ({}, ['1', '2', '3']),
+])
+def test_filter_resources(filters, expected):
+    assert ids(filter_resources(INSTANCES, filters)) == expected
+
+
+def test_range_filters_on_incomparable_values_fail():
+    with pytest.raises(ActivityFailed) as x:
+        filter_resources(INSTANCES, {'display_name': {'range': [1, None]}})
+    assert 'display_name' in str(x.value)
+
+
+def test_filter_resources_consumes_iterators():
+    matches = filter_resources(iter(INSTANCES), {'lifecycle_state': 'RUNNING'})
+    assert ids(matches) == ['1', '3']
+
+
+def test_filter_resources_rejects_unknown_attributes():
+    with pytest.raises(ActivityFailed) as x:
+        filter_resources(INSTANCES, {'region': 'uk-london-1'})
+    assert str(x.value) == FILTER_ERR
+
+
+def test_filter_resources_requires_resources():
+    with pytest.raises(ActivityFailed) as x:
+        filter_resources([], {'lifecycle_state': 'RUNNING'}, 'instances')
+    assert str(x.value) == 'No instances were found.'
+
+
+def test_compile_filters_compares_plain_mappings():
+    # a mapping that is not made of operators is compared as a whole
+    predicate = compile_filters({'freeform_tags': {'env': 'prod'}})
+    assert ids(filter(predicate, INSTANCES)) == ['1']
+
+
+def test_count_by_groups_in_one_pass():
+    assert count_by(iter(INSTANCES), 'lifecycle_state') == {
+        'RUNNING': 2, 'STOPPED': 1}
+    assert count_by(INSTANCES, 'freeform_tags.env',
+                    {'display_name': {'prefix': 'web-'}}) == {
+        'prod': 1, 'dev': 1}
+    assert count_by(INSTANCES, ['lifecycle_state', 'freeform_tags.env']) == {
+        'RUNNING': {'prod': 1, None: 1}, 'STOPPED': {'dev': 1}}
+    assert count_by(INSTANCES, 'time_created')[
+        str(datetime(2020, 1, 1, tzinfo=timezone.utc))] == 1
+    assert count_by([], 'lifecycle_state') == {}
+
+
+def test_count_by_refuses_unknown_attributes():
+    with pytest.raises(ActivityFailed) as e:
+        count_by(INSTANCES, 'not_an_attribute')
+    assert str(e.value) == FILTER_ERR
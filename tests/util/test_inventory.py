@@ -0,0 +1,76 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+from unittest.mock import patch
+
+import pytest
+
+from chaoslib.exceptions import ActivityFailed
+
+from chaosoci.core.compute.common import filter_instances
+from chaosoci.util import filters
+from chaosoci.util.inventory import Inventory
+
+
+class Instance:
+    attribute_map = {'id': 'id', 'lifecycle_state': 'lifecycleState',
+                     'fault_domain': 'faultDomain',
+                     'freeform_tags': 'freeformTags'}
+
+    def __init__(self, id, lifecycle_state, fault_domain, freeform_tags=None):
+        self.id = id
+        self.lifecycle_state = lifecycle_state
+        self.fault_domain = fault_domain
+        self.freeform_tags = freeform_tags or {}
+
+
+def make_inventory():
+    return Inventory([
+        Instance('1', 'RUNNING', 'FAULT-DOMAIN-1', {'env': 'prod'}),
+        Instance('2', 'STOPPED', 'FAULT-DOMAIN-2'),
+        Instance('3', 'RUNNING', 'FAULT-DOMAIN-2', {'env': 'dev'}),
+        Instance('4', 'RUNNING', 'FAULT-DOMAIN-3'),
+    ])
+
+
+def ids(resources):
+    return [resource.id for resource in resources]
+
+
+def test_inventory_is_a_sequence():
+    inventory = make_inventory()
+
+    assert len(inventory) == 4
+    assert inventory[1].id == '2'
+    assert ids(inventory) == ['1', '2', '3', '4']
+
+
+def test_filter_instances_uses_inventory_indexes():
+    inventory = make_inventory()
+
+    with patch('chaosoci.util.inventory.get_attribute',
+               wraps=filters.get_attribute) as get_attribute:
+        first = filter_instances(inventory, {'lifecycle_state': 'RUNNING',
+                                             'fault_domain': 'FAULT-DOMAIN-2'})
+        built = get_attribute.call_count
+        second = filter_instances(inventory, {'fault_domain': {
+            'in': ['FAULT-DOMAIN-1', 'FAULT-DOMAIN-3']}})
+
+    assert ids(first) == ['3']
+    assert ids(second) == ['1', '4']
+    # both indexes were built by the first call and reused by the second
+    assert built == 8
+    assert get_attribute.call_count == built
+
+
+def test_inventory_falls_back_to_scanning():
+    inventory = make_inventory()
+
+    assert ids(filter_instances(inventory, {
+        'lifecycle_state': {'not': 'RUNNING'}})) == ['2']
+    assert ids(inventory.lookup('freeform_tags', {'env': 'dev'})) == ['3']
+
+
+def test_filter_instances_on_empty_inventory():
+    with pytest.raises(ActivityFailed):
+        filter_instances(Inventory(), {'lifecycle_state': 'RUNNING'})
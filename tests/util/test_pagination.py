@@ -0,0 +1,72 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from chaosoci.util.pagination import iter_pages, paginate
+
+
+def make_list_func(pages):
+    responses = []
+    for index, data in enumerate(pages):
+        response = MagicMock()
+        response.data = data
+        response.has_next_page = index < len(pages) - 1
+        response.next_page = 'page-{}'.format(index + 1)
+        responses.append(response)
+    return MagicMock(side_effect=responses)
+
+
+def test_paginate_yields_every_item_of_every_page():
+    list_func = make_list_func([[1, 2], [3], [4, 5]])
+
+    assert list(paginate(list_func, compartment_id='c')) == [1, 2, 3, 4, 5]
+    list_func.assert_called_with(compartment_id='c', page='page-2')
+    assert list_func.call_count == 3
+
+
+def test_paginate_is_lazy():
+    list_func = make_list_func([[1, 2], [3], [4, 5]])
+
+    items = paginate(list_func, compartment_id='c')
+    assert next(items) == 1
+    assert next(items) == 2
+    assert list_func.call_count == 1
+
+
+def test_iter_pages_stops_on_last_page():
+    list_func = make_list_func([[1]])
+
+    assert len(list(iter_pages(list_func))) == 1
+    list_func.assert_called_once_with()
+
+
+def test_prefetch_yields_pages_in_order():
+    list_func = make_list_func([[1, 2], [3], [4, 5]])
+
+    items = list(paginate(list_func, compartment_id='c', prefetch=2))
+
+    assert items == [1, 2, 3, 4, 5]
+    assert list_func.call_count == 3
+
+
+def test_prefetch_reraises_listing_errors():
+    list_func = MagicMock(side_effect=RuntimeError('boom'))
+
+    with pytest.raises(RuntimeError):
+        list(paginate(list_func, prefetch=1))
+
+
+def test_prefetch_stays_bounded_when_consumer_stops():
+    list_func = make_list_func([[n] for n in range(10)])
+
+    pages = iter_pages(list_func, prefetch=1)
+    next(pages)
+    time.sleep(0.3)
+    pages.close()
+
+    # first page consumed, one queued and at most one waiting to be queued
+    assert list_func.call_count <= 3
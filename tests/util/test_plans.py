@@ -0,0 +1,99 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from chaoslib.exceptions import ActivityFailed
+
+from chaosoci.util.cache import invalidate_inventory
+from chaosoci.util.plans import _plans, create_plan, load_plan
+
+
+def test_plan_is_loaded_from_memory():
+    plan = create_plan('instances', ['ocid1.a', 'ocid1.b'],
+                       {'compartment_id': 'c'})
+
+    assert load_plan(plan['plan_id'], 'instances') == plan
+    assert plan['targets'] == ['ocid1.a', 'ocid1.b']
+    assert plan['scope'] == {'compartment_id': 'c'}
+
+
+def test_plan_is_saved_to_the_plan_store(tmpdir):
+    configuration = {'oci_plan_store': str(tmpdir)}
+    plan = create_plan('instances', ['ocid1.a'], None, configuration)
+
+    path = os.path.join(str(tmpdir), '{}.json'.format(plan['plan_id']))
+    with open(path) as f:
+        assert json.load(f) == plan
+
+    # as when the plan is applied by another run
+    del _plans[plan['plan_id']]
+    assert load_plan(plan['plan_id'], 'instances', configuration) == plan
+
+
+def test_unknown_plan_fails():
+    with pytest.raises(ActivityFailed, match='No plan'):
+        load_plan('0123abcd', 'instances')
+
+
+def test_invalid_plan_id_fails(tmpdir):
+    with pytest.raises(ActivityFailed, match='Invalid plan id'):
+        load_plan('../secrets', 'instances',
+                  {'oci_plan_store': str(tmpdir)})
+
+
+def test_plan_for_other_resources_fails():
+    plan = create_plan('instance_pools', ['ocid1.a'])
+
+    with pytest.raises(ActivityFailed, match='made for instance_pools'):
+        load_plan(plan['plan_id'], 'instances')
+
+
+def test_plan_older_than_max_age_fails():
+    plan = create_plan('instances', ['ocid1.a'])
+    plan['created_at'] = (datetime.now(timezone.utc) -
+                          timedelta(hours=1)).isoformat()
+
+    assert load_plan(plan['plan_id'], 'instances', max_age=7200)
+    with pytest.raises(ActivityFailed, match='old'):
+        load_plan(plan['plan_id'], 'instances', max_age=60)
+
+
+def test_plan_max_age_is_read_from_configuration():
+    plan = create_plan('instances', ['ocid1.a'])
+    plan['created_at'] = (datetime.now(timezone.utc) -
+                          timedelta(hours=1)).isoformat()
+
+    with pytest.raises(ActivityFailed, match='old'):
+        load_plan(plan['plan_id'], 'instances', {'oci_plan_max_age': 60})
+
+
+@patch('chaosoci.util.plans.logger', autospec=True)
+def test_plan_of_another_run_warns_without_max_age(logger, tmpdir):
+    configuration = {'oci_plan_store': str(tmpdir)}
+    plan = create_plan('instances', ['ocid1.a'], None, configuration)
+    del _plans[plan['plan_id']]
+
+    load_plan(plan['plan_id'], 'instances', configuration)
+    logger.warning.assert_called_once()
+
+    logger.reset_mock()
+    configuration['oci_plan_max_age'] = 600
+    load_plan(plan['plan_id'], 'instances', configuration)
+    logger.warning.assert_not_called()
+
+
+@patch('chaosoci.util.plans.logger', autospec=True)
+def test_plan_warns_when_inventory_changed(logger):
+    plan = create_plan('instances', ['ocid1.a'])
+    load_plan(plan['plan_id'], 'instances')
+    logger.warning.assert_not_called()
+
+    invalidate_inventory('instances')
+
+    assert load_plan(plan['plan_id'], 'instances') == plan
+    logger.warning.assert_called_once()
@@ -0,0 +1,96 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import json
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from chaoslib.exceptions import ActivityFailed
+from oci.core.models import Instance
+from oci.object_storage.models import ObjectSummary
+
+from chaosoci.core.compute.common import filter_instances, get_instances
+from chaosoci.core.objectStorage.common import get_objects
+from chaosoci.util.rawjson import raw_page, raw_record_type
+from chaosoci.util.records import compact_records
+
+INSTANCES = [
+    {'id': 'ocid1.instance.a', 'displayName': 'web-1',
+     'lifecycleState': 'RUNNING', 'faultDomain': 'FAULT-DOMAIN-1',
+     'freeformTags': {'env': 'prod'},
+     'timeCreated': '2020-01-01T10:00:00.000Z'},
+    {'id': 'ocid1.instance.b', 'displayName': 'web-2',
+     'lifecycleState': 'STOPPED', 'faultDomain': 'FAULT-DOMAIN-2',
+     'freeformTags': {'env': 'dev'},
+     'timeCreated': '2020-01-02T10:00:00.000Z'},
+]
+
+
+def page(data, next_page=None):
+    return MagicMock(data=data, has_next_page=next_page is not None,
+                     next_page=next_page)
+
+
+def test_raw_records_read_fields_lazily():
+    records = raw_page(json.dumps(INSTANCES).encode(), Instance)
+
+    assert type(records[0]) is raw_record_type(Instance)
+    assert records[0].display_name == 'web-1'
+    assert records[0].freeform_tags == {'env': 'prod'}
+    assert records[0].shape is None
+    assert records[0].time_created.replace(tzinfo=None) == \
+        datetime(2020, 1, 1, 10, 0)
+    assert set(records[0]._values) == {'display_name', 'freeform_tags',
+                                       'shape', 'time_created'}
+    with pytest.raises(AttributeError):
+        records[0].not_a_field
+
+
+def test_raw_page_accepts_decoded_and_wrapped_pages():
+    assert [r.id for r in raw_page(INSTANCES, Instance)] == \
+        ['ocid1.instance.a', 'ocid1.instance.b']
+
+    listing = json.dumps({'objects': [{'name': 'a', 'size': 1}],
+                          'prefixes': ['logs/']})
+    assert [(o.name, o.size) for o in
+            raw_page(listing, ObjectSummary, key='objects')] == [('a', 1)]
+    assert raw_page({'objects': None}, ObjectSummary, key='objects') == []
+
+
+def test_get_instances_raw_pages_and_filters():
+    client = MagicMock()
+    client.list_instances.side_effect = [page(INSTANCES[:1], 'next'),
+                                         page(INSTANCES[1:])]
+
+    instances = get_instances(client, 'c', raw=True,
+                              lifecycle_state='RUNNING')
+
+    assert client.list_instances.call_args_list[0][1] == {
+        'compartment_id': 'c', 'lifecycle_state': 'RUNNING'}
+    assert [i.id for i in filter_instances(
+        instances, {'freeform_tags.env': 'dev'})] == ['ocid1.instance.b']
+    with pytest.raises(ActivityFailed):
+        filter_instances(instances, {'not_a_field': 'x'})
+
+
+def test_get_objects_raw_and_compact():
+    client = MagicMock()
+    client.list_objects.return_value = page(
+        {'objects': [{'name': 'a', 'size': 1, 'md5': 'x'}]})
+
+    objects = get_objects(client, 'ns', 'bucket', raw=True,
+                          compact=('name', 'size'))
+
+    assert [o.to_dict() for o in objects] == [{'name': 'a', 'size': 1}]
+    client.list_objects.assert_called_once_with('ns', 'bucket')
+
+
+def test_raw_records_convert_to_snake_case_dicts():
+    record = compact_records(raw_page(INSTANCES, Instance), 'instances')
+    assert next(record).lifecycle_state == 'RUNNING'
+
+    as_dict = raw_page(INSTANCES, Instance)[1].to_dict()
+    assert as_dict['display_name'] == 'web-2'
+    assert as_dict['availability_domain'] is None
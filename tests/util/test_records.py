@@ -0,0 +1,66 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from chaoslib.exceptions import ActivityFailed
+
+from chaosoci.core.objectStorage.common import (filter_obstore_objects,
+                                                get_objects)
+from chaosoci.util.records import compact_records, record_type
+
+
+class ObjectSummary:
+    attribute_map = {'name': 'name', 'size': 'size', 'md5': 'md5',
+                     'etag': 'etag', 'time_created': 'timeCreated',
+                     'storage_tier': 'storageTier'}
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.md5 = self.etag = self.time_created = None
+        self.storage_tier = 'Standard'
+
+
+def test_record_type_is_reused():
+    assert record_type('R', ('a', 'b')) is record_type('R', ['a', 'b'])
+    assert record_type('R', ('a', 'b')) is not record_type('R', ('a',))
+
+
+def test_records_only_keep_their_fields():
+    records = list(compact_records([ObjectSummary('a', 1)], 'objects'))
+
+    assert records[0].name == 'a'
+    assert records[0].size == 1
+    assert not hasattr(records[0], '__dict__')
+    assert not hasattr(records[0], 'storage_tier')
+    assert records[0].to_dict() == {'name': 'a', 'size': 1,
+                                    'time_created': None, 'md5': None,
+                                    'etag': None}
+
+
+def test_records_can_be_filtered():
+    records = list(compact_records(
+        [ObjectSummary('a', 1), ObjectSummary('b', 10)], 'objects',
+        ['name', 'size']))
+
+    assert filter_obstore_objects(records, {'size': {'range': [5, None]}}) \
+        == list(compact_records([ObjectSummary('b', 10)], 'objects',
+                                ['name', 'size']))
+    with pytest.raises(ActivityFailed):
+        filter_obstore_objects(records, {'storage_tier': 'Standard'})
+
+
+def test_get_objects_compact():
+    page = MagicMock(data=MagicMock(objects=[ObjectSummary('a', 1)]),
+                     has_next_page=False)
+    client = MagicMock()
+    client.list_objects.return_value = page
+
+    objects = get_objects(client, 'ns', 'bucket', compact=True)
+
+    assert [o.name for o in objects] == ['a']
+    client.list_objects.assert_called_once_with('ns', 'bucket')
+    assert type(objects[0]).__name__ == 'ObjectSummaryRecord'
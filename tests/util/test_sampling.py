@@ -0,0 +1,52 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import random
+from collections import Counter
+
+import pytest
+
+from chaoslib.exceptions import ActivityFailed
+
+from chaosoci.util.sampling import (reservoir_sample, sample_percentage,
+                                    sample_stream)
+
+
+def test_reservoir_sample_is_uniform():
+    rng = random.Random(7)
+    picks = Counter()
+    for _ in range(4000):
+        picks.update(reservoir_sample(iter(range(10)), 3, rng))
+
+    assert set(picks) == set(range(10))
+    assert all(1000 < picks[n] < 1400 for n in range(10))
+
+
+def test_reservoir_sample_short_streams_and_empty_samples():
+    assert sorted(reservoir_sample(iter([1, 2]), 5)) == [1, 2]
+    assert reservoir_sample(iter([1, 2]), 0) == []
+
+
+def test_sample_percentage_rounds_up():
+    assert len(sample_percentage(range(5), 10)) == 1
+    assert len(sample_percentage(range(20), 50)) == 10
+    assert sample_percentage([], 50) == []
+
+
+def test_sample_stream_is_reproducible_with_a_seed():
+    first = sample_stream(iter(range(1000)), count=5, seed='run-1')
+    again = sample_stream(iter(range(1000)), count=5, seed='run-1')
+    keyed = sample_stream(iter(range(1000)), percentage=1, seed=3,
+                          key=str)
+
+    assert first == again
+    assert len(keyed) == 10 and all(isinstance(k, str) for k in keyed)
+
+
+def test_sample_stream_takes_a_count_or_a_percentage():
+    with pytest.raises(ActivityFailed):
+        sample_stream([1], count=1, percentage=10)
+    with pytest.raises(ActivityFailed):
+        sample_stream([1])
+    with pytest.raises(ActivityFailed):
+        sample_stream([1], percentage=150)
@@ -0,0 +1,111 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from chaosoci.core.compute.common import filter_instances
+from chaosoci.util.cache import (cached_inventory, inventory_cache,
+                                 invalidate_inventory)
+from chaosoci.util.snapshots import SnapshotStore, snapshot_loader
+
+
+def instance(id, state):
+    return {'id': id, 'lifecycle_state': state,
+            'time_created': datetime(2020, 1, 1, tzinfo=timezone.utc)}
+
+
+@patch('chaosoci.util.snapshots.to_dict', side_effect=dict)
+def test_refresh_is_incremental(to_dict, tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    scope = ('endpoint', 'ocid1.compartment')
+
+    stats = store.refresh('instances', scope, [instance('1', 'RUNNING'),
+                                               instance('2', 'RUNNING')])
+    assert stats == {'added': 2, 'changed': 0, 'removed': 0, 'unchanged': 0}
+
+    stats = store.refresh('instances', scope, [instance('1', 'STOPPED'),
+                                               instance('3', 'RUNNING')])
+    assert stats == {'added': 1, 'changed': 1, 'removed': 1, 'unchanged': 0}
+
+    records = store.load('instances', scope)
+    assert sorted((r.id, r.lifecycle_state) for r in records) == [
+        ('1', 'STOPPED'), ('3', 'RUNNING')]
+    assert records[0].time_created == datetime(2020, 1, 1,
+                                               tzinfo=timezone.utc)
+    assert [r.id for r in filter_instances(
+        records, {'lifecycle_state': 'STOPPED'})] == ['1']
+
+
+@patch('chaosoci.util.snapshots.to_dict', side_effect=dict)
+def test_refresh_rewrites_resources_changed_in_any_field(to_dict, tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    scope = ('endpoint', 'ocid1.compartment')
+    store.refresh('instances', scope, [dict(instance('1', 'RUNNING'),
+                                            display_name='web')])
+
+    stats = store.refresh('instances', scope, [dict(instance('1', 'RUNNING'),
+                                                    display_name='api')])
+
+    assert stats == {'added': 0, 'changed': 1, 'removed': 0, 'unchanged': 0}
+    assert [r.display_name for r in store.load('instances', scope)] == [
+        'api']
+
+
+@patch.dict('chaosoci.util.snapshots._invalidated', clear=True)
+@patch('chaosoci.util.snapshots.to_dict', side_effect=dict)
+@patch('chaosoci.util.snapshots.time.time')
+def test_snapshot_loader_answers_within_max_age(now, to_dict, tmp_path):
+    configuration = {'oci_snapshot_store': str(tmp_path / 'snapshots.db'),
+                     'oci_snapshot_max_age': 300}
+    loader = MagicMock(return_value=[instance('1', 'RUNNING')])
+
+    now.return_value = 1000.0
+    load = snapshot_loader('instances', ('c',), loader, configuration)
+    assert [r['id'] for r in load()] == ['1']
+
+    now.return_value = 1200.0
+    assert [r.id for r in load()] == ['1']
+    assert loader.call_count == 1
+
+    now.return_value = 1400.0
+    load()
+    assert loader.call_count == 2
+
+
+def test_snapshot_loader_disabled_by_default():
+    loader = MagicMock()
+    assert snapshot_loader('instances', ('c',), loader, {}) is loader
+
+
+@patch.dict('chaosoci.util.snapshots._invalidated', clear=True)
+@patch('chaosoci.util.snapshots.to_dict', side_effect=dict)
+@patch('chaosoci.util.snapshots.time.time')
+def test_probe_after_action_bypasses_the_store(now, to_dict, tmp_path):
+    path = str(tmp_path / 'snapshots.db')
+    configuration = {'oci_snapshot_store': path, 'oci_snapshot_max_age': 300,
+                     'oci_inventory_ttl': 60}
+    loader = MagicMock(side_effect=[[instance('1', 'RUNNING')],
+                                    [instance('1', 'STOPPED')]])
+
+    inventory_cache.clear()
+    now.return_value = 1000.0
+    cached_inventory('instances', ('c',), loader, configuration)
+    now.return_value = 1010.0
+    invalidate_inventory('instances')
+    now.return_value = 1020.0
+    assert [r['lifecycle_state'] for r in cached_inventory(
+        'instances', ('c',), loader, configuration)] == ['STOPPED']
+    assert loader.call_count == 2
+
+
+@patch('chaosoci.util.snapshots.to_dict', side_effect=dict)
+def test_invalidation_marks_stored_listings_stale(to_dict, tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    store.refresh('instances', ('c',), [instance('1', 'RUNNING')])
+    store.refresh('buckets', ('c',), [])
+
+    store.invalidate('instances')
+
+    assert store.load('instances', ('c',), max_age=300) is None
+    assert store.load('buckets', ('c',), max_age=300) == []
@@ -0,0 +1,36 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import pytest
+
+from chaosoci.util.stats import describe_durations, histogram, percentile
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [4, 1, 3, 2]
+
+    assert percentile(values, 0) == 1
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4
+    assert percentile([7], 99) == 7
+    with pytest.raises(ValueError):
+        percentile([], 50)
+
+
+def test_histogram_buckets_by_upper_bound():
+    assert histogram([1, 5, 6, 100], buckets=(10, 5)) == [
+        {'le': 5, 'count': 2}, {'le': 10, 'count': 1},
+        {'le': None, 'count': 1}]
+
+
+def test_describe_durations():
+    summary = describe_durations([10, 20, 30, 40], percentiles=(50, 90),
+                                 buckets=(15, 60))
+
+    assert summary == {
+        'count': 4, 'min': 10, 'mean': 25, 'max': 40, 'p50': 25, 'p90': 37,
+        'histogram': [{'le': 15, 'count': 1}, {'le': 60, 'count': 3},
+                      {'le': None, 'count': 0}]}
+    assert describe_durations([], buckets=(1,)) == {
+        'count': 0, 'histogram': [{'le': 1, 'count': 0},
+                                  {'le': None, 'count': 0}]}
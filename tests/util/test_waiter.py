@@ -0,0 +1,98 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+import time
+
+import pytest
+
+from chaoslib.exceptions import ActivityFailed
+
+from chaosoci.util.waiter import measure_recovery, wait_for_states
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_waits_with_backoff_until_every_resource_converges():
+    clock = FakeClock()
+    rounds = iter([
+        {'a': 'STOPPING', 'b': 'STOPPING'},
+        {'a': 'STOPPED', 'b': 'STOPPING'},
+        {'a': 'STOPPED', 'b': 'STOPPING'},
+        {'a': 'STOPPED', 'b': 'STOPPED', 'c': 'RUNNING'},
+    ])
+
+    report = wait_for_states(lambda: next(rounds), ['a', 'b'], 'STOPPED',
+                             interval=1, max_interval=3, backoff=2,
+                             sleep=clock.sleep, clock=clock)
+
+    assert clock.sleeps == [1, 2, 3]
+    assert report == {'states': ['STOPPED'], 'success': True, 'elapsed': 6,
+                      'rounds': 4, 'converged': {'a': 1, 'b': 6},
+                      'pending': {}, 'undisrupted': {}}
+
+
+def test_reports_pending_resources_at_the_deadline():
+    clock = FakeClock()
+
+    report = wait_for_states(lambda: {'a': 'STOPPING'}, ['a', 'gone'],
+                             ['STOPPED', 'TERMINATED'], timeout=10,
+                             interval=4, sleep=clock.sleep, clock=clock)
+
+    assert clock.sleeps == [4, 6]
+    assert report['success'] is False
+    assert report['pending'] == {'a': 'STOPPING', 'gone': None}
+    assert report['rounds'] == 3
+
+
+def test_requires_resources():
+    with pytest.raises(ActivityFailed):
+        wait_for_states(dict, [], 'RUNNING')
+
+
+def test_measure_recovery_counts_from_the_action():
+    clock = FakeClock()
+    rounds = iter([{'a': 'STOPPED', 'b': 'RUNNING'},
+                   {'a': 'RUNNING', 'b': 'RUNNING'}])
+
+    report = measure_recovery(lambda: next(rounds), ['a', 'b'], 'RUNNING',
+                              started_at=time.time() - 30, interval=10,
+                              buckets=(35, 60), disrupted_first=False,
+                              sleep=clock.sleep, clock=clock)
+
+    assert report['success'] is True
+    assert report['recovered']['a'] == pytest.approx(40, abs=1)
+    assert report['recovered']['b'] == pytest.approx(30, abs=1)
+    assert report['stats']['histogram'] == [
+        {'le': 35, 'count': 1}, {'le': 60, 'count': 1},
+        {'le': None, 'count': 0}]
+    assert report['stats']['p50'] == pytest.approx(35, abs=1)
+
+
+def test_measure_recovery_waits_for_the_disruption():
+    clock = FakeClock()
+    rounds = iter([{'a': 'RUNNING', 'b': 'RUNNING', 'c': 'RUNNING'},
+                   {'a': 'STOPPING', 'b': 'RUNNING', 'c': 'RUNNING'},
+                   {'a': 'RUNNING', 'b': 'STOPPED', 'c': 'RUNNING'},
+                   {'a': 'RUNNING', 'b': 'STOPPED', 'c': 'RUNNING'}])
+
+    report = measure_recovery(lambda: next(rounds), ['a', 'b', 'c'],
+                              'RUNNING', timeout=30, interval=10, backoff=1,
+                              sleep=clock.sleep, clock=clock)
+
+    # a was still running when first polled, yet only recovered later
+    assert report['recovered'] == {'a': 20}
+    assert report['unrecovered'] == {'b': 'STOPPED'}
+    assert report['undisrupted'] == {'c': 'RUNNING'}
+    assert report['success'] is False
+    assert report['stats']['count'] == 1
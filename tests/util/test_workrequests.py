@@ -0,0 +1,92 @@
+# coding: utf-8
+# Copyright 2020, Oracle Corporation and/or its affiliates.
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from chaosoci.util.workrequests import (find_work_request,
+                                        wait_for_work_requests,
+                                        work_request_id)
+
+EPOCH = datetime(2020, 6, 1, tzinfo=timezone.utc)
+
+
+def _work_request(status, started=0, finished=None):
+    return MagicMock(
+        status=status, operation_type='StopInstancePool',
+        percent_complete=100.0 if finished is not None else 50.0,
+        time_accepted=EPOCH, time_started=EPOCH + timedelta(seconds=started),
+        time_finished=EPOCH + timedelta(seconds=finished)
+        if finished is not None else None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_work_request_id_read_from_response_headers():
+    response = MagicMock(headers={'opc-work-request-id': 'wr-1'})
+
+    assert work_request_id(response) == 'wr-1'
+    assert work_request_id(MagicMock(headers={})) is None
+
+
+def test_find_latest_work_request_of_resource():
+    client = MagicMock()
+    client.list_work_requests.return_value.data = [
+        MagicMock(id='old', time_accepted=EPOCH - timedelta(hours=1)),
+        MagicMock(id='wr-1', time_accepted=EPOCH + timedelta(seconds=1)),
+        MagicMock(id='wr-2', time_accepted=EPOCH + timedelta(seconds=2))]
+
+    assert find_work_request(client, 'c', 'pool-1', since=EPOCH) == 'wr-2'
+    client.list_work_requests.assert_called_once_with('c',
+                                                      resource_id='pool-1')
+    assert find_work_request(client, 'c', 'pool-1',
+                             since=EPOCH + timedelta(hours=1)) is None
+
+
+def test_only_unfinished_work_requests_are_polled():
+    client = MagicMock()
+    progress = {
+        'wr-1': iter([_work_request('SUCCEEDED', 1, 31)]),
+        'wr-2': iter([_work_request('IN_PROGRESS', 2),
+                      _work_request('SUCCEEDED', 2, 92)]),
+    }
+    client.get_work_request.side_effect = \
+        lambda request_id: MagicMock(data=next(progress[request_id]))
+    clock = FakeClock()
+
+    report = wait_for_work_requests(client, ['wr-1', 'wr-2'], interval=1,
+                                    sleep=clock.sleep, clock=clock)
+
+    assert report['success'] is True
+    assert report['rounds'] == 2
+    assert client.get_work_request.call_count == 3
+    assert report['work_requests']['wr-1']['duration'] == 30.0
+    assert report['work_requests']['wr-2']['duration'] == 90.0
+
+
+def test_failed_or_unfinished_work_requests_are_reported():
+    client = MagicMock()
+    requests = {'wr-1': _work_request('FAILED', 0, 5),
+                'wr-2': _work_request('IN_PROGRESS')}
+    client.get_work_request.side_effect = \
+        lambda request_id: MagicMock(data=requests[request_id])
+    clock = FakeClock()
+
+    report = wait_for_work_requests(client, ['wr-1', 'wr-2'], timeout=10,
+                                    interval=4, sleep=clock.sleep,
+                                    clock=clock)
+
+    assert report['success'] is False
+    assert report['work_requests']['wr-1']['status'] == 'FAILED'
+    assert report['work_requests']['wr-2'] == {
+        'status': 'IN_PROGRESS', 'operation_type': 'StopInstancePool',
+        'percent_complete': 50.0, 'duration': None}